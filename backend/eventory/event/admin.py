@@ -1,6 +1,60 @@
 from django import forms
 from django.contrib import admin
-from .models import College, Student, Event, Registration, Attendance, Feedback
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+
+from .models import College, Student, Event, EventStats, Registration, Attendance, Feedback
+from .search import search_events, search_students
+
+# Unfiltered changelists of tables larger than this show the database's row estimate instead of COUNT(*).
+ESTIMATED_COUNT_THRESHOLD = 100_000
+REGISTRATION_INLINE_LIMIT = 20
+
+
+def estimated_row_count(model, using='default'):
+    """The planner's row estimate for ``model``'s table, or None if the database has not gathered one."""
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            elif connection.vendor == 'sqlite':
+                # sqlite_stat1 only exists once ANALYZE has run; its first figure is the row count.
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Counting millions of rows on every changelist page is slow; estimate when nothing is filtered."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables that grow with every registration."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # skip the second, unfiltered COUNT(*) on filtered pages
 
 
 @admin.register(College)
@@ -10,30 +64,101 @@ class CollegeAdmin(admin.ModelAdmin):
 
 
 @admin.register(Student)
-class StudentAdmin(admin.ModelAdmin):
+class StudentAdmin(LargeTableAdmin):
     list_display = ('id', 'full_name', 'email', 'roll_no', 'college', 'college_code')
     list_filter = ('college',)
+    list_select_related = ('college',)
     search_fields = ('full_name', 'roll_no')
+    autocomplete_fields = ('college',)
+    readonly_fields = ('attendance_count',)  # maintained from Attendance writes
+
+    def get_search_results(self, request, queryset, search_term):
+        # Full-text/trigram indexed instead of icontains scans; also serves autocomplete widgets.
+        if not search_term:
+            return queryset, False
+        students = search_students(queryset.select_related('college'), search_term)
+        return students.order_by('-search_rank', 'pk'), False
+
+
+class LatestRegistrationsFormSet(BaseInlineFormSet):
+    def get_queryset(self):
+        if not hasattr(self, '_latest'):
+            self._latest = super().get_queryset().select_related('student__college').order_by('-id')[
+                :REGISTRATION_INLINE_LIMIT
+            ]
+        return self._latest
+
 
 class RegistrationInline(admin.TabularInline):
+    """The event's latest registrations, read-only; the rest are one click away in the Registration changelist."""
     model = Registration
+    formset = LatestRegistrationsFormSet
     extra = 0
+    fields = ('student', 'college_registered_count', 'created_at')
     readonly_fields = ('created_at',)
+    verbose_name_plural = f"Latest {REGISTRATION_INLINE_LIMIT} registrations"
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(LargeTableAdmin):
     list_display = ('id', 'title', 'college', 'type', 'start_at', 'capacity')
     list_filter = ('college', 'type')
+    list_select_related = ('college',)
     search_fields = ('title',)
+    autocomplete_fields = ('college',)
+    readonly_fields = ('all_registrations',)
     inlines = [RegistrationInline]
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_events(queryset.select_related('college'), search_term).order_by('-search_rank', 'pk'), False
+
+    @admin.display(description="Registrations")
+    def all_registrations(self, obj):
+        if obj.pk is None:
+            return "-"
+        stats = EventStats.objects.filter(event=obj).first()
+        url = reverse('admin:event_registration_changelist') + f'?event__id__exact={obj.pk}'
+        return format_html('<a href="{}">View all {} registrations</a>', url, stats.registrations if stats else 0)
+
+
+@admin.register(Registration)
+class RegistrationAdmin(LargeTableAdmin):
+    list_display = ('id', 'event', 'student', 'college_registered_count', 'created_at')
+    list_select_related = ('event__college', 'student__college')
+    autocomplete_fields = ('event', 'student')
+
+    def get_readonly_fields(self, request, obj=None):
+        # Seat and per-college counters follow creates and deletes, not moves between events or students.
+        return ('event', 'student', 'college_registered_count') if obj else ('college_registered_count',)
+
 
-admin.site.register(Registration)
 @admin.register(Attendance)
-class AttendanceAdmin(admin.ModelAdmin):
+class AttendanceAdmin(LargeTableAdmin):
     list_display = ('id', 'event', 'student', 'college', 'has_given_feedback', 'checked_in_at')
     list_filter = ('college', 'has_given_feedback')
+    list_select_related = ('event__college', 'student__college', 'college')
     search_fields = ('student__full_name', 'event__title')
+    autocomplete_fields = ('event', 'student', 'college')
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        students = search_students(Student.objects.all(), search_term).values('id')
+        events = search_events(Event.objects.all(), search_term).values('id')
+        return queryset.filter(Q(student__in=students) | Q(event__in=events)).order_by('pk'), False
+
+
 class FeedbackAdminForm(forms.ModelForm):
     class Meta:
         model = Feedback
@@ -45,8 +170,10 @@ class FeedbackAdminForm(forms.ModelForm):
             raise forms.ValidationError("Rating must be between 1 and 5.")
         return rating
 
-class FeedbackAdmin(admin.ModelAdmin):
+class FeedbackAdmin(LargeTableAdmin):
     form = FeedbackAdminForm
     list_display = ('id', 'event', 'student', 'rating', 'comment', 'created_at')
+    list_select_related = ('event__college', 'student__college')
+    autocomplete_fields = ('event', 'student')
 
 admin.site.register(Feedback, FeedbackAdmin)
@@ -0,0 +1,192 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from event.models import College, RegistrationTicket
+from event.registration import EventFullError, RegistrationError, RegistrationService
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEFAULTS = {
+    'ENABLED': False,
+    'BATCH_SIZE': 200,
+    'WORKER_THREAD': True,
+    'POLL_INTERVAL': 1.0,
+}
+
+
+def queue_settings():
+    return {**QUEUE_DEFAULTS, **getattr(settings, 'REGISTRATION_QUEUE', {})}
+
+
+class AdmissionQueue:
+    """DB-backed FIFO queue that admits registrations in batches.
+
+    Requests only insert a ticket, so they never wait on the contended event row; a
+    single worker (the in-process thread below or ``manage.py process_registration_queue``)
+    turns tickets into registrations, one transaction per batch, and retries waitlisted
+    tickets whenever their event has free seats again.
+    """
+
+    @staticmethod
+    def enqueue(event, data, user=None):
+        ticket = RegistrationTicket.objects.create(
+            event=event,
+            requested_by=user,
+            college_code=data['collegeid'],
+            full_name=data['name'],
+            email=data['email'],
+            roll_no=data['studentid'],
+        )
+        if queue_settings()['WORKER_THREAD']:
+            _AdmissionWorker.notify()
+        return ticket
+
+    @staticmethod
+    def _admit(ticket, colleges):
+        """Try to turn ``ticket`` into a registration; returns False (ticket untouched) if the event is full."""
+        college = colleges.get(ticket.college_code)
+        if college is None:
+            ticket.status = RegistrationTicket.Status.REJECTED
+            ticket.detail = 'Invalid college code.'
+        else:
+            try:
+                # A savepoint per ticket: a failure undoes this ticket's writes, not the batch's.
+                with transaction.atomic():
+                    ticket.registration = RegistrationService.register(
+                        event_id=ticket.event_id,
+                        college=college,
+                        email=ticket.email,
+                        full_name=ticket.full_name,
+                        roll_no=ticket.roll_no,
+                    )
+            except EventFullError:
+                return False
+            except RegistrationError as e:
+                ticket.status = RegistrationTicket.Status.REJECTED
+                ticket.detail = e.message
+            except Exception as e:
+                logger.exception("Admitting registration ticket %s failed.", ticket.id)
+                ticket.status = RegistrationTicket.Status.FAILED
+                ticket.detail = f"{type(e).__name__}: {e}"[:255]
+            else:
+                ticket.status = RegistrationTicket.Status.ADMITTED
+        ticket.waitlist_position = None
+        ticket.processed_at = timezone.now()
+        return True
+
+    @staticmethod
+    def _lock(tickets):
+        if connection.features.has_select_for_update_skip_locked:
+            # of=self: never lock the joined event rows that registrations update.
+            of = ('self',) if connection.features.has_select_for_update_of else ()
+            tickets = tickets.select_for_update(skip_locked=True, of=of)
+        return tickets
+
+    @staticmethod
+    def process_batch(batch_size=None):
+        """Admit the oldest pending tickets; returns how many were processed."""
+        batch_size = batch_size or queue_settings()['BATCH_SIZE']
+        with transaction.atomic():
+            pending = RegistrationTicket.objects.filter(status=RegistrationTicket.Status.PENDING).order_by('id')
+            tickets = list(AdmissionQueue._lock(pending)[:batch_size])
+            if not tickets:
+                return 0
+
+            colleges = College.objects.in_bulk({t.college_code for t in tickets}, field_name='code')
+            waitlist = {}
+            for ticket in tickets:
+                if ticket.event_id not in waitlist:
+                    waitlist[ticket.event_id] = RegistrationTicket.objects.filter(
+                        event_id=ticket.event_id, status=RegistrationTicket.Status.WAITLISTED
+                    ).count()
+                # Behind an existing waitlist a ticket queues even if a seat is free: the
+                # seat belongs to the oldest waitlisted ticket.
+                queued = waitlist[ticket.event_id] and ticket.college_code in colleges
+                if queued or not AdmissionQueue._admit(ticket, colleges):
+                    waitlist[ticket.event_id] += 1
+                    ticket.status = RegistrationTicket.Status.WAITLISTED
+                    ticket.waitlist_position = waitlist[ticket.event_id]
+                    ticket.processed_at = timezone.now()
+
+            RegistrationTicket.objects.bulk_update(
+                tickets, ['status', 'registration', 'waitlist_position', 'detail', 'processed_at']
+            )
+        return len(tickets)
+
+    @staticmethod
+    def promote_waitlisted(batch_size=None):
+        """Retry waitlisted tickets, oldest first, on events that have free seats again.
+
+        Seats free up when capacity is raised or a registration is deleted. Returns how
+        many tickets left the waitlist; the positions of those still waiting move up.
+        """
+        batch_size = batch_size or queue_settings()['BATCH_SIZE']
+        with transaction.atomic():
+            waiting = RegistrationTicket.objects.filter(
+                status=RegistrationTicket.Status.WAITLISTED, event__registration_count__lt=F('event__capacity'),
+            ).order_by('id')
+            tickets = list(AdmissionQueue._lock(waiting)[:batch_size])
+            if not tickets:
+                return 0
+
+            colleges = College.objects.in_bulk({t.college_code for t in tickets}, field_name='code')
+            left = []
+            for ticket in tickets:
+                position = ticket.waitlist_position
+                if AdmissionQueue._admit(ticket, colleges):
+                    left.append((position, ticket))
+            if not left:
+                return 0
+            RegistrationTicket.objects.bulk_update(
+                [ticket for _, ticket in left], ['status', 'registration', 'waitlist_position', 'detail', 'processed_at']
+            )
+            # Highest position first, so each shift only moves tickets that were behind it.
+            for position, ticket in sorted(left, key=lambda item: item[0] or 0, reverse=True):
+                RegistrationTicket.objects.filter(
+                    event_id=ticket.event_id, status=RegistrationTicket.Status.WAITLISTED,
+                    waitlist_position__gt=position or 0,
+                ).update(waitlist_position=F('waitlist_position') - 1)
+        return len(left)
+
+    @staticmethod
+    def process_pending(batch_size=None):
+        # Waitlisted tickets first, so freed seats go to them before newer pending tickets.
+        processed = 0
+        while promoted := AdmissionQueue.promote_waitlisted(batch_size):
+            processed += promoted
+        while batch := AdmissionQueue.process_batch(batch_size):
+            processed += batch
+        return processed
+
+
+class _AdmissionWorker(threading.Thread):
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        super().__init__(name='registration-admission', daemon=True)
+        self.wakeup = threading.Event()
+
+    @classmethod
+    def notify(cls):
+        with cls._lock:
+            if cls._instance is None or not cls._instance.is_alive():
+                cls._instance = cls()
+                cls._instance.start()
+        cls._instance.wakeup.set()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(timeout=queue_settings()['POLL_INTERVAL'])
+            self.wakeup.clear()
+            try:
+                AdmissionQueue.process_pending()
+            except Exception:
+                logger.exception("Registration admission batch failed; tickets stay pending for the next run.")
+            finally:
+                connection.close()
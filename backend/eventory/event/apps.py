@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class EventConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'event'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from event import signals  # noqa: F401
+        from event.search import ensure_search_index
+        post_migrate.connect(ensure_search_index, sender=self)
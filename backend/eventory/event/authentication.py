@@ -0,0 +1,101 @@
+import datetime
+import secrets
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import authentication, exceptions
+
+from event.backends import CachedModelBackend
+from event.models import RevokedToken
+
+TOKEN_DEFAULTS = {
+    'TTL': 12 * 60 * 60,
+    'USER_CACHE_TTL': 60,
+    'KEYWORD': 'Token',
+}
+SALT = 'event.authentication.SignedTokenAuthentication'
+_REVOKED = 'revoked'
+
+
+def token_settings():
+    return {**TOKEN_DEFAULTS, **getattr(settings, 'AUTH_TOKEN', {})}
+
+
+def _cache_key(jti):
+    return f'auth-token:{jti}'
+
+
+def issue_token(user):
+    """Return (token, expires_at) for ``user``.
+
+    The token is the user id and a random token id, timestamped and HMAC-signed with
+    SECRET_KEY by django.core.signing, so verifying it never touches a password hash.
+    """
+    token = signing.dumps({'u': user.pk, 'j': secrets.token_hex(16)}, salt=SALT)
+    return token, timezone.now() + datetime.timedelta(seconds=token_settings()['TTL'])
+
+
+def revoke_token(token):
+    """Revoke a (validly signed) token for the rest of its lifetime."""
+    payload = signing.loads(token, salt=SALT)
+    issued_at = signing.b62_decode(token.rsplit(':', 2)[1])
+    expires_at = datetime.datetime.fromtimestamp(issued_at + token_settings()['TTL'], tz=datetime.timezone.utc)
+    RevokedToken.objects.get_or_create(jti=payload['j'], defaults={'user_id': payload['u'], 'expires_at': expires_at})
+    remaining = max(1, int((expires_at - timezone.now()).total_seconds()))
+    cache.set(_cache_key(payload['j']), _REVOKED, timeout=remaining)
+    purge_expired_revocations()
+
+
+def purge_expired_revocations():
+    """Delete revocations of tokens that have expired anyway; returns how many were deleted."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lt=timezone.now()).delete()
+    return deleted
+
+
+def user_for_token(token):
+    """The active user ``token`` was issued to; raises AuthenticationFailed otherwise.
+
+    Verification is a signature and expiry check. Whether the token was revoked is
+    cached for USER_CACHE_TTL seconds and the user comes from the same cache as session
+    logins (event/backends.py), which is cleared whenever the user is saved, so a warm
+    call needs no database round trip either.
+    """
+    conf = token_settings()
+    try:
+        payload = signing.loads(token, salt=SALT, max_age=conf['TTL'])
+    except signing.SignatureExpired:
+        raise exceptions.AuthenticationFailed('Token has expired.')
+    except signing.BadSignature:
+        raise exceptions.AuthenticationFailed('Invalid token.')
+
+    key = _cache_key(payload['j'])
+    state = cache.get(key)
+    if state is None:
+        state = _REVOKED if RevokedToken.objects.filter(jti=payload['j']).exists() else payload['u']
+        cache.set(key, state, timeout=conf['USER_CACHE_TTL'])
+    if state == _REVOKED:
+        raise exceptions.AuthenticationFailed('Token has been revoked.')
+
+    user = CachedModelBackend().get_user(state)
+    if user is None or not user.is_active:
+        raise exceptions.AuthenticationFailed('User inactive or deleted.')
+    return user
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """``Authorization: Token <token>`` with tokens issued by LoginUserView."""
+
+    def authenticate(self, request):
+        header = authentication.get_authorization_header(request).split()
+        if not header or header[0].lower() != token_settings()['KEYWORD'].lower().encode():
+            return None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+
+        token = header[1].decode(errors='replace')
+        return user_for_token(token), token
+
+    def authenticate_header(self, request):
+        return token_settings()['KEYWORD']
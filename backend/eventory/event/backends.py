@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_CACHE_TTL = 60
+
+
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose per-request user lookup (session -> user) is served from the cache.
+
+    The cached user carries is_staff, which is all IsAdmin/IsStudent look at, and is
+    dropped whenever the user row is saved or deleted (see event/signals.py).
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, timeout=getattr(settings, 'SESSION_USER_CACHE_TTL', USER_CACHE_TTL))
+        return user
@@ -0,0 +1,183 @@
+"""Lean read-only gateway for the kiosk and dashboard hot paths.
+
+A FastAPI app that eventory/asgi.py mounts next to Django when READ_GATEWAY['ENABLED']
+is set. It answers a handful of small reads straight from the Django models with
+single ``.values()`` queries and pydantic response models, skipping DRF's content
+negotiation, serializer fields and browsable API. Callers authenticate exactly as for
+the API: a signed ``Token`` header or the session cookie.
+"""
+import functools
+import types
+from datetime import datetime
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db import close_old_connections
+from django.db.models import OuterRef, Subquery
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from pydantic import BaseModel
+from rest_framework import exceptions
+
+from .authentication import token_settings, user_for_token
+from .models import Attendance, Event, Registration
+
+GATEWAY_DEFAULTS = {
+    'ENABLED': False,
+    'PREFIX': '/api/gateway',
+}
+
+
+def gateway_settings():
+    return {**GATEWAY_DEFAULTS, **getattr(settings, 'READ_GATEWAY', {})}
+
+
+def uses_db(func):
+    """Give a sync endpoint Django's per-request connection handling.
+
+    FastAPI runs sync endpoints on a thread pool, outside Django's request_started /
+    request_finished signals, so stale connections are closed here instead.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+@uses_db
+def require_user(request: Request):
+    header = request.headers.get('authorization', '').split()
+    if header and header[0].lower() == token_settings()['KEYWORD'].lower():
+        if len(header) != 2:
+            raise HTTPException(status_code=401, detail='Invalid token header.')
+        try:
+            return user_for_token(header[1])
+        except exceptions.AuthenticationFailed as exc:
+            raise HTTPException(status_code=401, detail=str(exc.detail))
+
+    session_key = request.cookies.get(settings.SESSION_COOKIE_NAME)
+    if session_key:
+        session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+        user = get_user(types.SimpleNamespace(session=session))
+        if user.is_authenticated:
+            return user
+    raise HTTPException(status_code=403, detail='Authentication credentials were not provided.')
+
+
+class EventSummary(BaseModel):
+    id: int
+    college_id: int
+    title: str
+    type: str
+    start_at: datetime
+    end_at: datetime
+    capacity: int
+    registrations: int
+    seats_left: int
+
+
+class LiveCounts(BaseModel):
+    event_id: int
+    capacity: int
+    registrations: int
+    seats_left: int
+    checked_in: int
+    present: int
+    feedback: int
+    average_rating: float
+
+
+class RegistrationStatus(BaseModel):
+    event_id: int
+    student_id: int
+    registered: bool
+    checked_in: bool
+    present: bool
+
+
+router = APIRouter(prefix=gateway_settings()['PREFIX'], dependencies=[Depends(require_user)])
+
+
+def _event_or_404(*fields, event_id):
+    row = Event.objects.filter(pk=event_id).values(*fields).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail='Not found.')
+    return row
+
+
+@router.get('/events/{event_id}/', response_model=EventSummary)
+@uses_db
+def event_summary(event_id: int):
+    row = _event_or_404(
+        'id', 'college_id', 'title', 'type', 'start_at', 'end_at', 'capacity', 'registration_count',
+        event_id=event_id,
+    )
+    return EventSummary(
+        **{k: v for k, v in row.items() if k != 'registration_count'},
+        registrations=row['registration_count'],
+        seats_left=max(row['capacity'] - row['registration_count'], 0),
+    )
+
+
+@router.get('/events/{event_id}/counts/', response_model=LiveCounts)
+@uses_db
+def live_counts(event_id: int):
+    row = _event_or_404(
+        'capacity', 'registration_count', 'stats__attendance_count', 'stats__present_count',
+        'stats__feedback_count', 'stats__rating_sum',
+        event_id=event_id,
+    )
+    feedback = row['stats__feedback_count'] or 0
+    return LiveCounts(
+        event_id=event_id,
+        capacity=row['capacity'],
+        registrations=row['registration_count'],
+        seats_left=max(row['capacity'] - row['registration_count'], 0),
+        checked_in=row['stats__attendance_count'] or 0,
+        present=row['stats__present_count'] or 0,
+        feedback=feedback,
+        average_rating=round(row['stats__rating_sum'] / feedback, 2) if feedback else 0.0,
+    )
+
+
+@router.get('/events/{event_id}/students/{student_id}/', response_model=RegistrationStatus)
+@uses_db
+def registration_status(event_id: int, student_id: int):
+    attendance = Attendance.objects.filter(event_id=event_id, student_id=OuterRef('student_id'))
+    row = Registration.objects.filter(event_id=event_id, student_id=student_id).values('id').annotate(
+        attendance_id=Subquery(attendance.values('id')[:1]),
+        present=Subquery(attendance.values('is_present')[:1]),
+    ).first()
+    return RegistrationStatus(
+        event_id=event_id,
+        student_id=student_id,
+        registered=row is not None,
+        checked_in=bool(row and row['attendance_id']),
+        present=bool(row and row['present']),
+    )
+
+
+app = FastAPI(
+    title='Eventory read gateway',
+    docs_url=None,
+    redoc_url=None,
+    openapi_url=f"{gateway_settings()['PREFIX']}/openapi.json",
+)
+app.include_router(router)
+
+
+def with_gateway(django_application):
+    """An ASGI app sending requests under the gateway prefix to ``app``, the rest to Django."""
+    prefix = gateway_settings()['PREFIX'].rstrip('/') + '/'
+
+    async def application(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'].startswith(prefix):
+            return await app(scope, receive, send)
+        return await django_application(scope, receive, send)
+
+    return application
+
@@ -0,0 +1,232 @@
+import csv
+import io
+import json
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+from django.utils import timezone
+
+from event.models import College, Event, Registration, Student
+from event.registration import RegistrationService
+from event.signals import report_data_changed
+from event.stats import EventStatsService
+
+REQUIRED_COLUMNS = ('name', 'collegeid', 'email', 'studentid')
+MAX_REPORTED_ERRORS = 1000
+
+
+def _undecodable(value):
+    """Whether ``value`` holds bytes that read_rows could not decode."""
+    if not isinstance(value, str):
+        return False
+    try:
+        value.encode('utf-8')
+    except UnicodeEncodeError:
+        return True
+    return False
+
+
+def read_rows(stream, file_format):
+    """Yield (line number, dict) pairs from a binary CSV or NDJSON stream.
+
+    Columns match StudentRegistrationSerializer: name, collegeid, email, studentid and
+    an optional event_id. A leading BOM (as Excel writes) is skipped, and bytes that are
+    not UTF-8 are kept as surrogates so BulkImport reports the row instead of failing
+    the whole upload.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='surrogateescape', newline='')
+    if file_format == 'csv':
+        for line, row in enumerate(csv.DictReader(text), start=2):
+            yield line, row
+    else:
+        for line, raw in enumerate(text, start=1):
+            if raw.strip():
+                try:
+                    yield line, json.loads(raw)
+                except ValueError:
+                    yield line, None
+
+
+class BulkImport:
+    """Chunked import of students and (optionally) their event registrations.
+
+    Each chunk runs in its own transaction: students are upserted on (college, email)
+    with one bulk_create(update_conflicts=True), and registrations are inserted in one
+    batch per chunk after seats are reserved per event, so capacity holds exactly as it
+    does for single registrations. Bad rows are reported and skipped; they never abort
+    the load.
+    """
+
+    def __init__(self, chunk_size=1000):
+        self.chunk_size = chunk_size
+        self.colleges = {}
+        self.processed = 0
+        self.students_upserted = 0
+        self.registrations_created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def run(self, rows):
+        chunk = []
+        for line, row in rows:
+            chunk.append((line, row))
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk)
+        return self.report()
+
+    def report(self):
+        return {
+            'processed': self.processed,
+            'students_upserted': self.students_upserted,
+            'registrations_created': self.registrations_created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+    def _error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def _clean(self, line, row):
+        if not isinstance(row, dict):
+            return self._error(line, 'Malformed row.')
+        if any(_undecodable(value) for value in row.values()):
+            return self._error(line, 'Not valid UTF-8.')
+        missing = [column for column in REQUIRED_COLUMNS if not str(row.get(column) or '').strip()]
+        if missing:
+            return self._error(line, f"Missing {', '.join(missing)}.")
+        email = str(row['email']).strip()
+        try:
+            validate_email(email)
+        except ValidationError:
+            return self._error(line, 'Invalid email.')
+        event_id = row.get('event_id')
+        if event_id not in (None, ''):
+            try:
+                event_id = int(event_id)
+            except (TypeError, ValueError):
+                return self._error(line, 'Invalid event_id.')
+        else:
+            event_id = None
+        return {
+            'line': line,
+            'college_code': str(row['collegeid']).strip(),
+            'email': email,
+            'full_name': str(row['name']).strip()[:255],
+            'roll_no': str(row['studentid']).strip()[:64],
+            'event_id': event_id,
+        }
+
+    def _import_chunk(self, chunk):
+        self.processed += len(chunk)
+        rows = [cleaned for cleaned in (self._clean(line, row) for line, row in chunk) if cleaned]
+
+        unknown = {row['college_code'] for row in rows} - self.colleges.keys()
+        if unknown:
+            self.colleges.update(College.objects.filter(code__in=unknown).values_list('code', 'id'))
+        valid = []
+        for row in rows:
+            if row['college_code'] not in self.colleges:
+                self._error(row['line'], 'Invalid college code.')
+            else:
+                row['college_id'] = self.colleges[row['college_code']]
+                valid.append(row)
+        if not valid:
+            return
+
+        try:
+            with transaction.atomic():
+                students = self._upsert_students(valid)
+                self._register(valid, students)
+        except Exception as e:
+            for row in valid:
+                self._error(row['line'], f'Chunk failed: {e}')
+
+    def _upsert_students(self, rows):
+        # Last row wins when a file repeats a student.
+        latest = {(row['college_id'], row['email']): row for row in rows}
+        Student.objects.bulk_create(
+            [
+                Student(college_id=college_id, email=email, full_name=row['full_name'], roll_no=row['roll_no'])
+                for (college_id, email), row in latest.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['college', 'email'],
+            update_fields=['full_name', 'roll_no'],
+        )
+        self.students_upserted += len(latest)
+        emails = {email for _, email in latest}
+        return {
+            (college_id, email): pk
+            for pk, college_id, email in Student.objects.filter(
+                college_id__in={college_id for college_id, _ in latest}, email__in=emails
+            ).values_list('id', 'college_id', 'email')
+        }
+
+    def _register(self, rows, students):
+        wanted = defaultdict(dict)  # event_id -> {student_id: row}, first row per student wins
+        for row in rows:
+            if row['event_id'] is not None:
+                student_id = students[(row['college_id'], row['email'])]
+                wanted[row['event_id']].setdefault(student_id, row)
+        if not wanted:
+            return
+
+        events = Event.objects.in_bulk(wanted.keys())
+        now = timezone.now()
+        new_registrations = []
+        for event_id, by_student in wanted.items():
+            if event_id not in events:
+                for row in by_student.values():
+                    self._error(row['line'], 'Event not found.')
+                continue
+            already = set(
+                Registration.objects.filter(event_id=event_id, student_id__in=by_student).values_list('student_id', flat=True)
+            )
+            for student_id in already:
+                self._error(by_student.pop(student_id)['line'], 'Student already registered for this event.')
+
+            granted = RegistrationService.reserve_up_to(event_id, len(by_student))
+            admitted = list(by_student.items())[:granted]
+            for _, row in list(by_student.items())[granted:]:
+                self._error(row['line'], 'Event is at full capacity.')
+            if not admitted:
+                continue
+
+            per_college = defaultdict(list)
+            for student_id, row in admitted:
+                per_college[row['college_id']].append(student_id)
+            for college_id, student_ids in per_college.items():
+                last = RegistrationService.increment_college_count(event_id, college_id, len(student_ids))
+                first = last - len(student_ids) + 1
+                new_registrations.extend(
+                    Registration(event_id=event_id, student_id=student_id, college_registered_count=first + offset, created_at=now)
+                    for offset, student_id in enumerate(student_ids)
+                )
+            EventStatsService.record(event_id, registrations=len(admitted))
+            report_data_changed.send(
+                sender=Registration, event_ids=[event_id], college_ids={events[event_id].college_id, *per_college}
+            )
+
+        self._insert_registrations(new_registrations)
+        self.registrations_created += len(new_registrations)
+
+    @staticmethod
+    def _insert_registrations(registrations):
+        if connection.vendor != 'postgresql':
+            Registration.objects.bulk_create(registrations, batch_size=1000)
+            return
+        # Duplicates were filtered above, so a plain COPY is safe and much faster than INSERT.
+        opts = Registration._meta
+        columns = [opts.get_field(name).column for name in ('event', 'student', 'college_registered_count', 'created_at')]
+        statement = f"COPY {connection.ops.quote_name(opts.db_table)} ({', '.join(columns)}) FROM STDIN"
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(statement) as copy:
+                for r in registrations:
+                    copy.write_row((r.event_id, r.student_id, r.college_registered_count, r.created_at))
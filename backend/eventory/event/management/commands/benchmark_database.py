@@ -0,0 +1,75 @@
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from event.models import College, Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests per second for a mixed registration/read workload against the configured "
+        "database, from concurrent threads. Run once per EVENTORY_DB_ENGINE profile to compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=200, help="Requests per thread.")
+        parser.add_argument('--write-every', type=int, default=4,
+                            help="Every Nth request registers a new student; the rest are reads.")
+
+    def handle(self, *args, **options):
+        run = uuid.uuid4().hex[:8]
+        college = College.objects.create(name=f"Benchmark {run}", code=f"bench-{run}")
+        event = Event.objects.create(
+            college=college, title=f"Benchmark {run}", type=Event.EventType.FEST,
+            start_at=timezone.now(), end_at=timezone.now(), capacity=10 ** 9,
+        )
+        user = get_user_model().objects.create_user(username=f"bench-{run}")
+        errors = []
+        statuses = {}
+
+        def client_thread(n):
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(user)
+            try:
+                for i in range(options['requests']):
+                    if i % options['write_every'] == 0:
+                        response = client.post(reverse('event-register', args=[event.id]), {
+                            'name': f"Student {n}-{i}", 'collegeid': college.code, 'event_id': event.id,
+                            'email': f"{run}-{n}-{i}@example.com", 'studentid': f"{n}-{i}",
+                        }, content_type='application/json')
+                    else:
+                        response = client.get(reverse('event-detail', args=[event.id]))
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            except Exception as exc:  # e.g. "database is locked" on an untuned SQLite file
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=client_thread, args=(n,)) for n in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        total = sum(statuses.values())
+        conf = connection.settings_dict
+        self.stdout.write(
+            f"{connection.vendor} (CONN_MAX_AGE={conf['CONN_MAX_AGE']}): {total} requests in {elapsed:.2f}s "
+            f"= {total / elapsed:.0f} req/s; statuses {dict(sorted(statuses.items()))}"
+        )
+        if errors:
+            self.stdout.write(self.style.ERROR(f"{len(errors)} threads failed, first error: {errors[0]!r}"))
+
+        event.delete()
+        college.delete()
+        user.delete()
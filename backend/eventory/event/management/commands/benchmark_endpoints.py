@@ -0,0 +1,247 @@
+import contextlib
+import json
+import platform
+import statistics
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from event.models import College, Event, Registration, Student
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmark_baseline.json'
+TAG = 'bench'
+ATTENDANCE_BATCH = 50
+# Served through ReportCache: measured cold (cache disabled) under their own name and warm as '<name>:cached'.
+REPORT_ROUTES = ('event-popularity', 'top-students', 'student-participation')
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the real URL routes with concurrent clients against a seeded database and report "
+        "p50/p95/p99 latency and throughput per route, compared with a stored baseline. "
+        "Seeds a dataset (tagged 'bench') on first use; point EVENTORY_DB_NAME at a scratch file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300, help="Measured requests per route.")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--route', action='append', dest='routes', help="Only run these routes.")
+        parser.add_argument('--colleges', type=int, default=40, help="Dataset size when seeding.")
+        parser.add_argument('--students', type=int, default=20000, help="Dataset size when seeding.")
+        parser.add_argument('--events', type=int, default=2000, help="Dataset size when seeding.")
+        parser.add_argument('--seed', type=int, default=1, help="Dataset seed when seeding.")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--save-baseline', action='store_true', help="Write these results as the new baseline.")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Relative p95 change beyond which a route is reported as slower/faster.")
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help="Exit with an error if any route's p95 regressed beyond the tolerance.")
+
+    def handle(self, *args, **options):
+        dataset = {key: options[key] for key in ('colleges', 'students', 'events', 'seed')}
+        if not College.objects.filter(code__startswith=f'{TAG}-').exists():
+            self.stdout.write(f"Seeding dataset {dataset}...")
+            call_command('generate_dataset', tag=TAG, stdout=self.stdout, **dataset)
+
+        fixture = Fixture()
+        routes = self.routes(fixture)
+        if options['routes']:
+            unknown = set(options['routes']) - routes.keys()
+            if unknown:
+                raise CommandError(f"Unknown routes: {', '.join(sorted(unknown))}. Choose from {', '.join(routes)}.")
+            routes = {name: routes[name] for name in options['routes']}
+
+        try:
+            results = {}
+            self.stdout.write(f"{'route':<30}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  vs baseline p95")
+            baseline = self.load_baseline(options['baseline'], dataset, options)
+            for name, request in routes.items():
+                runs = [(name, self.reports_cache_disabled if name in REPORT_ROUTES else contextlib.nullcontext)]
+                if name in REPORT_ROUTES:
+                    runs.append((f'{name}:cached', contextlib.nullcontext))
+                for label, context in runs:
+                    with context():
+                        results[label] = self.measure(fixture, request, options['requests'], options['concurrency'])
+                    self.stdout.write(self.format_row(label, results[label], baseline.get(label), options['tolerance']))
+        finally:
+            fixture.tear_down()
+
+        regressions = [
+            name for name, result in results.items()
+            if name in baseline and result['p95_ms'] > baseline[name]['p95_ms'] * (1 + options['tolerance'])
+        ]
+        if options['save_baseline']:
+            Path(options['baseline']).write_text(json.dumps({
+                'meta': self.meta(dataset, options),
+                'routes': results,
+            }, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}."))
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"p95 regressed beyond {options['tolerance']:.0%}: {', '.join(regressions)}.")
+
+    @staticmethod
+    def routes(fixture):
+        """name -> callable(client, n) issuing the n-th request of that route."""
+        event, student, college = fixture.event, fixture.student, fixture.college
+
+        def register(client, n):
+            return client.post(reverse('event-register', args=[fixture.target.id]), {
+                'name': f"Bench Student {n}", 'collegeid': college.code, 'event_id': fixture.target.id,
+                'email': f"{fixture.run}-{n}@bench.example.com", 'studentid': f"{fixture.run}-{n}",
+            }, content_type='application/json')
+
+        def bulk_attendance(client, n):
+            return client.post(reverse('event-attendance', args=[fixture.target.id]), {'students': [
+                {'student_id': sid, 'is_present': (sid + n) % 5 != 0} for sid in fixture.attendees
+            ]}, content_type='application/json')
+
+        return {
+            'event-list': lambda client, n: client.get(reverse('event-list')),
+            'event-detail': lambda client, n: client.get(reverse('event-detail', args=[event.id])),
+            'register': register,
+            'bulk-attendance': bulk_attendance,
+            'registered-events': lambda client, n: client.get(reverse('student-registered-events', args=[student.id])),
+            'event-popularity': lambda client, n: client.get(reverse('event-popularity')),
+            'top-students': lambda client, n: client.get(reverse('top-students'), {'college': college.id}),
+            'student-participation': lambda client, n: client.get(
+                reverse('student-participation', args=[student.id])
+            ),
+        }
+
+    @staticmethod
+    def reports_cache_disabled():
+        # As in check_query_plans: every report request must reach the database.
+        return override_settings(
+            CACHES={**settings.CACHES, 'benchmark-cold': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+            REPORTS_CACHE={**getattr(settings, 'REPORTS_CACHE', {}), 'ALIAS': 'benchmark-cold'},
+        )
+
+    @staticmethod
+    def measure(fixture, request, total, concurrency):
+        warm_up = request(fixture.client(), -1)  # fill caches and open the connection
+        if warm_up.status_code >= 400:
+            raise CommandError(f"Warm-up request returned {warm_up.status_code}: {warm_up.content[:200]!r}")
+        connections.close_all()
+
+        latencies = []
+        statuses = {}
+        errors = []
+        remaining = iter(range(total))
+        lock = threading.Lock()
+
+        def client_thread():
+            client = fixture.client()
+            try:
+                while True:
+                    with lock:
+                        n = next(remaining, None)
+                    if n is None:
+                        return
+                    started = time.perf_counter()
+                    response = request(client, n)
+                    latencies.append(time.perf_counter() - started)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=client_thread) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        if errors:
+            raise CommandError(f"{len(errors)} clients failed, first error: {errors[0]!r}")
+        failed = sum(count for code, count in statuses.items() if code >= 400)
+        if failed:
+            raise CommandError(f"{failed} requests failed: statuses {dict(sorted(statuses.items()))}")
+
+        percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            'requests': len(latencies),
+            'rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentiles[49] * 1000, 2),
+            'p95_ms': round(percentiles[94] * 1000, 2),
+            'p99_ms': round(percentiles[98] * 1000, 2),
+        }
+
+    def load_baseline(self, path, dataset, options):
+        path = Path(path)
+        if not path.exists():
+            return {}
+        stored = json.loads(path.read_text())
+        meta = self.meta(dataset, options)
+        differs = {key for key in ('dataset', 'concurrency', 'database') if stored['meta'].get(key) != meta[key]}
+        if differs:
+            self.stdout.write(self.style.WARNING(
+                f"Baseline was recorded with a different {', '.join(sorted(differs))}; compare with care."
+            ))
+        return stored['routes']
+
+    @staticmethod
+    def meta(dataset, options):
+        return {
+            'dataset': dataset,
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+            'database': connection.vendor,
+            'python': platform.python_version(),
+        }
+
+    def format_row(self, name, result, baseline, tolerance):
+        row = (
+            f"{name:<30}{result['rps']:>9.0f}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}  "
+        )
+        if baseline is None:
+            return row + "-"
+        change = result['p95_ms'] / baseline['p95_ms'] - 1
+        text = f"{change:+.0%} ({baseline['p95_ms']:.2f} ms)"
+        if change > tolerance:
+            return row + self.style.ERROR(f"{text} slower")
+        if change < -tolerance:
+            return row + self.style.SUCCESS(f"{text} faster")
+        return row + text
+
+
+class Fixture:
+    """The benchmark's targets in the seeded data, plus a throwaway event for the write routes."""
+
+    def __init__(self):
+        self.run = timezone.now().strftime('%Y%m%d%H%M%S%f')
+        self.event = Event.objects.filter(college__code__startswith=f'{TAG}-').order_by('-registration_count', 'id').first()
+        registration = Registration.objects.filter(event=self.event).order_by('id').first()
+        if registration is None:
+            raise CommandError("The seeded dataset has no registrations; regenerate it with more students.")
+        self.student = registration.student
+        self.college = self.event.college
+        # Writes go to an event of their own so the seeded data is left as it was.
+        self.target = Event.objects.create(
+            college=self.college, title=f"Benchmark {self.run}", type=Event.EventType.FEST,
+            start_at=timezone.now(), end_at=timezone.now(), capacity=10 ** 9,
+        )
+        self.attendees = list(self.college.students.order_by('id').values_list('id', flat=True)[:ATTENDANCE_BATCH])
+        Registration.objects.bulk_create(Registration(event=self.target, student_id=sid) for sid in self.attendees)
+        self.user = get_user_model().objects.create_user(username=f"bench-{self.run}")
+
+    def client(self):
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(self.user)
+        return client
+
+    def tear_down(self):
+        connections.close_all()
+        Student.objects.filter(email__startswith=f"{self.run}-", college=self.college).delete()
+        self.target.delete()
+        self.user.delete()
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.urls import include, path
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from event import gateway
+from event.authentication import issue_token
+from event.models import Registration
+
+DRF_PREFIX = '/api/drf-baseline'
+
+
+class GatewayPayloadView(APIView):
+    """A DRF view (default authentication and permissions) returning exactly a gateway endpoint's payload.
+
+    Both stacks then run the same query and build the same response, so the benchmark
+    measures the framework alone.
+    """
+    endpoint = None
+
+    def get(self, request, **kwargs):
+        return Response(self.endpoint.__wrapped__(**kwargs).model_dump())
+
+
+# The project's routes plus the DRF baselines; the benchmark swaps this in as ROOT_URLCONF.
+urlpatterns = [
+    path('', include('eventory.urls')),
+    path(f'{DRF_PREFIX.strip("/")}/events/<int:event_id>/', GatewayPayloadView.as_view(endpoint=gateway.event_summary)),
+    path(f'{DRF_PREFIX.strip("/")}/events/<int:event_id>/counts/', GatewayPayloadView.as_view(endpoint=gateway.live_counts)),
+    path(
+        f'{DRF_PREFIX.strip("/")}/events/<int:event_id>/students/<int:student_id>/',
+        GatewayPayloadView.as_view(endpoint=gateway.registration_status),
+    ),
+]
+
+
+async def call_asgi(application, path, headers=()):
+    """Issue one GET to an ASGI ``application`` in-process; returns (status, body bytes)."""
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+        'headers': [(b'host', b'localhost'), *((k.lower().encode(), v.encode()) for k, v in headers)],
+    }
+    requested = False
+    response = {'status': None, 'body': b''}
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.Future()  # the client never disconnects; the server cancels this wait
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            response['body'] += message.get('body', b'')
+
+    await application(scope, receive, send)
+    return response['status'], response['body']
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare in-process throughput of the read gateway against DRF views returning the same "
+        "payloads, through the ASGI application (no network or server involved)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help="Username to authenticate as (signed token).")
+        parser.add_argument('--event', type=int, help="Event id; defaults to the one with the most registrations.")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per endpoint.")
+        parser.add_argument('--concurrency', type=int, default=16)
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f"No user {options['user']!r}.")
+        registration = Registration.objects.order_by('-event__registration_count', 'id')
+        if options['event']:
+            registration = registration.filter(event_id=options['event'])
+        registration = registration.values('event_id', 'student_id').first()
+        if registration is None:
+            raise CommandError("Need an event with at least one registration.")
+        event_id, student_id = registration['event_id'], registration['student_id']
+
+        token, _ = issue_token(user)
+        headers = [('Authorization', f'Token {token}')]
+        prefix = gateway.gateway_settings()['PREFIX']
+        paths = [
+            ('event summary', f'/events/{event_id}/'),
+            ('live counts', f'/events/{event_id}/counts/'),
+            ('registration status', f'/events/{event_id}/students/{student_id}/'),
+        ]
+        application = gateway.with_gateway(get_asgi_application())
+
+        self.stdout.write(f"{'endpoint':<22}{'server':<10}{'req/s':>10}{'mean ms':>10}{'p95 ms':>10}")
+        with override_settings(ROOT_URLCONF=__name__, ALLOWED_HOSTS=['localhost']):
+            for name, tail in paths:
+                servers = (('gateway', prefix + tail), ('drf', DRF_PREFIX + tail))
+                payloads = {server: asyncio.run(self.fetch(application, url, headers)) for server, url in servers}
+                if payloads['gateway'] != payloads['drf']:
+                    raise CommandError(f"{name}: the gateway and DRF payloads differ: {payloads}")
+                for server, url in servers:
+                    rate, latencies = asyncio.run(self.run(
+                        application, url, headers, options['requests'], options['concurrency'],
+                    ))
+                    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+                    self.stdout.write(
+                        f"{name:<22}{server:<10}{rate:>10.0f}{statistics.mean(latencies) * 1000:>10.2f}{p95 * 1000:>10.2f}"
+                    )
+
+    @staticmethod
+    async def fetch(application, path, headers):
+        """The decoded payload of one request; also warms up caches and connections."""
+        status, body = await call_asgi(application, path, headers)
+        if status != 200:
+            raise CommandError(f"GET {path} returned {status}.")
+        return json.loads(body)
+
+    async def run(self, application, path, headers, total, concurrency):
+        latencies = []
+        remaining = iter(range(total))
+
+        async def client():
+            for _ in remaining:
+                started = time.perf_counter()
+                await call_asgi(application, path, headers)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started), latencies
@@ -0,0 +1,221 @@
+import re
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from event.models import Attendance, College, Event, Feedback, Registration
+
+TAG = 'bench'  # shares the seeded dataset with benchmark_endpoints
+
+# Findings that no index can remove, keyed by (request label, kind), with the reason they are acceptable.
+ACCEPTED = {
+    ('registered events', 'temp-sort'): "Orders one student's registrations by event start.",
+    ('registered events (upcoming)', 'temp-sort'): "Orders one student's registrations by event start.",
+    ('registered events (past)', 'temp-sort'): "Orders one student's registrations by event start.",
+    ('student lookup', 'temp-sort'): "Ranks full-text matches by relevance.",
+    ('event search', 'temp-sort'): "Ranks full-text matches by relevance.",
+    ('event-popularity (college)', 'temp-sort'): "Ranks one college's events.",
+    ('time-series (event)', 'temp-sort'): "Groups one event's rows by a computed time bucket.",
+    ('time-series (college)', 'temp-sort'): "Groups one college's rows by a computed time bucket.",
+}
+
+
+class PlanRecorder:
+    """A database execute wrapper that keeps the first occurrence of every distinct SELECT."""
+
+    def __init__(self):
+        self.label = None
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            self.statements.setdefault(sql, (self.label, context['connection'].alias, params))
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN every query the API viewsets and report endpoints issue against a seeded database, "
+        "and flag full table scans and temporary sorts. Seeds the 'bench' dataset if it is missing; "
+        "point EVENTORY_DB_NAME at a scratch file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--colleges', type=int, default=40, help="Dataset size when seeding.")
+        parser.add_argument('--students', type=int, default=20000, help="Dataset size when seeding.")
+        parser.add_argument('--events', type=int, default=2000, help="Dataset size when seeding.")
+        parser.add_argument('--seed', type=int, default=1, help="Dataset seed when seeding.")
+        parser.add_argument('--verbose-plans', action='store_true', help="Print the plan of every query.")
+
+    def handle(self, *args, **options):
+        if not College.objects.filter(code__startswith=f'{TAG}-').exists():
+            dataset = {key: options[key] for key in ('colleges', 'students', 'events', 'seed')}
+            self.stdout.write(f"Seeding dataset {dataset}...")
+            call_command('generate_dataset', tag=TAG, stdout=self.stdout, **dataset)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')  # give the planner real statistics
+
+        recorder = self.record()
+        findings = []
+        for sql, (label, alias, params) in recorder.statements.items():
+            plan, problems = self.explain(connections[alias], sql, params)
+            problems = [(table, kind) for table, kind in problems if (label, kind) not in ACCEPTED]
+            if problems or options['verbose_plans']:
+                self.stdout.write(f"\n[{label}] {sql[:300]}")
+                self.stdout.write('    ' + '\n    '.join(plan))
+            for table, kind in problems:
+                findings.append((label, table, kind))
+                self.stdout.write(self.style.ERROR(f"    -> {kind} on {table}"))
+
+        self.stdout.write(f"\nChecked {len(recorder.statements)} distinct queries.")
+        if findings:
+            raise CommandError(f"{len(findings)} query plan problems found.")
+        self.stdout.write(self.style.SUCCESS("No full scans or temporary sorts."))
+
+    def record(self):
+        """Issue every request once, inside a transaction that is rolled back, recording its SELECTs."""
+        # The most popular event that still has a free seat, so the register request succeeds.
+        event = Event.objects.filter(
+            college__code__startswith=f'{TAG}-', registration_count__lt=F('capacity'),
+        ).order_by('-registration_count', 'id').first()
+        if event is None:
+            raise CommandError("No seeded events.")
+        registration = Registration.objects.filter(event=event).order_by('id').first()
+        student = registration.student
+        attendee = Attendance.objects.filter(event=event, has_given_feedback=False).values_list('student_id', flat=True)
+        attendee = attendee.order_by('id').first()
+        feedback = Feedback.objects.filter(event=event).order_by('id').first()
+        User = get_user_model()
+
+        recorder = PlanRecorder()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            # Every report request must reach the database.
+            stack.enter_context(override_settings(
+                CACHES={**settings.CACHES, 'query-plans': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+                REPORTS_CACHE={**getattr(settings, 'REPORTS_CACHE', {}), 'ALIAS': 'query-plans'},
+            ))
+            stack.enter_context(transaction.atomic())
+            admin = Client(HTTP_HOST='localhost')
+            admin.force_login(User.objects.create_user(username='query-plans-admin', is_staff=True))
+            member = Client(HTTP_HOST='localhost')
+            member.force_login(User.objects.create_user(username='query-plans-student'))
+
+            requests = [
+                ('college list', admin.get, reverse('college-list'), None),
+                ('college detail', admin.get, reverse('college-detail', args=[event.college_id]), None),
+                ('student list', admin.get, reverse('student-list'), None),
+                ('student detail', admin.get, reverse('student-detail', args=[student.id]), None),
+                ('registered events', admin.get, reverse('student-registered-events', args=[student.id]), None),
+                ('registered events (upcoming)', admin.get,
+                 reverse('student-registered-events', args=[student.id]), {'when': 'upcoming'}),
+                ('registered events (past)', admin.get,
+                 reverse('student-registered-events', args=[student.id]), {'when': 'past'}),
+                ('registered students', admin.get, reverse('student-registered'), None),
+                ('student lookup', admin.get, reverse('student-lookup'), {'q': student.full_name[:4], 'event': event.id}),
+                ('event list', admin.get, reverse('event-list'), None),
+                ('event list (college, type)', admin.get, reverse('event-list'),
+                 {'college': event.college_id, 'type': event.type}),
+                ('event search', admin.get, reverse('event-list'), {'q': event.title.split()[0]}),
+                ('event detail', admin.get, reverse('event-detail', args=[event.id]), None),
+                ('event registrations', admin.get, reverse('event-registered-students', args=[event.id]), None),
+                ('event attendance', admin.get, reverse('event-attendance', args=[event.id]), None),
+                *[(f'export {dataset}', admin.get, reverse('event-export', args=[event.id, dataset]), None)
+                  for dataset in ('registrations', 'attendance', 'feedback')],
+                ('feedback list', admin.get, reverse('feedback-list'), None),
+                ('feedback list (event)', admin.get, reverse('feedback-list'), {'event': event.id}),
+                ('feedback list (student)', admin.get, reverse('feedback-list'), {'student': student.id}),
+                ('feedback detail', admin.get, reverse('feedback-detail', args=[feedback.id]), None),
+                ('register', member.post, reverse('event-register', args=[event.id]), {
+                    'name': "Query Plans", 'collegeid': event.college.code, 'email': "query-plans@example.com",
+                    'studentid': "QP-1", 'event_id': event.id,
+                }),
+                ('bulk attendance', member.post, reverse('event-attendance', args=[event.id]),
+                 {'students': [{'student_id': student.id, 'is_present': True}]}),
+                ('feedback', member.post, reverse('event-feedback', args=[event.id]),
+                 {'student': attendee, 'rating': 4, 'comment': "Good"}),
+                ('event metrics', admin.get, reverse('event-metrics', args=[event.id]), None),
+                ('event metrics (batch)', admin.get, reverse('event-metrics-batch'), {'college': event.college_id}),
+                ('event-popularity', admin.get, reverse('event-popularity'), None),
+                ('event-popularity (college)', admin.get, reverse('event-popularity'), {'college': event.college_id}),
+                ('student-participation', admin.get, reverse('student-participation', args=[student.id]), None),
+                ('top-students', admin.get, reverse('top-students'), {'college': event.college_id}),
+                ('top-students (all colleges)', admin.get, reverse('top-students'), None),
+                ('time-series (event)', admin.get, reverse('time-series'),
+                 {'metric': 'registrations', 'interval': 'day', 'event': event.id}),
+                ('time-series (college)', admin.get, reverse('time-series'),
+                 {'metric': 'checkins', 'interval': 'hour', 'college': event.college_id}),
+            ]
+            for label, method, url, data in requests:
+                recorder.label = label
+                if method.__name__ == 'post':
+                    response = method(url, data, content_type='application/json')
+                else:
+                    response = method(url, data)
+                if response.status_code >= 400:
+                    raise CommandError(f"{label}: {url} returned {response.status_code}: {response.content[:200]!r}")
+                if getattr(response, 'streaming', False):
+                    b''.join(response.streaming_content)
+            transaction.set_rollback(True)
+        return recorder
+
+    def explain(self, connection, sql, params):
+        """The plan as text lines, and the (table, kind) problems found in it."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                root = cursor.fetchone()[0][0]['Plan']
+                return self.postgres_plan(root)
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return self.sqlite_plan(cursor.fetchall(), sql)
+
+    @staticmethod
+    def sqlite_plan(rows, sql):
+        depth = {0: -1}
+        lines, problems = [], []
+        limited = bool(re.search(r'\bLIMIT\b', sql))
+        sorts = any('USE TEMP B-TREE' in detail for _, _, _, detail in rows)
+        for node, parent, _, detail in rows:
+            depth[node] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[node] + detail)
+            match = re.match(r'SCAN (\w+)', detail)
+            # An unsorted scan under a LIMIT stops early (the first page of a keyset list);
+            # full-text matches are index lookups even though SQLite reports them as a scan.
+            if match and ' USING ' not in detail and 'VIRTUAL TABLE' not in detail and not (limited and not sorts):
+                problems.append((match.group(1), 'full-scan'))
+            if 'USE TEMP B-TREE' in detail:
+                tables = re.findall(r'(?:SCAN|SEARCH) (\w+)', ' '.join(d for _, _, _, d in rows))
+                problems.append((tables[0] if tables else '?', 'temp-sort'))
+        return lines, problems
+
+    @staticmethod
+    def postgres_plan(root):
+        lines, problems = [], []
+
+        def walk(node, depth, limited):
+            relation = node.get('Relation Name', '')
+            lines.append('  ' * depth + f"{node['Node Type']} {relation}".rstrip())
+            if node['Node Type'] == 'Seq Scan' and not limited:
+                problems.append((relation, 'full-scan'))
+            if node['Node Type'] == 'Sort':
+                tables = list(walk_relations(node))
+                problems.append((tables[0] if tables else '?', 'temp-sort'))
+            for child in node.get('Plans', []):
+                walk(child, depth + 1, limited or node['Node Type'] == 'Limit')
+
+        def walk_relations(node):
+            if 'Relation Name' in node:
+                yield node['Relation Name']
+            for child in node.get('Plans', []):
+                yield from walk_relations(child)
+
+        walk(root, 0, False)
+        return lines, problems
@@ -0,0 +1,252 @@
+import datetime
+import math
+import random
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from event.models import (
+    Attendance, College, CollegeRegistrationCount, Event, EventStats, Feedback, Registration, Student,
+)
+
+# Relative share of each event type, and the share of its registrants who turn up.
+EVENT_TYPES = {
+    Event.EventType.WORKSHOP: (30, 0.80),
+    Event.EventType.SEMINAR: (25, 0.65),
+    Event.EventType.TECHTALK: (20, 0.70),
+    Event.EventType.HACKATHON: (15, 0.85),
+    Event.EventType.FEST: (10, 0.55),
+}
+CAPACITIES = ([50, 100, 200, 500, 1000], [25, 35, 25, 10, 5])
+TOPICS = [
+    "Machine Learning", "Cloud Native", "Robotics", "Startups", "Design Systems", "Cyber Security",
+    "Data Science", "Open Source", "Quantum Computing", "Product Management", "Web3", "Embedded Systems",
+]
+FIRST_NAMES = [
+    "Aarav", "Diya", "Ishaan", "Ananya", "Vihaan", "Saanvi", "Arjun", "Meera", "Kabir", "Riya",
+    "Rohan", "Priya", "Aditya", "Kavya", "Siddharth", "Nisha", "Rahul", "Pooja", "Karan", "Sneha",
+]
+LAST_NAMES = [
+    "Sharma", "Patel", "Iyer", "Reddy", "Gupta", "Nair", "Singh", "Das", "Menon", "Joshi",
+    "Kulkarni", "Banerjee", "Chopra", "Rao", "Mehta", "Bose", "Kapoor", "Pillai", "Verma", "Shah",
+]
+HOME_COLLEGE_SHARE = 0.8  # registrants from the host college
+PRESENT_RATE = 0.92  # checked-in attendees marked present
+FEEDBACK_RATE = 0.35  # present attendees who leave feedback
+STATS_FIELDS = (
+    'registrations', 'attendance_count', 'present_count', 'feedback_count', 'rating_sum',
+    'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5',
+)
+
+
+class Writer:
+    """Buffers rows per model and inserts them batch_size at a time, one transaction per batch.
+
+    Rows are plain tuples in the order of ``columns``. Building millions of model instances
+    and running each value through bulk_create's pre_save/prepare steps costs several times
+    the INSERT itself, so rows go straight to the cursor: COPY on PostgreSQL (as in
+    ``event.imports``), executemany elsewhere.
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.columns = {}
+        self.buffers = {}
+        self.counts = Counter()
+
+    def table(self, model, *columns):
+        self.columns[model] = [model._meta.get_field(name) for name in columns]
+        self.buffers[model] = []
+
+    def add(self, model, row):
+        buffer = self.buffers[model]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model=None):
+        for model in [model] if model else list(self.buffers):
+            buffer = self.buffers[model]
+            if buffer:
+                with transaction.atomic():
+                    self.insert(model, buffer)
+                self.counts[model.__name__] += len(buffer)
+                buffer.clear()
+
+    def insert(self, model, rows):
+        fields = self.columns[model]
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                with cursor.cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                return
+            # Ids, numbers, booleans and strings go in as they are; only datetimes need adapting.
+            datetimes = [i for i, field in enumerate(fields) if field.get_internal_type() == 'DateTimeField']
+            if datetimes:
+                adapt = connection.ops.adapt_datetimefield_value
+                rows = [list(row) for row in rows]
+                for row in rows:
+                    for i in datetimes:
+                        row[i] = adapt(row[i])
+            placeholders = ', '.join(['%s'] * len(fields))
+            cursor.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic dataset: colleges of skewed sizes, events with long-tailed popularity "
+        "(capped by capacity), type-dependent attendance and per-event rating spread. "
+        "The same --seed always produces the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--colleges', type=int, default=50)
+        parser.add_argument('--students', type=int, default=25000)
+        parser.add_argument('--events', type=int, default=1000)
+        parser.add_argument('--avg-registrations', type=int, default=150,
+                            help="Mean registrations per event before capacity caps it.")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--start', default='2024-01-01',
+                            help="Events are spread over the year starting on this date.")
+        parser.add_argument('--tag', default='syn', help="Prefix for college codes, so datasets can coexist.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        tag = options['tag']
+        if College.objects.filter(code__startswith=f'{tag}-').exists():
+            raise CommandError(f"Colleges tagged {tag!r} already exist; pick another --tag.")
+        start = datetime.datetime.fromisoformat(options['start']).replace(tzinfo=datetime.timezone.utc)
+        writer = Writer(options['batch_size'])
+        writer.table(Student, 'college', 'full_name', 'email', 'roll_no', 'attendance_count')
+        writer.table(Registration, 'event', 'student', 'college_registered_count', 'created_at')
+        writer.table(CollegeRegistrationCount, 'event', 'college', 'registration_count')
+        writer.table(Attendance, 'event', 'student', 'college', 'is_present', 'has_given_feedback', 'checked_in_at')
+        writer.table(Feedback, 'event', 'student', 'rating', 'comment', 'created_at')
+        writer.table(EventStats, 'event', *STATS_FIELDS)
+        started = time.perf_counter()
+
+        colleges = self.create_colleges(rng, tag, options['colleges'], options['students'])
+        students_by_college = self.create_students(rng, colleges, writer)
+        all_students = [sid for ids in students_by_college.values() for sid in ids]
+        if not all_students:
+            raise CommandError("Need at least one student.")
+        college_of = {sid: college_id for college_id, ids in students_by_college.items() for sid in ids}
+        events = self.create_events(rng, colleges, options['events'], start, options['avg_registrations'], len(all_students))
+
+        for event in events:
+            self.populate_event(rng, event, students_by_college[event.college_id], all_students, college_of, writer)
+        writer.flush()
+        # Attendance is written after the students it counts, so their counters are filled in last.
+        attended = (
+            Attendance.objects.filter(student=OuterRef('pk')).order_by()
+            .values('student').annotate(total=Count('pk')).values('total')
+        )
+        with transaction.atomic():
+            Student.objects.filter(college__in=colleges).update(attendance_count=Coalesce(Subquery(attended), 0))
+
+        elapsed = time.perf_counter() - started
+        summary = ', '.join(f"{count} {name}" for name, count in writer.counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(colleges)} colleges, {len(events)} events, {summary} in {elapsed:.1f}s."
+        ))
+
+    def create_colleges(self, rng, tag, count, students):
+        # Zipf-like sizes: a few large universities, a long tail of small colleges.
+        weights = [1 / (rank + 1) ** 0.8 for rank in range(count)]
+        sizes = [int(students * w / sum(weights)) for w in weights]
+        sizes[0] += students - sum(sizes)
+        colleges = [
+            College(name=f"{tag.upper()} College {i:04d}", code=f"{tag}-{i:04d}",
+                    location=rng.choice(["Pune", "Bengaluru", "Chennai", "Delhi", "Hyderabad", "Kolkata"]),
+                    tot_students=size)
+            for i, size in enumerate(sizes)
+        ]
+        with transaction.atomic():
+            return College.objects.bulk_create(colleges)
+
+    def create_students(self, rng, colleges, writer):
+        for college in colleges:
+            for n in range(college.tot_students):
+                writer.add(Student, (
+                    college.id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    f"student{n}@{college.code}.edu", f"{college.code.upper()}-{n:06d}", 0,
+                ))
+        writer.flush()
+        students_by_college = {college.id: [] for college in colleges}
+        for sid, college_id in Student.objects.filter(college__in=colleges).order_by('id').values_list('id', 'college_id'):
+            students_by_college[college_id].append(sid)
+        return students_by_college
+
+    def create_events(self, rng, colleges, count, start, avg_registrations, student_count):
+        mu = math.log(max(avg_registrations, 1)) - 0.5  # lognormal(mu, 1) has mean avg_registrations
+        types, weights = zip(*((t, w) for t, (w, _) in EVENT_TYPES.items()))
+        hosts = rng.choices(colleges, weights=[c.tot_students + 1 for c in colleges], k=count)
+        events = []
+        for n, college in enumerate(hosts):
+            event_type = rng.choices(types, weights=weights)[0]
+            start_at = start + datetime.timedelta(days=rng.uniform(0, 365))
+            start_at = start_at.replace(minute=0, second=0, microsecond=0)
+            capacity = rng.choices(*CAPACITIES)[0]
+            # Long-tailed demand; popular events fill up.
+            registrations = min(capacity, int(rng.lognormvariate(mu, 1.0)), student_count)
+            events.append(Event(
+                college=college, type=event_type, start_at=start_at,
+                end_at=start_at + datetime.timedelta(hours=rng.choice([1, 2, 3, 8, 24])),
+                title=f"{rng.choice(TOPICS)} {event_type.label} #{n}",
+                capacity=capacity, registration_count=registrations,
+            ))
+        with transaction.atomic():
+            return Event.objects.bulk_create(events, batch_size=1000)
+
+    def populate_event(self, rng, event, home, all_students, college_of, writer):
+        target = event.registration_count
+        chosen = set(rng.sample(home, min(len(home), round(target * HOME_COLLEGE_SHARE))))
+        while len(chosen) < target:
+            chosen.add(rng.choice(all_students))
+        registrants = sorted(chosen)
+        rng.shuffle(registrants)
+
+        per_college = Counter()
+        stats = dict.fromkeys(STATS_FIELDS, 0)
+        stats['registrations'] = len(registrants)
+        # Registrations open up to 30 days ahead and bunch up close to the start.
+        signup_times = sorted(
+            event.start_at - datetime.timedelta(days=30 * rng.betavariate(1.2, 4)) for _ in registrants
+        )
+        for student_id, created_at in zip(registrants, signup_times):
+            college_id = college_of[student_id]
+            per_college[college_id] += 1
+            writer.add(Registration, (event.id, student_id, per_college[college_id], created_at))
+        for college_id, count in per_college.items():
+            writer.add(CollegeRegistrationCount, (event.id, college_id, count))
+
+        base_rate = EVENT_TYPES[event.type][1]
+        turnout = min(1.0, max(0.0, rng.gauss(base_rate, 0.1)))
+        quality = rng.gauss(0, 0.7)  # some events are simply better received than others
+        for student_id in registrants[:round(len(registrants) * turnout)]:
+            college_id = college_of[student_id]
+            present = rng.random() < PRESENT_RATE
+            gave_feedback = present and rng.random() < FEEDBACK_RATE
+            writer.add(Attendance, (
+                event.id, student_id, college_id, present, gave_feedback,
+                event.start_at + datetime.timedelta(minutes=rng.uniform(-20, 45)),
+            ))
+            stats['attendance_count'] += 1
+            stats['present_count'] += present
+            if gave_feedback:
+                rating = min(5, max(1, round(rng.gauss(3.9 + quality, 0.9))))
+                writer.add(Feedback, (
+                    event.id, student_id, rating, '', event.end_at + datetime.timedelta(hours=rng.uniform(0, 48)),
+                ))
+                stats['feedback_count'] += 1
+                stats['rating_sum'] += rating
+                stats[f'rating_{rating}'] += 1
+        writer.add(EventStats, (event.id, *stats.values()))
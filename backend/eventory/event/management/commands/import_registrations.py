@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from event.imports import BulkImport, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import students and registrations from a CSV or NDJSON file (name, collegeid, email, studentid, event_id)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help="Defaults to the file extension.")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist.")
+        file_format = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'ndjson')
+
+        with path.open('rb') as stream:
+            report = BulkImport(chunk_size=options['chunk_size']).run(read_rows(stream, file_format))
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {report['processed']} rows: {report['students_upserted']} students upserted, "
+            f"{report['registrations_created']} registrations created, {report['error_count']} errors."
+        ))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from event.admission import AdmissionQueue, queue_settings
+
+
+class Command(BaseCommand):
+    help = "Admit queued registration tickets in FIFO batches (run with REGISTRATION_QUEUE['WORKER_THREAD'] = False)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            processed = AdmissionQueue.process_pending(options['batch_size'])
+            if processed:
+                self.stdout.write(f"Processed {processed} tickets.")
+            if options['once']:
+                return
+            time.sleep(queue_settings()['POLL_INTERVAL'])
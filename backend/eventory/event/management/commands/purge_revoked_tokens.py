@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from event.authentication import purge_expired_revocations
+
+
+class Command(BaseCommand):
+    help = "Delete revocations of API tokens that have expired anyway (logouts also purge them)."
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_revocations()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired token revocations."))
@@ -0,0 +1,54 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from event.models import Attendance, Event, EventStats, Feedback, Registration
+
+
+class Command(BaseCommand):
+    help = "Recompute the EventStats rollup from the Registration, Attendance and Feedback tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, action='append', dest='events', help="Only rebuild these event ids.")
+
+    def handle(self, *args, **options):
+        event_ids = options['events']
+
+        def grouped(model):
+            qs = model.objects.order_by()
+            if event_ids:
+                qs = qs.filter(event_id__in=event_ids)
+            return qs.values('event_id')
+
+        with transaction.atomic():
+            stale = EventStats.objects.all()
+            if event_ids:
+                stale = stale.filter(event_id__in=event_ids)
+            # Writers update these rows in the transaction that adds or removes the rows they
+            # count, so holding them makes the counts below and the rows written agree.
+            list(stale.select_for_update().values_list('pk', flat=True))
+
+            # Every event gets a row, including those with nothing to count yet.
+            events = Event.objects.filter(id__in=event_ids) if event_ids else Event.objects.all()
+            rows = defaultdict(dict, {event_id: {} for event_id in events.values_list('id', flat=True).iterator()})
+            for row in grouped(Registration).annotate(registrations=Count('pk')):
+                rows[row.pop('event_id')].update(row)
+            for row in grouped(Attendance).annotate(
+                attendance_count=Count('pk'), present_count=Count('pk', filter=Q(is_present=True))
+            ):
+                rows[row.pop('event_id')].update(row)
+            for row in grouped(Feedback).annotate(
+                feedback_count=Count('pk'),
+                rating_sum=Sum('rating'),
+                **{f'rating_{rating}': Count('pk', filter=Q(rating=rating)) for rating in range(1, 6)},
+            ):
+                rows[row.pop('event_id')].update(row)
+
+            stale.delete()
+            EventStats.objects.bulk_create(
+                [EventStats(event_id=event_id, **values) for event_id, values in rows.items()],
+                batch_size=1000,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {len(rows)} events."))
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from event.models import Attendance, CollegeRegistrationCount, Event, Registration, Student
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized registration counters from the Registration table and "
+        "Student.attendance_count from the Attendance table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without writing anything.")
+
+    @staticmethod
+    def attended():
+        """Each student's actual number of attendance rows, as an expression on Student."""
+        return Coalesce(
+            Subquery(
+                Attendance.objects.filter(student=OuterRef('pk')).order_by()
+                .values('student').annotate(total=Count('pk')).values('total')
+            ),
+            0,
+            output_field=IntegerField(),
+        )
+
+    def handle(self, *args, **options):
+        actual = Coalesce(
+            Subquery(
+                Registration.objects.filter(event=OuterRef('pk')).order_by()
+                .values('event').annotate(total=Count('pk')).values('total')
+            ),
+            0,
+            output_field=IntegerField(),
+        )
+        drifted = Event.objects.annotate(actual=actual).exclude(registration_count=F('actual')).count()
+
+        per_college = {
+            (row['event_id'], row['student__college_id']): row['total']
+            for row in Registration.objects.order_by()
+            .values('event_id', 'student__college_id').annotate(total=Count('pk'))
+        }
+        stored = {
+            (c.event_id, c.college_id): c.registration_count
+            for c in CollegeRegistrationCount.objects.all()
+        }
+        college_drift = sum(
+            1 for key in per_college.keys() | stored.keys() if per_college.get(key, 0) != stored.get(key, 0)
+        )
+
+        attended = self.attended()
+        student_drift = Student.objects.annotate(actual=attended).exclude(attendance_count=F('actual')).count()
+
+        self.stdout.write(f"Events with drifted registration_count: {drifted}")
+        self.stdout.write(f"Drifted (event, college) counters: {college_drift}")
+        self.stdout.write(f"Students with drifted attendance_count: {student_drift}")
+        if options['dry_run']:
+            return
+
+        with transaction.atomic():
+            if drifted:
+                Event.objects.update(registration_count=actual)
+            if college_drift:
+                CollegeRegistrationCount.objects.all().delete()
+                CollegeRegistrationCount.objects.bulk_create(
+                    [
+                        CollegeRegistrationCount(event_id=event_id, college_id=college_id, registration_count=total)
+                        for (event_id, college_id), total in per_college.items()
+                    ],
+                    batch_size=1000,
+                )
+            if student_drift:
+                Student.objects.update(attendance_count=attended)
+        self.stdout.write(self.style.SUCCESS("Counters reconciled."))
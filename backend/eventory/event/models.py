@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 class College(models.Model):
@@ -16,10 +17,17 @@ class Student(models.Model):
     full_name = models.CharField(max_length=255)
     email = models.EmailField()
     roll_no = models.CharField(max_length=64)
+    # Attendance rows for this student, kept in step by EventStatsService.record_attendance
+    # (and reconcile_counters) so top_students ranks on an index instead of counting.
+    attendance_count = models.PositiveIntegerField(default=0)
 
 
     class Meta:
         unique_together = ('college', 'email')
+        indexes = [
+            models.Index(fields=['college', '-attendance_count', 'full_name']),
+            models.Index(fields=['-attendance_count', 'full_name']),
+        ]
 
 
     def __str__(self):
@@ -65,7 +73,49 @@ class Registration(models.Model):
 
     class Meta:
         unique_together = ('event', 'student')
-        indexes = [models.Index(fields=['event']), models.Index(fields=['student'])]
+        # (fk, id) keeps per-event/per-student keyset pages ordered straight off the index.
+        indexes = [
+            models.Index(fields=['event', 'id']),
+            models.Index(fields=['student', 'id']),
+            models.Index(fields=['event', 'created_at']),
+        ]
+
+class CollegeRegistrationCount(models.Model):
+    """Running number of registrations per (event, college), maintained by RegistrationService."""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='college_counts')
+    college = models.ForeignKey(College, on_delete=models.CASCADE, related_name='event_counts')
+    registration_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('event', 'college')
+
+class RegistrationTicket(models.Model):
+    """A registration request waiting in the admission queue (see event/admission.py)."""
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        ADMITTED = 'ADMITTED', 'Admitted'
+        WAITLISTED = 'WAITLISTED', 'Waitlisted'
+        REJECTED = 'REJECTED', 'Rejected'
+        FAILED = 'FAILED', 'Failed'
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='tickets')
+    # Only this user (or staff) may poll the ticket.
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+    college_code = models.CharField(max_length=50)
+    full_name = models.CharField(max_length=255)
+    email = models.EmailField()
+    roll_no = models.CharField(max_length=64)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    registration = models.OneToOneField(Registration, null=True, blank=True, on_delete=models.SET_NULL)
+    waitlist_position = models.PositiveIntegerField(null=True, blank=True)
+    detail = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'id'])]
 
 class Attendance(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='attendances')
@@ -77,7 +127,11 @@ class Attendance(models.Model):
 
     class Meta:
         unique_together = ('event', 'student')
-        indexes = [models.Index(fields=['event']), models.Index(fields=['student'])]
+        indexes = [
+            models.Index(fields=['event', 'id']),
+            models.Index(fields=['student', 'id']),
+            models.Index(fields=['event', 'checked_in_at']),
+        ]
 
 class Feedback(models.Model):
     from django.core.validators import MinValueValidator, MaxValueValidator
@@ -90,4 +144,68 @@ class Feedback(models.Model):
 
     class Meta:
         unique_together = ('event', 'student')
-        indexes = [models.Index(fields=['event'])]
+        indexes = [
+            models.Index(fields=['event', 'id']),
+            models.Index(fields=['student', 'id']),
+            # Covers the per-event rating average in the event list.
+            models.Index(fields=['event', 'rating']),
+        ]
+
+
+class EventStats(models.Model):
+    """Per-event rollup of registrations, attendance and feedback, maintained by EventStatsService."""
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    registrations = models.IntegerField(default=0)
+    attendance_count = models.IntegerField(default=0)
+    present_count = models.IntegerField(default=0)
+    feedback_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    rating_1 = models.IntegerField(default=0)
+    rating_2 = models.IntegerField(default=0)
+    rating_3 = models.IntegerField(default=0)
+    rating_4 = models.IntegerField(default=0)
+    rating_5 = models.IntegerField(default=0)
+
+    class Meta:
+        # Popularity ranks events straight off this index (see ReportsService.event_popularity_queryset).
+        indexes = [models.Index(fields=['-registrations', '-event'])]
+
+    @property
+    def average_rating(self):
+        return self.rating_sum / self.feedback_count if self.feedback_count else 0.0
+
+    @property
+    def rating_histogram(self):
+        return {rating: getattr(self, f'rating_{rating}') for rating in range(1, 6)}
+
+
+class EventTimeBucket(models.Model):
+    """Frozen registration/check-in counts per time bucket for a finished event.
+
+    An event frozen without any registrations/check-ins gets a single count=0 row so it is
+    not frozen again.
+    """
+    class Metric(models.TextChoices):
+        REGISTRATIONS = 'registrations', 'Registrations'
+        CHECKINS = 'checkins', 'Check-ins'
+
+    class Interval(models.TextChoices):
+        MINUTE = 'minute', 'Minute'
+        HOUR = 'hour', 'Hour'
+        DAY = 'day', 'Day'
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='time_buckets')
+    metric = models.CharField(max_length=16, choices=Metric.choices)
+    interval = models.CharField(max_length=8, choices=Interval.choices)
+    bucket = models.DateTimeField()
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ('event', 'metric', 'interval', 'bucket')
+
+
+class RevokedToken(models.Model):
+    """A signed API token that was revoked before it expired (see event/authentication.py)."""
+    jti = models.CharField(max_length=32, unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='revoked_tokens')
+    expires_at = models.DateTimeField(db_index=True)
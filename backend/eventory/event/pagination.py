@@ -0,0 +1,122 @@
+import datetime
+import json
+from functools import reduce
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+
+
+class _PositionEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()  # DjangoJSONEncoder drops the microseconds
+        return super().default(o)
+
+
+class KeysetPagination(CursorPagination):
+    """Default pagination for every list endpoint.
+
+    Cursor (keyset) pages filter on the ordering column instead of using OFFSET, so
+    page N costs the same as page 1 as long as the ordering is backed by an index.
+
+    DRF's cursor only records the first ordering field and steps over rows that tie on
+    it with OFFSET, which is slow on popular ties and skips or repeats rows when the
+    value changes between pages. Here the cursor records every ordering field of the
+    last row and pages filter on the whole tuple; orderings end in a unique field (id)
+    so that tuple is unique.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = 'id'
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=cursor.offset, reverse=cursor.reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        if isinstance(cursor.position, list):
+            cursor = Cursor(
+                offset=cursor.offset, reverse=cursor.reverse,
+                position=json.dumps(cursor.position, cls=_PositionEncoder),
+            )
+        return super().encode_cursor(cursor)
+
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [order.lstrip('-') for order in ordering]
+        if isinstance(instance, dict):
+            return [instance[field] for field in fields]
+        return [getattr(instance, field) for field in fields]
+
+    def position_filter(self, position, reverse):
+        """Rows after ``position`` in the (possibly reversed) ordering, as one Q."""
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        fields = [(order.lstrip('-'), 'lt' if order.startswith('-') else 'gt') for order in ordering]
+        # (a > x) OR (a = x AND b > y) OR ..., plus a redundant bound on the first field
+        # so the index range scan starts at the cursor.
+        branches = [
+            Q(**{f'{field}__{op}': value}, **{name: equal for (name, _), equal in zip(fields[:i], position[:i])})
+            for i, ((field, op), value) in enumerate(zip(fields, position))
+        ]
+        first, op = fields[0]
+        return Q(**{f'{first}__{op}e': position[0]}) & reduce(Q.__or__, branches)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # CursorPagination.paginate_queryset, filtering on the full position tuple. Positions
+        # are unique, so the offset DRF keeps for ties is always 0 and is not applied.
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse, current_position = (False, None) if self.cursor is None else self.cursor[1:]
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if current_position is not None:
+            queryset = queryset.filter(self.position_filter(current_position, reverse))
+
+        # One extra row tells whether another page follows.
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = (
+            self._get_position_from_instance(results[-1], self.ordering) if len(results) > len(self.page) else None
+        )
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = current_position is not None, current_position
+            self.has_previous, self.previous_position = following_position is not None, following_position
+        else:
+            self.has_next, self.next_position = following_position is not None, following_position
+            self.has_previous, self.previous_position = current_position is not None, current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+
+
+class StudentTimelinePagination(KeysetPagination):
+    max_page_size = 200
+    ordering = ('start_at', 'id')
+
+
+class EventPopularityPagination(KeysetPagination):
+    ordering = ('-reg_count', '-id')
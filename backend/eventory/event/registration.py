@@ -0,0 +1,102 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from event.models import CollegeRegistrationCount, Event, Registration, Student
+from event.signals import report_data_changed
+
+
+class RegistrationError(Exception):
+    def __init__(self, field, message):
+        super().__init__(message)
+        self.field = field
+        self.message = message
+
+
+class EventFullError(RegistrationError):
+    def __init__(self):
+        super().__init__('detail', 'Event is at full capacity.')
+
+
+class RegistrationService:
+    @staticmethod
+    def register(event_id, college, email, full_name, roll_no):
+        """Register a student for an event in one short transaction.
+
+        Capacity is reserved with a conditional UPDATE on the event row, so concurrent
+        requests can never oversell it or lose increments.
+        """
+        with transaction.atomic():
+            student, created = Student.objects.get_or_create(
+                email=email,
+                college=college,
+                defaults={'full_name': full_name, 'roll_no': roll_no}
+            )
+            if not created and (student.full_name, student.roll_no) != (full_name, roll_no):
+                # Update details if student exists
+                student.full_name = full_name
+                student.roll_no = roll_no
+                student.save(update_fields=['full_name', 'roll_no'])
+
+            event_college_id = Event.objects.filter(id=event_id).values_list('college_id', flat=True).first()
+            if event_college_id is None:
+                raise RegistrationError('event_id', 'Event not found.')
+            if Registration.objects.filter(event_id=event_id, student=student).exists():
+                raise RegistrationError('detail', 'Student already registered for this event.')
+
+            try:
+                with transaction.atomic():
+                    RegistrationService.reserve_seats(event_id, 1)
+                    college_count = RegistrationService.increment_college_count(event_id, college.id, 1)
+                    registration = Registration(
+                        event_id=event_id, student=student, college_registered_count=college_count
+                    )
+                    registration._seat_reserved = True  # counted above, not again by the post_save signal
+                    registration.save(force_insert=True)
+                    report_data_changed.send(
+                        sender=Registration, event_ids=[event_id], college_ids=[event_college_id, college.id]
+                    )
+                    return registration
+            except IntegrityError:
+                # Lost a race with a concurrent request for the same student; the savepoint
+                # rollback has already released the reserved seat.
+                raise RegistrationError('detail', 'Student already registered for this event.')
+
+    @staticmethod
+    def reserve_seats(event_id, seats):
+        """Atomically take ``seats`` places on the event or raise if it does not have them."""
+        reserved = Event.objects.filter(
+            id=event_id, registration_count__lte=F('capacity') - seats
+        ).update(registration_count=F('registration_count') + seats)
+        if not reserved:
+            raise EventFullError()
+
+    @staticmethod
+    def reserve_up_to(event_id, seats):
+        """Take as many of ``seats`` places as the event has left and return how many were taken."""
+        while True:
+            remaining = Event.objects.select_for_update().filter(id=event_id).values_list(
+                F('capacity') - F('registration_count'), flat=True
+            ).get()
+            granted = max(0, min(seats, remaining))
+            if not granted:
+                return 0
+            try:
+                RegistrationService.reserve_seats(event_id, granted)
+                return granted
+            except EventFullError:
+                continue  # another writer took seats between the read and the update
+
+    @staticmethod
+    def increment_college_count(event_id, college_id, amount):
+        """Bump the (event, college) counter and return its new value. Must run inside a transaction."""
+        counter = CollegeRegistrationCount.objects.filter(event_id=event_id, college_id=college_id)
+        if not counter.update(registration_count=F('registration_count') + amount):
+            try:
+                with transaction.atomic():
+                    CollegeRegistrationCount.objects.create(
+                        event_id=event_id, college_id=college_id, registration_count=amount
+                    )
+                return amount
+            except IntegrityError:
+                counter.update(registration_count=F('registration_count') + amount)
+        return counter.values_list('registration_count', flat=True).get()
@@ -0,0 +1,186 @@
+import re
+
+from django.db import connection, connections, router
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from event.models import Event, Registration, Student
+
+EVENT_TABLE = Event._meta.db_table
+FTS_TABLE = f'{EVENT_TABLE}_fts'
+STUDENT_TABLE = Student._meta.db_table
+STUDENT_FTS_TABLE = f'{STUDENT_TABLE}_fts'
+REGISTRATION_TABLE = Registration._meta.db_table
+
+# Postgres: a generated, weighted tsvector column (title A, description B) with a GIN index.
+POSTGRES_DDL = [
+    f"""ALTER TABLE {EVENT_TABLE} ADD COLUMN IF NOT EXISTS search_document tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED""",
+    f"CREATE INDEX IF NOT EXISTS {EVENT_TABLE}_search_gin ON {EVENT_TABLE} USING gin (search_document)",
+    # Trigram indexes serve the check-in desk's substring lookups on name, roll number and email.
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS {STUDENT_TABLE}_name_trgm ON {STUDENT_TABLE} USING gin (full_name gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS {STUDENT_TABLE}_roll_trgm ON {STUDENT_TABLE} USING gin (roll_no gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS {STUDENT_TABLE}_email_trgm ON {STUDENT_TABLE} USING gin (email gin_trgm_ops)",
+]
+
+# SQLite: an FTS5 shadow table keyed by event id, kept in step by triggers.
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(title, description, tokenize='porter unicode61')",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {EVENT_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON {EVENT_TABLE} BEGIN
+        UPDATE {FTS_TABLE} SET title = new.title, description = new.description WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {EVENT_TABLE} BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    # Backfill events that predate the shadow table.
+    f"""INSERT INTO {FTS_TABLE}(rowid, title, description)
+        SELECT id, title, description FROM {EVENT_TABLE} WHERE id NOT IN (SELECT rowid FROM {FTS_TABLE})""",
+    # Students: prefix-indexed FTS5 table so typeahead prefixes are index lookups, not LIKE scans.
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {STUDENT_FTS_TABLE}
+        USING fts5(full_name, roll_no, email, tokenize='unicode61', prefix='1 2 3')""",
+    f"""CREATE TRIGGER IF NOT EXISTS {STUDENT_FTS_TABLE}_ai AFTER INSERT ON {STUDENT_TABLE} BEGIN
+        INSERT INTO {STUDENT_FTS_TABLE}(rowid, full_name, roll_no, email)
+        VALUES (new.id, new.full_name, new.roll_no, new.email);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {STUDENT_FTS_TABLE}_au AFTER UPDATE OF full_name, roll_no, email ON {STUDENT_TABLE} BEGIN
+        UPDATE {STUDENT_FTS_TABLE} SET full_name = new.full_name, roll_no = new.roll_no, email = new.email
+        WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {STUDENT_FTS_TABLE}_ad AFTER DELETE ON {STUDENT_TABLE} BEGIN
+        DELETE FROM {STUDENT_FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""INSERT INTO {STUDENT_FTS_TABLE}(rowid, full_name, roll_no, email)
+        SELECT id, full_name, roll_no, email FROM {STUDENT_TABLE} WHERE id NOT IN (SELECT rowid FROM {STUDENT_FTS_TABLE})""",
+]
+
+
+def ensure_search_index(using='default', **kwargs):
+    """post_migrate hook: create the vendor-specific search structures if they are missing."""
+    from django.db import connections
+    conn = connections[using]
+    statements = {'postgresql': POSTGRES_DDL, 'sqlite': SQLITE_DDL}.get(conn.vendor, [])
+    if statements and EVENT_TABLE in conn.introspection.table_names():
+        with conn.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def search_events(queryset, query):
+    """Filter ``queryset`` to events matching ``query`` and annotate ``search_rank`` (higher is better)."""
+    if connection.vendor == 'postgresql':
+        tsquery = "websearch_to_tsquery('english', %s)"
+        return queryset.alias(
+            search_match=RawSQL(f"{EVENT_TABLE}.search_document @@ {tsquery}", (query,), output_field=BooleanField())
+        ).filter(search_match=True).annotate(
+            search_rank=RawSQL(f"ts_rank_cd({EVENT_TABLE}.search_document, {tsquery})", (query,), output_field=FloatField())
+        )
+
+    if connection.vendor == 'sqlite':
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return queryset.none()
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,))
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, 2.0, 1.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = {EVENT_TABLE}.id",
+                (match,),
+                output_field=FloatField(),
+            )
+        )
+
+    return queryset.filter(Q(title__icontains=query) | Q(description__icontains=query)).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    )
+
+
+def search_students(queryset, query):
+    """Filter ``queryset`` to students whose name, roll number or email match ``query``.
+
+    Uses the same indexes and ranking as ``lookup_students`` but returns a queryset,
+    annotated with ``search_rank`` (higher is better), for callers that page through
+    every match, such as the admin.
+    """
+    if connection.vendor == 'sqlite':
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return queryset.none()
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {STUDENT_FTS_TABLE} WHERE {STUDENT_FTS_TABLE} MATCH %s", (match,))
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({STUDENT_FTS_TABLE}) FROM {STUDENT_FTS_TABLE} "
+                f"WHERE {STUDENT_FTS_TABLE} MATCH %s AND rowid = {STUDENT_TABLE}.id",
+                (match,),
+                output_field=FloatField(),
+            )
+        )
+    # On Postgres the trigram GIN indexes serve these ILIKE '%...%' filters.
+    matches = queryset.filter(Q(full_name__icontains=query) | Q(roll_no__icontains=query) | Q(email__icontains=query))
+    if connection.vendor == 'postgresql':
+        return matches.annotate(search_rank=RawSQL(
+            f"greatest(similarity({STUDENT_TABLE}.full_name, %s), similarity({STUDENT_TABLE}.roll_no, %s), "
+            f"similarity({STUDENT_TABLE}.email, %s))",
+            (query,) * 3,
+            output_field=FloatField(),
+        ))
+    return matches.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def lookup_students(query, event_id=None, limit=10):
+    """Top ``limit`` students whose name, roll number or email match ``query``, best first.
+
+    Returns dicts with id, full_name, roll_no, email and college_id. Runs as one
+    index-backed statement: trigram GIN indexes on Postgres, the FTS5 prefix index on
+    SQLite. ``event_id`` restricts matches to that event's registrations. Reads go
+    wherever Student reads are routed, so the read replica serves them when enabled.
+    """
+    db = router.db_for_read(Student)
+    conn = connections[db]
+    columns = ['id', 'full_name', 'roll_no', 'email', 'college_id']
+    select = ', '.join(f's.{column}' for column in columns)
+    registered = (
+        f" JOIN {REGISTRATION_TABLE} r ON r.student_id = s.id AND r.event_id = %s" if event_id else ""
+    )
+    event_params = [event_id] if event_id else []
+
+    if conn.vendor == 'postgresql':
+        escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        pattern = f"%{escaped}%"
+        sql = (
+            f"SELECT {select} FROM {STUDENT_TABLE} s{registered} "
+            "WHERE s.full_name ILIKE %s OR s.roll_no ILIKE %s OR s.email ILIKE %s "
+            "ORDER BY greatest(similarity(s.full_name, %s), similarity(s.roll_no, %s), similarity(s.email, %s)) DESC, s.id "
+            "LIMIT %s"
+        )
+        params = event_params + [pattern] * 3 + [query] * 3 + [limit]
+    elif conn.vendor == 'sqlite':
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return []
+        sql = (
+            f"SELECT {select} FROM {STUDENT_FTS_TABLE} f JOIN {STUDENT_TABLE} s ON s.id = f.rowid{registered} "
+            f"WHERE {STUDENT_FTS_TABLE} MATCH %s ORDER BY f.rank, s.id LIMIT %s"
+        )
+        params = event_params + [' '.join(f'"{term}"*' for term in terms), limit]
+    else:
+        students = Student.objects.using(db).filter(
+            Q(full_name__icontains=query) | Q(roll_no__icontains=query) | Q(email__icontains=query)
+        )
+        if event_id:
+            students = students.filter(registrations__event_id=event_id)
+        return list(students.order_by('id').values(*columns)[:limit])
+
+    with conn.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
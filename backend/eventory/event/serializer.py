@@ -1,5 +1,7 @@
+from django.db.models import Avg, FloatField
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
-from .models import College, Student, Event, Registration, Attendance, Feedback
+from .models import College, Student, Event, Registration, Attendance, Feedback, RegistrationTicket
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from rest_framework.validators import UniqueValidator
@@ -22,15 +24,22 @@ class EventSerializer(serializers.ModelSerializer):
     attendance_count = serializers.SerializerMethodField()
     avg_feedback = serializers.SerializerMethodField()
 
+    # The list/retrieve querysets annotate these values (see EventViewSet.get_queryset);
+    # fall back to a query only for instances that were not loaded through it.
     def get_registrations_count(self, obj):
+        if hasattr(obj, 'registrations_total'):
+            return obj.registrations_total
         return obj.registrations.count()
 
     def get_attendance_count(self, obj):
+        if hasattr(obj, 'attendance_total'):
+            return obj.attendance_total
         return obj.attendances.count()
 
     def get_avg_feedback(self, obj):
-        feedbacks = obj.feedbacks.all()
-        return sum(f.rating for f in feedbacks) / len(feedbacks) if feedbacks else 0.0
+        if hasattr(obj, 'rating_avg'):
+            return obj.rating_avg
+        return obj.feedbacks.aggregate(avg=Coalesce(Avg('rating'), 0.0, output_field=FloatField()))['avg']
 
     class Meta:
         model = Event
@@ -46,6 +55,12 @@ class RegistrationSerializer(serializers.ModelSerializer):
         fields = ['id', 'event', 'student', 'college_registered_count', 'created_at']
 
 
+class RegistrationTicketSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RegistrationTicket
+        fields = ['id', 'event', 'status', 'waitlist_position', 'registration', 'detail', 'created_at', 'processed_at']
+
+
 class AttendanceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Attendance
@@ -83,51 +98,23 @@ class StudentRegistrationSerializer(serializers.Serializer):
     event_id = serializers.IntegerField()
 
     def create(self, validated_data):
-        from .models import Student, College, Registration
-        name = validated_data['name']
-        collegeid = validated_data['collegeid']
-        email = validated_data['email']
-        studentid = validated_data['studentid']
-        event_id = validated_data['event_id']
+        from .registration import RegistrationService, RegistrationError
 
         try:
-            college = College.objects.get(code=collegeid)
+            college = College.objects.get(code=validated_data['collegeid'])
         except College.DoesNotExist:
             raise serializers.ValidationError({'collegeid': 'Invalid college code.'})
 
-        student, created = Student.objects.get_or_create(
-            email=email,
-            college=college,
-            defaults={'full_name': name, 'roll_no': studentid}
-        )
-
-        if not created:
-            # Update details if student exists
-            student.full_name = name
-            student.roll_no = studentid
-            student.save()
-
-        event = Event.objects.get(id=event_id)
-
-        # Check if already registered
-        if Registration.objects.filter(event=event, student=student).exists():
-            raise serializers.ValidationError({'detail': 'Student already registered for this event.'})
-
-        # Check capacity
-        if event.registration_count >= event.capacity:
-            raise serializers.ValidationError({'detail': 'Event is at full capacity.'})
-
-        registration = Registration.objects.create(event=event, student=student)
-
-        # Update counts
-        college_count = Registration.objects.filter(event=event, student__college=college).count()
-        registration.college_registered_count = college_count
-        registration.save()
-
-        event.registration_count += 1
-        event.save()
-
-        return registration
+        try:
+            return RegistrationService.register(
+                event_id=validated_data['event_id'],
+                college=college,
+                email=validated_data['email'],
+                full_name=validated_data['name'],
+                roll_no=validated_data['studentid'],
+            )
+        except RegistrationError as e:
+            raise serializers.ValidationError({e.field: e.message})
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -0,0 +1,156 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from event.backends import user_cache_key
+from event.models import Attendance, CollegeRegistrationCount, Event, EventStats, Feedback, Registration, Student
+from event.stats import EventStatsService
+
+# Sent after registrations, attendance or feedback change, with ``event_ids`` and the
+# ``college_ids`` involved (``None`` when unknown, meaning any college may be affected).
+report_data_changed = Signal()
+
+
+# The fields of each row that EventStats (and Student.attendance_count) count; saves apply
+# the difference between the values the row had when loaded and the values it was saved with.
+COUNTED_FIELDS = {
+    Registration: ('event_id',),
+    Attendance: ('event_id', 'is_present', 'student_id'),
+    Feedback: ('event_id', 'rating'),
+}
+
+
+def counted_values(instance):
+    return {name: getattr(instance, name) for name in COUNTED_FIELDS[type(instance)]}
+
+
+def row_deltas(model, values, sign):
+    """The EventStats deltas that add (sign=1) or remove (sign=-1) one row."""
+    if model is Registration:
+        return {'registrations': sign}
+    if model is Attendance:
+        return {'attendance_count': sign, 'present_count': sign * int(values['is_present'])}
+    return EventStatsService.feedback_deltas(values['rating'], sign)
+
+
+@receiver(post_save, sender=Event)
+def event_created(sender, instance, created, raw=False, **kwargs):
+    # Every event has a rollup row from the start, so reports can rank events from EventStats alone.
+    if created and not raw:
+        EventStats.objects.create(event=instance)
+    elif raw:
+        # loaddata: an empty row keeps the event ranked; a fixture's own EventStats row
+        # (or rebuild_event_stats) overwrites it with the real counts.
+        EventStats.objects.get_or_create(event_id=instance.pk)
+
+
+@receiver(post_init, sender=Registration)
+@receiver(post_init, sender=Attendance)
+@receiver(post_init, sender=Feedback)
+def remember_counted_values(sender, instance, **kwargs):
+    # Read __dict__ so a row loaded with .only()/.defer() does not fetch the deferred fields.
+    fields = COUNTED_FIELDS[sender]
+    loaded = all(name in instance.__dict__ for name in fields)
+    instance._counted = {name: instance.__dict__[name] for name in fields} if loaded else None
+
+
+@receiver(pre_save, sender=Registration)
+@receiver(pre_save, sender=Attendance)
+@receiver(pre_save, sender=Feedback)
+@receiver(pre_delete, sender=Registration)
+@receiver(pre_delete, sender=Attendance)
+@receiver(pre_delete, sender=Feedback)
+def load_counted_values(sender, instance, raw=False, **kwargs):
+    # Not loaded from the database (built by hand, possibly with the pk of an existing row),
+    # or loaded without the counted fields: read what this save or delete replaces.
+    if raw or instance.pk is None:
+        return
+    if instance._state.adding or instance._counted is None:
+        instance._counted = sender.objects.filter(pk=instance.pk).values(*COUNTED_FIELDS[sender]).first()
+
+
+@receiver(post_save, sender=Registration)
+@receiver(post_save, sender=Attendance)
+@receiver(post_save, sender=Feedback)
+def counted_row_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Keep EventStats right for every save, including the admin and the shell.
+
+    Bulk writes (bulk_create, QuerySet.update) send no signals; their callers record
+    the deltas themselves. Report caches are invalidated by the callers that know the
+    colleges involved; other writers reach reports once the cached entries expire.
+    """
+    if raw:
+        return
+    previous = None if created else instance._counted
+    current = counted_values(instance)
+    if previous is not None and update_fields is not None:
+        current = {
+            name: current[name] if {name, name.removesuffix('_id')} & update_fields else value
+            for name, value in previous.items()
+        }
+    if current != previous:
+        changes = defaultdict(Counter)
+        if previous is not None:
+            changes[previous['event_id']].update(row_deltas(sender, previous, -1))
+        changes[current['event_id']].update(row_deltas(sender, current, 1))
+        for event_id, deltas in changes.items():
+            EventStatsService.record(event_id, **deltas)
+        if sender is Attendance and (previous is None or previous['student_id'] != current['student_id']):
+            if previous is not None:
+                EventStatsService.record_attendance([previous['student_id']], -1)
+            EventStatsService.record_attendance([current['student_id']], 1)
+    instance._counted = current
+
+
+@receiver(post_delete, sender=Registration)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_delete, sender=Feedback)
+def counted_row_deleted(sender, instance, **kwargs):
+    # The values as last saved, not any unsaved edits made to the instance since.
+    if instance._counted is not None:
+        EventStatsService.record(instance.event_id, **row_deltas(sender, instance._counted, -1))
+        if sender is Attendance:
+            EventStatsService.record_attendance([instance._counted['student_id']], -1)
+    report_data_changed.send(sender=sender, event_ids=[instance.event_id], college_ids=None)
+
+
+@receiver(post_save, sender=Registration)
+def registration_created(sender, instance, created, raw=False, **kwargs):
+    # RegistrationService takes the seat and the college count before it creates the row;
+    # rows added anywhere else (the admin, the shell) take theirs here. Fixtures carry
+    # their own counters, and reconcile_counters repairs any drift.
+    if not created or raw or getattr(instance, '_seat_reserved', False):
+        return
+    from event.registration import RegistrationService  # event.registration imports this module
+
+    college_id = Student.objects.filter(pk=instance.student_id).values_list('college_id', flat=True).get()
+    with transaction.atomic():
+        Event.objects.filter(id=instance.event_id).update(registration_count=F('registration_count') + 1)
+        instance.college_registered_count = RegistrationService.increment_college_count(
+            instance.event_id, college_id, 1
+        )
+        Registration.objects.filter(pk=instance.pk).update(college_registered_count=instance.college_registered_count)
+
+
+@receiver(post_delete, sender=Registration)
+def registration_deleted(sender, instance, **kwargs):
+    # Free the seat so waitlisted tickets can be admitted into it.
+    Event.objects.filter(id=instance.event_id, registration_count__gt=0).update(
+        registration_count=F('registration_count') - 1
+    )
+    CollegeRegistrationCount.objects.filter(
+        event_id=instance.event_id,
+        college_id__in=Student.objects.filter(pk=instance.student_id).values('college_id'),
+        registration_count__gt=0,
+    ).update(registration_count=F('registration_count') - 1)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    cache.delete(user_cache_key(instance.pk))
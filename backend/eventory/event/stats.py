@@ -0,0 +1,46 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from event.models import EventStats, Student
+
+
+class EventStatsService:
+    """Keeps EventStats in step with Registration, Attendance and Feedback writes.
+
+    Deltas are applied inside the transaction that performs the write, so the rollup
+    commits or rolls back together with the rows it summarises. Single-row saves and
+    deletes (admin, shell and cascades included) are recorded by the signal receivers
+    in event/signals.py; bulk writes, which send no signals, call ``record`` themselves.
+    Student.attendance_count is kept the same way through ``record_attendance``.
+    """
+
+    @staticmethod
+    def record(event_id, **deltas):
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        stats = EventStats.objects.filter(event_id=event_id)
+        if stats.update(**{field: F(field) + delta for field, delta in deltas.items()}):
+            return
+        if any(delta < 0 for delta in deltas.values()):
+            # Nothing to decrement: the row is gone (event deleted) or was never built.
+            return
+        try:
+            with transaction.atomic():
+                EventStats.objects.create(event_id=event_id, **deltas)
+        except IntegrityError:
+            stats.update(**{field: F(field) + delta for field, delta in deltas.items()})
+
+    @staticmethod
+    def feedback_deltas(rating, sign=1):
+        return {'feedback_count': sign, 'rating_sum': sign * rating, f'rating_{rating}': sign}
+
+    @staticmethod
+    def record_attendance(student_ids, delta):
+        """Add ``delta`` attendance rows to each of ``student_ids``."""
+        if not student_ids or not delta:
+            return
+        students = Student.objects.filter(id__in=student_ids)
+        if delta < 0:
+            students = students.filter(attendance_count__gte=-delta)
+        students.update(attendance_count=F('attendance_count') + delta)
@@ -1,7 +1,38 @@
+import asyncio
+import datetime
+import json
+import os
+import tempfile
+import warnings
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.core.paginator import UnorderedObjectListWarning
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase
-from .models import College, Student, Event, Registration
+from rest_framework.test import APITestCase, APITransactionTestCase
+from eventory.db.replica import PrimaryPinMiddleware, ReplicaRouter, pin_to_primary, use_replica
+from .admin import REGISTRATION_INLINE_LIMIT, EstimatedCountPaginator
+from .admission import AdmissionQueue
+from .authentication import issue_token
+from .gateway import with_gateway
+from .management.commands.benchmark_read_gateway import call_asgi
+from .models import (
+    College, Student, Event, Registration, Attendance, Feedback, CollegeRegistrationCount, RegistrationTicket,
+    EventStats, RevokedToken,
+)
+from .registration import RegistrationService
 
 class EventRegistrationTests(APITestCase):
     def setUp(self):
@@ -34,3 +65,904 @@ class EventRegistrationTests(APITestCase):
         response2 = self.client.post(url, data, format='json')
         self.assertEqual(response2.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('detail', response2.data)
+
+
+class EventListTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.college = College.objects.create(name="Test College", code="TC01")
+        students = [
+            Student.objects.create(college=self.college, full_name=f"Student {i}", email=f"s{i}@example.com", roll_no=str(i))
+            for i in range(3)
+        ]
+        for n in range(4):
+            event = Event.objects.create(
+                college=self.college, title=f"Event {n}", type="WORKSHOP",
+                start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+            )
+            for student in students[:n]:
+                Registration.objects.create(event=event, student=student)
+                Attendance.objects.create(event=event, student=student, college=self.college, is_present=True)
+                Feedback.objects.create(event=event, student=student, rating=n + 1)
+
+    def test_list_counts(self):
+        response = self.client.get(reverse('event-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        by_title = {e['title']: e for e in response.data['results']}
+        self.assertEqual(by_title['Event 0']['registrations_count'], 0)
+        self.assertEqual(by_title['Event 0']['avg_feedback'], 0.0)
+        self.assertEqual(by_title['Event 3']['registrations_count'], 3)
+        self.assertEqual(by_title['Event 3']['attendance_count'], 3)
+        self.assertEqual(by_title['Event 3']['avg_feedback'], 4.0)
+
+    def test_list_query_count_is_constant(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse('event-list'))
+
+    def test_list_is_keyset_paginated(self):
+        first = self.client.get(reverse('event-list'), {'page_size': 3})
+        self.assertEqual([e['title'] for e in first.data['results']], ['Event 0', 'Event 1', 'Event 2'])
+        second = self.client.get(first.data['next'])
+        self.assertEqual([e['title'] for e in second.data['results']], ['Event 3'])
+        self.assertIsNone(second.data['next'])
+
+
+class BulkAttendanceTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username='scanner', password='pass12345'))
+        self.college = College.objects.create(name="Test College", code="TC01")
+        self.event = Event.objects.create(
+            college=self.college, title="Hackathon", type="HACKATHON",
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+        )
+        self.students = [
+            Student.objects.create(college=self.college, full_name=f"Student {i}", email=f"s{i}@example.com", roll_no=str(i))
+            for i in range(4)
+        ]
+        for student in self.students[:3]:
+            Registration.objects.create(event=self.event, student=student)
+
+    def test_bulk_check_in(self):
+        url = reverse('event-attendance', args=[self.event.id])
+        payload = {'students': [
+            {'student_id': self.students[0].id, 'is_present': True},
+            {'student_id': self.students[1].id, 'is_present': False},
+            {'student_id': self.students[3].id, 'is_present': True},
+            {'student_id': 'abc'},
+        ]}
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['status'] for r in response.data], ['marked', 'marked', 'not registered', 'error'])
+        self.assertEqual(Attendance.objects.filter(event=self.event).count(), 2)
+
+        # Re-scanning updates existing rows instead of duplicating them.
+        payload = {'students': [{'student_id': self.students[1].id, 'is_present': True}]}
+        self.client.post(url, payload, format='json')
+        self.assertTrue(Attendance.objects.get(event=self.event, student=self.students[1]).is_present)
+        self.assertEqual(Attendance.objects.filter(event=self.event).count(), 2)
+
+
+class RegistrationCapacityTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username='student', password='pass12345'))
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.event = Event.objects.create(
+            college=self.college, title="Workshop", type="WORKSHOP",
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z", capacity=2,
+        )
+        self.url = reverse('event-register', args=[self.event.id])
+
+    def register(self, n):
+        return self.client.post(self.url, {
+            'name': f"Student {n}", 'collegeid': 'tc01', 'email': f"s{n}@example.com",
+            'studentid': str(n), 'event_id': self.event.id,
+        }, format='json')
+
+    def test_capacity_and_college_counter(self):
+        self.assertEqual(self.register(1).status_code, status.HTTP_201_CREATED)
+        response = self.register(2)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['college_registered_count'], 2)
+        response = self.register(3)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'Event is at full capacity.')
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 2)
+
+    def test_duplicate_registration_releases_nothing(self):
+        self.register(1)
+        response = self.register(1)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 1)
+
+    def test_reconcile_counters(self):
+        self.register(1)
+        Event.objects.filter(pk=self.event.pk).update(registration_count=7)
+        CollegeRegistrationCount.objects.all().delete()
+        call_command('reconcile_counters', stdout=StringIO())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 1)
+        self.assertEqual(CollegeRegistrationCount.objects.get().registration_count, 1)
+
+    def test_counters_follow_registrations_made_and_deleted_anywhere(self):
+        self.register(1)
+        student = Student.objects.create(college=self.college, full_name="Walk In", email="w@example.com")
+        walk_in = Registration.objects.create(event=self.event, student=student)  # e.g. the admin add form
+        self.assertEqual(walk_in.college_registered_count, 2)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 2)
+
+        walk_in.delete()
+        Registration.objects.get().delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 0)
+        self.assertEqual(CollegeRegistrationCount.objects.get().registration_count, 0)
+
+
+@override_settings(REGISTRATION_QUEUE={'ENABLED': True, 'WORKER_THREAD': False})
+class QueuedRegistrationTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username='student', password='pass12345'))
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.event = Event.objects.create(
+            college=self.college, title="Fest", type="FEST",
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z", capacity=1,
+        )
+
+    def register(self, n, collegeid='tc01'):
+        return self.client.post(reverse('event-register', args=[self.event.id]), {
+            'name': f"Student {n}", 'collegeid': collegeid, 'email': f"s{n}@example.com",
+            'studentid': str(n), 'event_id': self.event.id,
+        }, format='json')
+
+    def test_tickets_are_admitted_in_order(self):
+        first, second, bad = self.register(1), self.register(2), self.register(3, collegeid='nope')
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(first.data['status'], 'PENDING')
+        self.assertEqual(Registration.objects.count(), 0)
+
+        self.assertEqual(AdmissionQueue.process_pending(), 3)
+
+        admitted = self.client.get(first['Location'])
+        self.assertEqual(admitted.data['status'], 'ADMITTED')
+        self.assertIsNotNone(admitted.data['registration'])
+        waitlisted = self.client.get(second['Location'])
+        self.assertEqual(waitlisted.data['status'], 'WAITLISTED')
+        self.assertEqual(waitlisted.data['waitlist_position'], 1)
+        self.assertEqual(self.client.get(bad['Location']).data['status'], 'REJECTED')
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 1)
+
+    def test_failing_ticket_does_not_undo_the_batch(self):
+        self.event.capacity = 3
+        self.event.save()
+        first, broken, third = self.register(1), self.register(2), self.register(3)
+        register = RegistrationService.register
+
+        def flaky(**kwargs):
+            if kwargs['email'] == 's2@example.com':
+                raise RuntimeError("boom")
+            return register(**kwargs)
+
+        with mock.patch('event.admission.RegistrationService.register', side_effect=flaky):
+            with self.assertLogs('event.admission', 'ERROR'):
+                self.assertEqual(AdmissionQueue.process_pending(), 3)
+
+        self.assertEqual(self.client.get(first['Location']).data['status'], 'ADMITTED')
+        failed = self.client.get(broken['Location']).data
+        self.assertEqual(failed['status'], 'FAILED')
+        self.assertEqual(failed['detail'], 'RuntimeError: boom')
+        self.assertEqual(self.client.get(third['Location']).data['status'], 'ADMITTED')
+        self.assertEqual(Registration.objects.count(), 2)
+
+    def test_waitlisted_tickets_are_promoted_when_seats_free_up(self):
+        first, second, third = self.register(1), self.register(2), self.register(3)
+        AdmissionQueue.process_pending()
+        self.assertEqual(self.client.get(third['Location']).data['waitlist_position'], 2)
+
+        Registration.objects.get().delete()
+        self.assertEqual(AdmissionQueue.process_pending(), 1)
+        self.assertEqual(self.client.get(second['Location']).data['status'], 'ADMITTED')
+        moved_up = self.client.get(third['Location']).data
+        self.assertEqual((moved_up['status'], moved_up['waitlist_position']), ('WAITLISTED', 1))
+
+        Event.objects.filter(pk=self.event.pk).update(capacity=2)
+        self.assertEqual(AdmissionQueue.process_pending(), 1)
+        self.assertEqual(self.client.get(third['Location']).data['status'], 'ADMITTED')
+        self.assertEqual(AdmissionQueue.process_pending(), 0)
+
+    def test_freed_seat_goes_to_the_waitlist_before_newer_tickets(self):
+        self.register(1)
+        waitlisted = self.register(2)
+        AdmissionQueue.process_pending()
+        Registration.objects.get().delete()
+
+        newer = self.register(3)
+        self.assertEqual(AdmissionQueue.process_pending(), 2)
+        self.assertEqual(self.client.get(waitlisted['Location']).data['status'], 'ADMITTED')
+        queued = self.client.get(newer['Location']).data
+        self.assertEqual((queued['status'], queued['waitlist_position']), ('WAITLISTED', 1))
+
+    def test_tickets_are_private_to_their_requester(self):
+        location = self.register(1)['Location']
+        self.client.force_authenticate(User.objects.create_user(username='other', password='pass12345'))
+        self.assertEqual(self.client.get(location).status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(User.objects.create_user(username='staff', password='pass12345', is_staff=True))
+        self.assertEqual(self.client.get(location).status_code, status.HTTP_200_OK)
+
+
+class StudentTimelineTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username='student', password='pass12345'))
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.student = Student.objects.create(college=self.college, full_name="Jane", email="jane@example.com", roll_no="1")
+        for year in (2000, 2001, 2099):
+            event = Event.objects.create(
+                college=self.college, title=f"Event {year}", type="SEMINAR",
+                start_at=f"{year}-01-01T10:00:00Z", end_at=f"{year}-01-01T12:00:00Z",
+            )
+            Registration.objects.create(event=event, student=self.student)
+        Attendance.objects.create(event=event, student=self.student, college=self.college, has_given_feedback=True)
+        self.url = reverse('student-registered-events', args=[self.student.id])
+
+    def test_timeline_is_a_fixed_number_of_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual([e['title'] for e in response.data['results']], ['Event 2000', 'Event 2001', 'Event 2099'])
+        self.assertEqual(response.data['results'][0]['college'], 'Test College')
+        self.assertEqual([e['has_given_feedback'] for e in response.data['results']], [False, False, True])
+
+    def test_upcoming_and_past_filters(self):
+        upcoming = self.client.get(self.url, {'when': 'upcoming'})
+        self.assertEqual([e['title'] for e in upcoming.data['results']], ['Event 2099'])
+        past = self.client.get(self.url, {'when': 'past', 'page_size': 1})
+        self.assertEqual([e['title'] for e in past.data['results']], ['Event 2001'])
+        self.assertIsNotNone(past.data['next'])
+        following = self.client.get(past.data['next'])
+        self.assertEqual([e['title'] for e in following.data['results']], ['Event 2000'])
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pass12345', is_staff=True))
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.event = Event.objects.create(
+            college=self.college, title="Fest", type="FEST",
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+        )
+        for i in range(3):
+            student = Student.objects.create(college=self.college, full_name=f"Student {i}", email=f"s{i}@example.com", roll_no=str(i))
+            Registration.objects.create(event=self.event, student=student)
+
+    def test_csv_export_streams_every_row(self):
+        response = self.client.get(reverse('event-export', args=[self.event.id, 'registrations']))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['student_id', 'full_name', 'email'])
+        self.assertEqual(len(lines), 4)
+
+    def test_ndjson_export(self):
+        response = self.client.get(reverse('event-export', args=[self.event.id, 'registrations']), {'output': 'ndjson'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['email'] for row in rows], ['s0@example.com', 's1@example.com', 's2@example.com'])
+
+
+class AsyncExportTests(TestCase):
+    def setUp(self):
+        token, _ = issue_token(User.objects.create_user(username='admin', password='pass12345', is_staff=True))
+        self.auth = {'headers': {'Authorization': f'Token {token}'}}
+        college = College.objects.create(name="Test College", code="tc01")
+        self.event = Event.objects.create(
+            college=college, title="Fest", type="FEST",
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+        )
+        for i in range(5):
+            student = Student.objects.create(college=college, full_name=f"Student {i}", email=f"s{i}@example.com", roll_no=str(i))
+            Registration.objects.create(event=self.event, student=student)
+
+    @mock.patch('event.exports.ASYNC_BATCH_LINES', 2)
+    async def test_asgi_export_streams_in_batches(self):
+        response = await self.async_client.get(reverse('event-export', args=[self.event.id, 'registrations']), **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')  # Django warns when it has to buffer a sync iterator
+            chunks = [chunk async for chunk in response.__aiter__()]
+        self.assertEqual([chunk.decode().count('\n') for chunk in chunks], [2, 2, 2])  # header + 5 rows
+        self.assertIn('s4@example.com', chunks[-1].decode())
+
+
+class BulkImportTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pass12345', is_staff=True))
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.event = Event.objects.create(
+            college=self.college, title="Orientation", type="SEMINAR",
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z", capacity=2,
+        )
+        Student.objects.create(college=self.college, full_name="Old Name", email="s0@example.com", roll_no="0")
+
+    def upload(self, content, name):
+        return self.client.post(
+            reverse('student-bulk-import'), {'file': SimpleUploadedFile(name, content.encode())}, format='multipart'
+        )
+
+    def test_csv_import_upserts_and_enforces_capacity(self):
+        content = "name,collegeid,email,studentid,event_id\n" + "".join(
+            f"Student {i},tc01,s{i}@example.com,{i},{self.event.id}\n" for i in range(3)
+        ) + "Nobody,zz99,x@example.com,9,\nBad,tc01,not-an-email,1,\n"
+        response = self.upload(content, 'students.csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['students_upserted'], 3)
+        self.assertEqual(response.data['registrations_created'], 2)
+        self.assertEqual(
+            sorted((e['line'], e['error']) for e in response.data['errors']),
+            [(4, 'Event is at full capacity.'), (5, 'Invalid college code.'), (6, 'Invalid email.')],
+        )
+        self.assertEqual(Student.objects.get(email="s0@example.com").full_name, "Student 0")
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.registration_count, 2)
+        self.assertEqual(
+            sorted(Registration.objects.values_list('college_registered_count', flat=True)), [1, 2]
+        )
+
+    def test_ndjson_import_via_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as f:
+            f.write(json.dumps({'name': 'Nd', 'collegeid': 'tc01', 'email': 'nd@example.com', 'studentid': '7'}) + "\n")
+            f.write("{broken\n")
+        self.addCleanup(os.remove, f.name)
+        err = StringIO()
+        call_command('import_registrations', f.name, stdout=StringIO(), stderr=err)
+        self.assertTrue(Student.objects.filter(email='nd@example.com').exists())
+        self.assertIn('line 2: Malformed row.', err.getvalue())
+
+    def test_excel_csv_with_bom_and_bad_bytes(self):
+        content = (
+            "\ufeffname,collegeid,email,studentid\n".encode()
+            + "Zoë,tc01,z@example.com,1\n".encode()
+            + b"Caf\xe9,tc01,c@example.com,2\n"  # Latin-1, not UTF-8
+        )
+        response = self.client.post(
+            reverse('student-bulk-import'), {'file': SimpleUploadedFile('students.csv', content)}, format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['students_upserted'], 1)
+        self.assertEqual(response.data['errors'], [{'line': 3, 'error': 'Not valid UTF-8.'}])
+        self.assertEqual(Student.objects.get(email='z@example.com').full_name, "Zoë")
+
+
+class GenerateDatasetTests(TestCase):
+    def generate(self, tag, seed=3):
+        call_command(
+            'generate_dataset', colleges=4, students=300, events=30, avg_registrations=20, seed=seed,
+            batch_size=100, tag=tag, stdout=StringIO(),
+        )
+        return [
+            (e.type, e.capacity, e.registration_count, e.stats.attendance_count, e.stats.rating_sum)
+            for e in Event.objects.filter(college__code__startswith=f'{tag}-').select_related('stats').order_by('id')
+        ]
+
+    def test_counters_and_stats_are_consistent(self):
+        self.generate('syn')
+        self.assertEqual(Student.objects.count(), 300)
+        self.assertTrue(Feedback.objects.exists())
+        before = sorted(EventStats.objects.values_list())
+        counts = sorted(Event.objects.values_list('id', 'registration_count'))
+        college_counts = sorted(CollegeRegistrationCount.objects.values_list('event', 'college', 'registration_count'))
+        call_command('reconcile_counters', stdout=StringIO())
+        call_command('rebuild_event_stats', stdout=StringIO())
+        self.assertEqual(sorted(EventStats.objects.values_list()), before)
+        self.assertEqual(sorted(Event.objects.values_list('id', 'registration_count')), counts)
+        self.assertEqual(
+            sorted(CollegeRegistrationCount.objects.values_list('event', 'college', 'registration_count')),
+            college_counts,
+        )
+
+    def test_same_seed_same_data(self):
+        self.assertEqual(self.generate('a'), self.generate('b'))
+        self.assertNotEqual(self.generate('c'), self.generate('d', seed=4))
+        with self.assertRaises(CommandError):
+            self.generate('a')
+
+
+class QueryPlanTests(TestCase):
+    @override_settings(ALLOWED_HOSTS=['localhost'])
+    def test_no_full_scans_or_temporary_sorts(self):
+        out = StringIO()
+        # The planner only prefers the indexes once tables have a realistic size.
+        call_command('check_query_plans', colleges=8, students=3000, events=400, stdout=out)
+        self.assertIn("No full scans or temporary sorts.", out.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith='query-plans').exists())
+
+
+class EventSearchTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username='viewer', password='pass12345'))
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.other = College.objects.create(name="Other College", code="oc01")
+        for college, title, description, kind in [
+            (self.college, "Python Workshop", "Hands-on programming basics", "WORKSHOP"),
+            (self.college, "Robotics Fest", "Build robots; some python scripting", "FEST"),
+            (self.college, "Cooking Seminar", "Nothing about code", "SEMINAR"),
+            (self.other, "Advanced Python", "Decorators and generators", "WORKSHOP"),
+        ]:
+            Event.objects.create(
+                college=college, title=title, description=description, type=kind,
+                start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+            )
+
+    def search(self, **params):
+        response = self.client.get(reverse('event-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [e['title'] for e in response.data['results']]
+
+    def test_ranks_title_matches_first(self):
+        titles = self.search(q='python', college=self.college.id)
+        self.assertEqual(titles, ['Python Workshop', 'Robotics Fest'])
+
+    def test_combines_with_filters_and_tracks_edits(self):
+        self.assertEqual(sorted(self.search(q='pyth', type='WORKSHOP')), ['Advanced Python', 'Python Workshop'])
+        Event.objects.filter(title='Cooking Seminar').update(title='Python for Chefs')
+        self.assertIn('Python for Chefs', self.search(q='python'))
+        self.assertEqual(self.search(q='decorators'), ['Advanced Python'])
+
+
+class StudentLookupTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username='desk', password='pass12345'))
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.event = Event.objects.create(
+            college=self.college, title="Fest", type="FEST",
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+        )
+        for i, name in enumerate(["Maria Garcia", "Mario Rossi", "Priya Marathe", "John Smith"]):
+            student = Student.objects.create(college=self.college, full_name=name, email=f"user{i}@campus.edu", roll_no=f"R{i:03d}")
+            if i != 1:
+                Registration.objects.create(event=self.event, student=student)
+
+    def lookup(self, **params):
+        response = self.client.get(reverse('student-lookup'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [s['full_name'] for s in response.data]
+
+    def test_prefix_matches_name_roll_no_and_email(self):
+        self.assertEqual(sorted(self.lookup(q='mar')), ['Maria Garcia', 'Mario Rossi', 'Priya Marathe'])
+        self.assertEqual(self.lookup(q='r003'), ['John Smith'])
+        self.assertEqual(self.lookup(q='user1'), ['Mario Rossi'])
+        self.assertEqual(self.lookup(q='ma'), [])  # too short for a trigram index
+
+    def test_scoped_to_event_and_limited(self):
+        self.assertEqual(sorted(self.lookup(q='mar', event=self.event.id)), ['Maria Garcia', 'Priya Marathe'])
+        self.assertEqual(len(self.lookup(q='mar', limit=1)), 1)
+        Student.objects.filter(full_name='John Smith').update(full_name='Johnny Marsh')
+        self.assertIn('Johnny Marsh', self.lookup(q='marsh'))
+
+    def test_limit_must_be_positive(self):
+        for limit in (0, -1):
+            response = self.client.get(reverse('student-lookup'), {'q': 'mar', 'limit': limit})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SignedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username='kiosk', password='pass12345')
+
+    def login(self):
+        response = self.client.post(reverse('login'), {'username': 'kiosk', 'password': 'pass12345', 'token': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['token']
+
+    def test_token_authenticates_without_hashing_or_queries_when_warm(self):
+        token = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+        self.assertEqual(self.client.get(reverse('college-list')).status_code, status.HTTP_200_OK)
+        with mock.patch('django.contrib.auth.hashers.PBKDF2PasswordHasher.verify') as verify:
+            with self.assertNumQueries(1):  # just the college list itself
+                self.assertEqual(self.client.get(reverse('college-list')).status_code, status.HTTP_200_OK)
+        verify.assert_not_called()
+
+    def test_tampered_and_revoked_tokens_are_rejected(self):
+        token = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token[:-2]}xx')
+        self.assertEqual(self.client.get(reverse('college-list')).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+        self.assertEqual(self.client.post(reverse('logout')).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse('college-list')).status_code, status.HTTP_403_FORBIDDEN)
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('college-list')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_user_changes_are_seen_by_warm_tokens(self):
+        token = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+        self.client.get(reverse('college-list'))
+        user = User.objects.get(username='kiosk')
+        user.is_active = False
+        user.save()  # drops the cached user, as for sessions
+        self.assertEqual(self.client.get(reverse('college-list')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_expired_revocations_are_purged(self):
+        user = User.objects.get(username='kiosk')
+        RevokedToken.objects.create(jti='old', user=user, expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.login()}')
+        self.client.post(reverse('logout'))
+        self.assertFalse(RevokedToken.objects.filter(jti='old').exists())
+        RevokedToken.objects.create(jti='old', user=user, expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        call_command('purge_revoked_tokens', stdout=StringIO())
+        self.assertFalse(RevokedToken.objects.filter(jti='old').exists())
+        self.assertEqual(RevokedToken.objects.count(), 1)  # the logged-out token, still unexpired
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+class CachedSessionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='admin', password='pass12345', is_staff=True)
+
+    def test_warm_session_request_skips_session_and_user_tables(self):
+        self.client.login(username='admin', password='pass12345')
+        self.client.get(reverse('college-list'))
+        with self.assertNumQueries(1):  # just the college list itself
+            self.assertEqual(self.client.get(reverse('college-list')).status_code, status.HTTP_200_OK)
+
+    def test_role_change_is_seen_immediately(self):
+        self.client.login(username='admin', password='pass12345')
+        self.client.get(reverse('college-list'))
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.post(reverse('college-list'), {'name': 'X', 'code': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ReadGatewayTests(TransactionTestCase):
+    databases = '__all__'
+    # Gateway endpoints run on FastAPI's thread pool with their own connections.
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='kiosk', password='pass12345')
+        token, _ = issue_token(self.user)
+        self.headers = [('Authorization', f'Token {token}')]
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.event = Event.objects.create(
+            college=self.college, title="Hackathon", type="HACKATHON", capacity=10,
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+        )
+        self.students = [
+            Student.objects.create(college=self.college, full_name=f"S{i}", email=f"s{i}@example.com", roll_no=str(i))
+            for i in range(3)
+        ]
+        for student in self.students[:2]:
+            Registration.objects.create(event=self.event, student=student)
+        Attendance.objects.create(event=self.event, student=self.students[0], college=self.college, is_present=True)
+        call_command('rebuild_event_stats', stdout=StringIO())
+        self.application = with_gateway(get_asgi_application())
+
+    def get(self, path, headers=None):
+        code, body = asyncio.run(call_asgi(self.application, path, self.headers if headers is None else headers))
+        return code, json.loads(body)
+
+    def test_gateway_reads(self):
+        code, summary = self.get(f'/api/gateway/events/{self.event.id}/')
+        self.assertEqual(code, 200)
+        self.assertEqual((summary['title'], summary['registrations'], summary['seats_left']), ("Hackathon", 2, 8))
+
+        code, counts = self.get(f'/api/gateway/events/{self.event.id}/counts/')
+        self.assertEqual((counts['checked_in'], counts['present'], counts['feedback']), (1, 1, 0))
+
+        code, checked_in = self.get(f'/api/gateway/events/{self.event.id}/students/{self.students[0].id}/')
+        self.assertEqual((checked_in['registered'], checked_in['checked_in'], checked_in['present']), (True, True, True))
+        code, unknown = self.get(f'/api/gateway/events/{self.event.id}/students/{self.students[2].id}/')
+        self.assertEqual((unknown['registered'], unknown['checked_in']), (False, False))
+
+        self.assertEqual(self.get('/api/gateway/events/999999/')[0], 404)
+
+    def test_gateway_shares_api_authentication(self):
+        self.assertEqual(self.get(f'/api/gateway/events/{self.event.id}/', headers=[])[0], 403)
+        self.assertEqual(self.get(f'/api/gateway/events/{self.event.id}/', headers=[('Authorization', 'Token x')])[0], 401)
+
+        self.client.login(username='kiosk', password='pass12345')
+        cookie = f"sessionid={self.client.cookies['sessionid'].value}"
+        self.assertEqual(self.get(f'/api/gateway/events/{self.event.id}/', headers=[('Cookie', cookie)])[0], 200)
+
+        # Everything else still reaches Django.
+        with override_settings(ALLOWED_HOSTS=['localhost']):
+            self.assertEqual(
+                asyncio.run(call_asgi(self.application, f'/api/events/{self.event.id}/', self.headers))[0], 200
+            )
+
+    @override_settings(ROOT_URLCONF='event.management.commands.benchmark_read_gateway', ALLOWED_HOSTS=['localhost'])
+    def test_benchmark_compares_identical_payloads(self):
+        for tail in (
+            f'/events/{self.event.id}/', f'/events/{self.event.id}/counts/',
+            f'/events/{self.event.id}/students/{self.students[0].id}/',
+        ):
+            with self.subTest(tail=tail):
+                self.assertEqual(self.get(f'/api/drf-baseline{tail}'), self.get(f'/api/gateway{tail}'))
+
+
+class SQLiteProfileTests(TestCase):
+    def test_connections_are_tuned(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("SQLite profile only")
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 10000)
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+
+@override_settings(READ_REPLICA={'ALIAS': 'default', 'APPS': ['event'], 'PIN_SECONDS': 5, 'PIN_COOKIE': 'pin'})
+class ReplicaRoutingTests(APITransactionTestCase):
+    # The replica alias is pointed at 'default' so routed reads still find the test data;
+    # the router returning it (rather than None) is what marks a read as replica-bound.
+    # Not a TestCase: reads inside a transaction on the primary are never routed.
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pass12345', is_staff=True)
+        self.client.force_authenticate(self.admin)
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.decisions = []
+        original = ReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            self.decisions.append(original(router, model, **hints))
+            return self.decisions[-1]
+
+        patcher = mock.patch.object(ReplicaRouter, 'db_for_read', spy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_router(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Event))
+        with use_replica():
+            self.assertEqual(router.db_for_read(Event), 'default')
+            self.assertIsNone(router.db_for_read(User))
+            with pin_to_primary():
+                self.assertIsNone(router.db_for_read(Event))
+        self.assertEqual(router.db_for_write(Event), 'default')
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        self.client.get(reverse('event-list'))
+        self.assertIn('default', self.decisions)
+
+        response = self.client.post(reverse('event-list'), {
+            'college': self.college.id, 'title': "Meetup", 'type': 'SEMINAR',
+            'start_at': "2024-12-01T10:00:00Z", 'end_at': "2024-12-01T12:00:00Z",
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.cookies['pin']['max-age'], 5)
+
+        self.decisions.clear()
+        self.client.get(reverse('event-list'))
+        self.client.get(reverse('event-metrics', args=[response.data['id']]))
+        self.assertTrue(self.decisions)
+        self.assertNotIn('default', self.decisions)
+
+    def test_streamed_exports_read_from_the_replica(self):
+        event = Event.objects.create(
+            college=self.college, title="Meetup", type='SEMINAR',
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+        )
+        response = self.client.get(reverse('event-export', args=[event.id, 'registrations']))
+        self.decisions.clear()
+        b''.join(response.streaming_content)  # rows are read only now, after the view returned
+        self.assertTrue(self.decisions)
+        self.assertNotIn(None, self.decisions)
+
+    def test_student_lookup_reads_from_the_replica(self):
+        Student.objects.create(college=self.college, full_name="Maria Garcia", email="maria@campus.edu", roll_no="R001")
+        self.decisions.clear()
+        response = self.client.get(reverse('student-lookup'), {'q': 'maria'})
+        self.assertEqual([s['full_name'] for s in response.data], ['Maria Garcia'])
+        self.assertIn('default', self.decisions)
+
+    def test_pin_middleware_stays_async(self):
+        async def view(request):
+            return HttpResponse(status=201)
+
+        middleware = PrimaryPinMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = async_to_sync(middleware)(RequestFactory().post('/'))
+        self.assertEqual(response.cookies['pin']['max-age'], 5)
+
+
+@override_settings(SQL_INSTRUMENTATION={'ENABLED': True, 'SLOWEST': 2, 'SQL_MAX_LENGTH': 80})
+class QueryInstrumentationTests(APITestCase):
+    def test_server_timing_and_log_line(self):
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pass12345'))
+        College.objects.create(name="Test College", code="tc01")
+        with self.assertLogs('eventory.sql', level='INFO') as logs:
+            response = self.client.get(reverse('college-list'))
+        self.assertRegex(response['Server-Timing'], r'^sql;dur=[0-9.]+;desc="1 queries", total;dur=[0-9.]+$')
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['path'], line['status'], line['queries']), ('/api/colleges/', 200, 1))
+        self.assertTrue(line['slowest'][0]['sql'].startswith('SELECT'))
+
+
+class QueryBudgetTests(APITestCase):
+    """Every API endpoint runs a fixed number of queries, however much data it returns.
+
+    Budgets are exact: if a change needs more queries, raise the number here deliberately.
+    """
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='admin', password='pass12345', is_staff=True)
+        self.student_user = User.objects.create_user(username='student', password='pass12345')
+        self.colleges = [College.objects.create(name=f"College {c}", code=f"c{c}") for c in range(2)]
+        self.students = [
+            Student.objects.create(
+                college=self.colleges[i % 2], full_name=f"Student {i}", email=f"s{i}@example.com", roll_no=f"R{i:03d}",
+            )
+            for i in range(8)
+        ]
+        self.events = [
+            Event.objects.create(
+                college=self.colleges[n % 2], title=f"Event {n}", type="WORKSHOP", capacity=50,
+                start_at=f"2030-12-0{n + 1}T10:00:00Z", end_at=f"2030-12-0{n + 1}T12:00:00Z",
+            )
+            for n in range(4)
+        ]
+        self.event = self.events[0]
+        for event in self.events:
+            for i, student in enumerate(self.students[:6]):
+                Registration.objects.create(event=event, student=student)
+                if i < 4:
+                    Attendance.objects.create(event=event, student=student, college=student.college, is_present=i < 3)
+                if i < 2:
+                    Feedback.objects.create(event=event, student=student, rating=i + 4)
+        call_command('rebuild_event_stats', stdout=StringIO())
+
+    def assertBudget(self, budget, method, url, data=None, user=None, expected=(200,), **params):
+        self.client.force_authenticate(user or self.admin)
+        with self.assertNumQueries(budget):
+            response = getattr(self.client, method)(url, data, format='json') if data is not None else \
+                getattr(self.client, method)(url, params)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertIn(response.status_code, expected, (url, getattr(response, 'data', None)))
+
+    def test_college_endpoints(self):
+        self.assertBudget(1, 'get', reverse('college-list'))
+        self.assertBudget(1, 'get', reverse('college-detail', args=[self.colleges[0].id]))
+        self.assertBudget(3, 'post', reverse('college-list'), {'name': "Third College", 'code': "c2"}, expected=(201,))
+        self.assertBudget(2, 'patch', reverse('college-detail', args=[self.colleges[0].id]), {'location': "Pune"})
+
+    def test_student_endpoints(self):
+        student = self.students[0]
+        self.assertBudget(1, 'get', reverse('student-list'))
+        self.assertBudget(1, 'get', reverse('student-detail', args=[student.id]))
+        self.assertBudget(2, 'get', reverse('student-registered-events', args=[student.id]))
+        self.assertBudget(1, 'get', reverse('student-registered'))
+        self.assertBudget(1, 'get', reverse('student-lookup'), q='stu')
+
+    def test_event_read_endpoints(self):
+        self.assertBudget(1, 'get', reverse('event-list'))
+        self.assertBudget(1, 'get', reverse('event-detail', args=[self.event.id]))
+        self.assertBudget(2, 'get', reverse('event-registered-students', args=[self.event.id]))
+        self.assertBudget(2, 'get', reverse('event-attendance', args=[self.event.id]))
+        for dataset in ('registrations', 'attendance', 'feedback'):
+            self.assertBudget(2, 'get', reverse('event-export', args=[self.event.id, dataset]))
+
+    def test_student_write_endpoints(self):
+        self.assertBudget(3, 'post', reverse('student-list'), {
+            'college': self.colleges[0].id, 'full_name': "Walk In", 'email': "walkin@example.com", 'roll_no': "R800",
+            'college_code': 'c0',
+        }, expected=(201,))
+        content = "name,collegeid,email,studentid,event_id\n" + "".join(
+            f"Import {i},c{i % 2},imp{i}@example.com,I{i},{self.events[i % 4].id}\n" for i in range(6)
+        )
+        self.client.force_authenticate(self.admin)
+        with self.assertNumQueries(31):  # per distinct event in the file, not per row
+            response = self.client.post(
+                reverse('student-bulk-import'), {'file': SimpleUploadedFile('students.csv', content.encode())},
+                format='multipart',
+            )
+        self.assertEqual(response.data['registrations_created'], 6)
+
+    def test_event_write_endpoints(self):
+        self.assertBudget(4, 'post', reverse('event-list'), {
+            'college': self.colleges[0].id, 'title': "New", 'type': 'SEMINAR',
+            'start_at': "2030-12-09T10:00:00Z", 'end_at': "2030-12-09T12:00:00Z",
+        }, expected=(201,))
+        self.assertBudget(3, 'patch', reverse('event-detail', args=[self.event.id]), {'capacity': 60})
+        self.assertBudget(17, 'post', reverse('event-register', args=[self.event.id]), {
+            'name': "Newcomer", 'collegeid': 'c0', 'email': "new@example.com", 'studentid': "R900",
+            'event_id': self.event.id,
+        }, user=self.student_user, expected=(201,))
+        with override_settings(REGISTRATION_QUEUE={'ENABLED': True, 'WORKER_THREAD': False}):
+            self.assertBudget(2, 'post', reverse('event-register', args=[self.event.id]), {
+                'name': "Queued", 'collegeid': 'c0', 'email': "queued@example.com", 'studentid': "R901",
+                'event_id': self.event.id,
+            }, user=self.student_user, expected=(202,))
+        ticket = RegistrationTicket.objects.get()
+        self.assertBudget(1, 'get', reverse('event-ticket', args=[self.event.id, ticket.id]), user=self.student_user)
+        self.assertBudget(10, 'post', reverse('event-attendance', args=[self.event.id]), {'students': [
+            {'student_id': student.id, 'is_present': True} for student in self.students[:6]
+        ]}, user=self.student_user)
+        self.assertBudget(9, 'post', reverse('event-feedback', args=[self.event.id]), {
+            'student': self.students[3].id, 'rating': 3, 'comment': 'ok',
+        }, user=self.student_user, expected=(201,))
+
+    def test_feedback_endpoints(self):
+        self.assertBudget(1, 'get', reverse('feedback-list'))
+        self.assertBudget(1, 'get', reverse('feedback-detail', args=[Feedback.objects.first().id]))
+
+
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class AdminScaleTests(TestCase):
+    def setUp(self):
+        self.college = College.objects.create(name="Admin College", code="AC01")
+        self.students = Student.objects.bulk_create(
+            Student(college=self.college, full_name=f"Admin Student {i}", email=f"a{i}@example.com", roll_no=f"A{i}")
+            for i in range(40)
+        )
+        self.small = self.make_event("Small Event", self.students[:3])
+        self.big = self.make_event("Big Event", self.students)
+        self.client.defaults['HTTP_HOST'] = 'localhost'
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+
+    def make_event(self, title, students):
+        event = Event.objects.create(
+            college=self.college, title=title, type="SEMINAR",
+            start_at="2030-12-01T10:00:00Z", end_at="2030-12-01T12:00:00Z", capacity=100,
+        )
+        Registration.objects.bulk_create(Registration(event=event, student=student) for student in students)
+        EventStats.objects.filter(event=event).update(registrations=len(students))
+        return event
+
+    def change_page(self, event):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:event_event_change', args=[event.id]))
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_event_change_page_is_bounded(self):
+        self.change_page(self.small)  # the first request also loads the user and content types
+        _, small_queries = self.change_page(self.small)
+        response, big_queries = self.change_page(self.big)
+        self.assertEqual(big_queries, small_queries)
+        content = response.content.decode()
+        self.assertIn('admin-autocomplete', content)  # a select2 lookup, not every college as an <option>
+        self.assertEqual(content.count('Admin Student'), REGISTRATION_INLINE_LIMIT)
+        self.assertIn(f'?event__id__exact={self.big.id}">View all 40 registrations', content)
+        response = self.client.post(reverse('admin:event_event_change', args=[self.big.id]), {
+            'college': self.college.id, 'title': "Renamed", 'type': "SEMINAR", 'capacity': 100,
+            'registration_count': 40, 'start_at_0': "2030-12-01", 'start_at_1': "10:00:00",
+            'end_at_0': "2030-12-01", 'end_at_1': "12:00:00",
+            'registrations-TOTAL_FORMS': REGISTRATION_INLINE_LIMIT,
+            'registrations-INITIAL_FORMS': REGISTRATION_INLINE_LIMIT,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Registration.objects.filter(event=self.big).count(), 40)
+
+    def test_changelists(self):
+        for model in ('student', 'event', 'registration', 'attendance', 'feedback'):
+            with self.subTest(model=model):
+                url = reverse(f'admin:event_{model}_changelist')
+                self.assertEqual(self.client.get(url).status_code, 200)
+                self.assertEqual(self.client.get(url, {'q': "Big"}).status_code, 200)
+        response = self.client.get(reverse('admin:event_student_changelist'), {'q': "Student 3"})
+        self.assertEqual(response.context['cl'].result_count, 11)  # 3, 30-39
+
+    def test_autocomplete_search_results_are_ordered(self):
+        url = reverse('admin:autocomplete')
+        params = {'app_label': 'event', 'model_name': 'registration'}
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', UnorderedObjectListWarning)
+            students = self.client.get(url, {**params, 'field_name': 'student', 'term': "Student 3"}).json()
+            events = self.client.get(url, {**params, 'field_name': 'event', 'term': "event"}).json()
+        self.assertEqual(len(students['results']), 11)
+        self.assertEqual({e['id'] for e in events['results']}, {str(self.small.id), str(self.big.id)})
+
+    def test_estimated_count_for_large_tables(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        Registration.objects.filter(event=self.small).delete()  # the statistics still say 43 rows
+        registrations = Registration.objects.order_by('id')
+        self.assertEqual(EstimatedCountPaginator(registrations, 10).count, 40)  # below the threshold
+        with mock.patch('event.admin.ESTIMATED_COUNT_THRESHOLD', 10):
+            self.assertEqual(EstimatedCountPaginator(registrations, 10).count, 43)
+            self.assertEqual(EstimatedCountPaginator(registrations.filter(event=self.big), 10).count, 40)
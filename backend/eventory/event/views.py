@@ -1,20 +1,38 @@
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
 from django.utils import timezone
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, Exists, F, FloatField, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-
+from rest_framework.reverse import reverse
+
+from eventory.db.replica import ReplicaReadMixin
+from event.admission import AdmissionQueue, queue_settings
+from event.authentication import SignedTokenAuthentication, issue_token, revoke_token
+from event.exports import streaming_export
+from event.imports import BulkImport, read_rows
+from event.pagination import StudentTimelinePagination
+from event.search import lookup_students, search_events
+from event.signals import report_data_changed
+from event.stats import EventStatsService
 from event.serializer import (
     CollegeSerializer, StudentSerializer, EventSerializer,
     AttendanceSerializer, FeedbackSerializer, RegistrationSerializer,
-    StudentRegistrationSerializer, UserRegistrationSerializer
+    RegistrationTicketSerializer, StudentRegistrationSerializer, UserRegistrationSerializer
 )
-from event.models import College, Student, Event, Registration, Attendance, Feedback
+from event.models import College, Student, Event, EventStats, Registration, Attendance, Feedback, RegistrationTicket
 from event.permissions import IsAdminOrReadOnly, IsAdmin, IsStudent, IsAuthenticated
 
+STUDENT_LOOKUP_MAX_LIMIT = 25
+# pg_trgm indexes trigrams: shorter input cannot use the index and would scan every student.
+STUDENT_LOOKUP_MIN_LENGTH = 3
 
 
 class CollegeViewSet(viewsets.ModelViewSet):
@@ -23,46 +41,136 @@ class CollegeViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
 
 
-class StudentViewSet(viewsets.ModelViewSet):
-    queryset = Student.objects.all()
+class StudentViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = Student.objects.select_related('college')  # StudentSerializer reads college_code
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
 
     @action(detail=True, methods=['get'], url_path='registered_events')
     def registered_events(self, request, pk=None):
         student = self.get_object()
-        registrations = Registration.objects.filter(student=student).select_related('event')
-        events_data = []
-        for reg in registrations:
-            event = reg.event
-            events_data.append({
-                'id': event.id,
-                'title': event.title,
-                'description': event.description,
-                'type': event.type,
-                'start_at': event.start_at,
-                'end_at': event.end_at,
-                'college': event.college.name,
-                'has_given_feedback': Attendance.objects.filter(event=event, student=student, has_given_feedback=True).exists()
-            })
-        return Response(events_data, status=status.HTTP_200_OK)
+        events = (
+            Event.objects.filter(registrations__student=student)
+            .annotate(
+                college_name=F('college__name'),
+                has_given_feedback=Exists(
+                    Attendance.objects.filter(event=OuterRef('pk'), student=student, has_given_feedback=True)
+                ),
+            )
+            .values('id', 'title', 'description', 'type', 'start_at', 'end_at', 'college_name', 'has_given_feedback')
+        )
+
+        paginator = StudentTimelinePagination()
+        when = request.query_params.get('when')
+        if when == 'upcoming':
+            events = events.filter(start_at__gte=timezone.now())
+        elif when == 'past':
+            events = events.filter(end_at__lt=timezone.now())
+            paginator.ordering = ('-start_at', '-id')
+        elif when:
+            return Response({'when': "Expected 'upcoming' or 'past'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        page = paginator.paginate_queryset(events, request, view=self)
+        events_data = [{
+            'id': event['id'],
+            'title': event['title'],
+            'description': event['description'],
+            'type': event['type'],
+            'start_at': event['start_at'],
+            'end_at': event['end_at'],
+            'college': event['college_name'],
+            'has_given_feedback': event['has_given_feedback'],
+        } for event in page]
+        return paginator.get_paginated_response(events_data)
+
+    @action(detail=False, methods=['get'], url_path='lookup')
+    def lookup(self, request):
+        """Typeahead for the check-in desk: ?q=<name/roll no/email prefix>&event=<id>&limit=<k>."""
+        query = request.query_params.get('q', '').strip()
+        if len(query) < STUDENT_LOOKUP_MIN_LENGTH:
+            return Response([], status=status.HTTP_200_OK)
+        event_id = request.query_params.get('event')
+        try:
+            limit = int(request.query_params.get('limit', 10))
+            event_id = int(event_id) if event_id else None
+        except ValueError:
+            return Response({'detail': 'limit and event must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'limit': 'Expected a positive integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(limit, STUDENT_LOOKUP_MAX_LIMIT)
+        return Response(lookup_students(query, event_id=event_id, limit=limit), status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[IsAuthenticated, IsAdmin],
+            parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        """Upsert students and register them from an uploaded CSV or NDJSON ``file``."""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': 'A CSV or NDJSON file is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('file_format') or ('csv' if upload.name.lower().endswith('.csv') else 'ndjson')
+        if file_format not in ('csv', 'ndjson'):
+            return Response({'file_format': "Expected 'csv' or 'ndjson'."}, status=status.HTTP_400_BAD_REQUEST)
+        report = BulkImport().run(read_rows(upload.file, file_format))
+        return Response(report, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['get'], url_path='registered')
     def registered(self, request):
-        students = Student.objects.filter(registrations__isnull=False).distinct().select_related('college')
-        serializer = StudentSerializer(students, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        students = Student.objects.filter(
+            Exists(Registration.objects.filter(student=OuterRef('pk')))
+        ).select_related('college')
+        page = self.paginate_queryset(students)
+        serializer = StudentSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            college_id = self.request.query_params.get('college')
+            event_type = self.request.query_params.get('type')
+            query = self.request.query_params.get('q', '').strip()
+            if college_id:
+                queryset = queryset.filter(college_id=college_id)
+            if event_type:
+                queryset = queryset.filter(type=event_type)
+            if query:
+                queryset = search_events(queryset, query)
+        if self.action in ['list', 'retrieve', 'update', 'partial_update']:
+            # Correlated subqueries keep the list at a fixed number of queries and avoid
+            # the row fan-out of joining registrations, attendances and feedbacks together.
+            def per_event(model, aggregate):
+                return Subquery(
+                    model.objects.filter(event=OuterRef('pk')).order_by()
+                    .values('event').annotate(value=aggregate).values('value')
+                )
+            queryset = queryset.annotate(
+                registrations_total=Coalesce(per_event(Registration, Count('pk')), 0, output_field=IntegerField()),
+                attendance_total=Coalesce(per_event(Attendance, Count('pk')), 0, output_field=IntegerField()),
+                rating_avg=Coalesce(per_event(Feedback, Avg('rating')), 0.0, output_field=FloatField()),
+            )
+        return queryset
+
+    def perform_create(self, serializer):
+        # Nothing to count on a new event; spares EventSerializer its fallback queries.
+        event = serializer.save()
+        event.registrations_total = event.attendance_total = 0
+        event.rating_avg = 0.0
+
+    def paginate_queryset(self, queryset):
+        if self.action == 'list' and self.request.query_params.get('q', '').strip():
+            # Search results page in rank order rather than by id.
+            self.paginator.ordering = ('-search_rank', 'id')
+        return super().paginate_queryset(queryset)
+
     def get_permissions(self):
         """Override to set different permissions for different actions"""
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
-            # Only Admins can create, update, or delete events
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'export']:
+            # Only Admins can create, update, delete or export events
             self.permission_classes = [IsAuthenticated, IsAdmin]
         elif self.action in ['register', 'attendance', 'feedback']:
             # Students can register, check-in, and provide feedback
@@ -87,38 +195,36 @@ class EventViewSet(viewsets.ModelViewSet):
         event = self.get_object()
         serializer = self.get_serializer(data=request.data, context={'event': event})
         if serializer.is_valid():
+            if queue_settings()['ENABLED']:
+                # Queued admission: acknowledge now, the admission worker assigns the seat.
+                ticket = AdmissionQueue.enqueue(event, serializer.validated_data, user=request.user)
+                location = reverse('event-ticket', args=[event.id, ticket.id], request=request)
+                return Response(
+                    RegistrationTicketSerializer(ticket).data, status=status.HTTP_202_ACCEPTED,
+                    headers={'Location': location}
+                )
             registration = serializer.save()
             return Response(RegistrationSerializer(registration).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['get'], url_path=r'tickets/(?P<ticket_id>[0-9]+)', url_name='ticket')
+    def ticket(self, request, pk=None, ticket_id=None):
+        tickets = RegistrationTicket.objects.filter(event_id=pk, id=ticket_id)
+        if not request.user.is_staff:
+            tickets = tickets.filter(requested_by=request.user)
+        try:
+            ticket = tickets.get()
+        except RegistrationTicket.DoesNotExist:
+            return Response({'detail': 'Ticket not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(RegistrationTicketSerializer(ticket).data, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=['post'], url_path='attendance')
     def attendance(self, request, pk=None):  # sourcery skip: low-code-quality
         event = self.get_object()
         students = request.data.get('students')
 
         if students and isinstance(students, list):
-            response_data = []
-            for student_data in students:
-                student_id = student_data.get('student_id')
-                is_present = student_data.get('is_present', False)
-                if not Registration.objects.filter(event=event, student_id=student_id).exists():
-                    response_data.append({'student_id': student_id, 'status': 'not registered'})
-                    continue
-                try:
-                    student = Student.objects.get(id=student_id)
-                    attendance, created = Attendance.objects.get_or_create(
-                        event=event,
-                        student=student,
-                        defaults={'college': student.college, 'checked_in_at': timezone.now(), 'is_present': is_present}
-                    )
-                    if not created:
-                        attendance.is_present = is_present
-                        attendance.checked_in_at = timezone.now()
-                        attendance.save()
-                    response_data.append({'student_id': student_id, 'status': 'marked', 'is_present': is_present})
-                except Exception as e:
-                    response_data.append({'student_id': student_id, 'status': 'error', 'error': str(e)})
-
+            response_data = self._bulk_check_in(event, students)
             return Response(response_data, status=status.HTTP_200_OK)
         else:
             # Process single attendance record for browsable API form
@@ -136,34 +242,112 @@ class EventViewSet(viewsets.ModelViewSet):
                 return Response({'detail': 'Student not registered for this event.'}, status=400)
             try:
                 student = Student.objects.get(id=student_id)
-                attendance, created = Attendance.objects.get_or_create(
-                    event=event,
-                    student=student,
-                    defaults={'college': student.college, 'checked_in_at': timezone.now(), 'is_present': is_present, 'has_given_feedback': has_given_feedback}
-                )
-                if not created:
-                    attendance.is_present = is_present
-                    attendance.has_given_feedback = has_given_feedback
-                    attendance.checked_in_at = timezone.now()
-                    attendance.save()
+                with transaction.atomic():
+                    attendance, created = Attendance.objects.get_or_create(
+                        event=event,
+                        student=student,
+                        defaults={'college': student.college, 'checked_in_at': timezone.now(), 'is_present': is_present, 'has_given_feedback': has_given_feedback}
+                    )
+                    if not created:
+                        attendance.is_present = is_present
+                        attendance.has_given_feedback = has_given_feedback
+                        attendance.checked_in_at = timezone.now()
+                        attendance.save()
+                    report_data_changed.send(
+                        sender=Attendance, event_ids=[event.id], college_ids=[event.college_id, student.college_id]
+                    )
                 serializer = AttendanceSerializer(attendance)
                 return Response(serializer.data, status=status.HTTP_200_OK)
             except Exception as e:
                 return Response({'detail': str(e)}, status=400)
 
+    @staticmethod
+    def _bulk_check_in(event, students):
+        """Mark attendance for a batch of students with a fixed number of queries."""
+        is_present_field = Attendance._meta.get_field('is_present')
+        entries = []
+        for student_data in students:
+            student_id = student_data.get('student_id')
+            is_present = student_data.get('is_present', False)
+            try:
+                pk = int(student_id)
+                present = is_present_field.to_python(is_present)
+            except (TypeError, ValueError, ValidationError):
+                pk = present = None
+            entries.append((student_id, pk, is_present, present))
+
+        requested = {pk for _, pk, _, _ in entries if pk is not None}
+        registered = set(
+            Registration.objects.filter(event=event, student_id__in=requested).values_list('student_id', flat=True)
+        )
+        colleges = dict(Student.objects.filter(id__in=registered).values_list('id', 'college_id'))
+
+        now = timezone.now()
+        rows = {}  # keyed by student so repeated ids in one batch upsert once (last one wins)
+        for _, pk, _, present in entries:
+            if pk in colleges:
+                rows[pk] = Attendance(
+                    event=event, student_id=pk, college_id=colleges[pk], checked_in_at=now, is_present=present
+                )
+        if rows:
+            with transaction.atomic():
+                # Serialise concurrent check-ins for this event so the stats deltas see a stable "previous".
+                list(EventStats.objects.select_for_update().filter(event=event))
+                previous = dict(
+                    Attendance.objects.filter(event=event, student_id__in=rows).values_list('student_id', 'is_present')
+                )
+                checked_in = rows.keys() - previous.keys()
+                EventStatsService.record(
+                    event.id,
+                    attendance_count=len(checked_in),
+                    present_count=sum(int(row.is_present) - int(previous.get(pk, False)) for pk, row in rows.items()),
+                )
+                EventStatsService.record_attendance(checked_in, 1)
+                Attendance.objects.bulk_create(
+                    rows.values(),
+                    update_conflicts=True,
+                    unique_fields=['event', 'student'],
+                    update_fields=['is_present', 'checked_in_at'],
+                )
+                report_data_changed.send(
+                    sender=Attendance, event_ids=[event.id],
+                    college_ids={event.college_id, *(row.college_id for row in rows.values())},
+                )
+
+        response_data = []
+        for student_id, pk, is_present, _ in entries:
+            if pk is None:
+                response_data.append({'student_id': student_id, 'status': 'error', 'error': 'Invalid student id or is_present value.'})
+            elif pk not in colleges:
+                response_data.append({'student_id': student_id, 'status': 'not registered'})
+            else:
+                response_data.append({'student_id': student_id, 'status': 'marked', 'is_present': is_present})
+        return response_data
+
     @action(detail=True, methods=['get'], url_path='registered_students')
     def registered_students(self, request, pk=None):
         event = self.get_object()
         registrations = Registration.objects.filter(event=event).select_related('student')
-        students_data = [{'student_id': reg.student.id, 'full_name': reg.student.full_name, 'email': reg.student.email} for reg in registrations]
-        return Response(students_data, status=status.HTTP_200_OK)
+        page = self.paginate_queryset(registrations)
+        students_data = [{'student_id': reg.student.id, 'full_name': reg.student.full_name, 'email': reg.student.email} for reg in page]
+        return self.get_paginated_response(students_data)
 
-    @action(detail=True, methods=['get'], url_path='attendance')
+    @attendance.mapping.get
     def attendance_list(self, request, pk=None):
         event = self.get_object()
-        attendances = Attendance.objects.filter(event=event).select_related('student', 'college')
-        serializer = AttendanceSerializer(attendances, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        attendances = Attendance.objects.filter(event=event)
+        page = self.paginate_queryset(attendances)
+        serializer = AttendanceSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path=r'export/(?P<dataset>registrations|attendance|feedback)')
+    def export(self, request, pk=None, dataset=None):
+        """Stream registrations, attendance or feedback as CSV (default) or NDJSON (?output=ndjson)."""
+        event = self.get_object()
+        output = request.query_params.get('output', 'csv')
+        if output not in ('csv', 'ndjson'):
+            return Response({'output': "Expected 'csv' or 'ndjson'."}, status=status.HTTP_400_BAD_REQUEST)
+        return streaming_export(dataset, event.id, output, asynchronous=isinstance(request._request, ASGIRequest))
 
     @action(detail=True, methods=['post'], url_path='feedback')
     def feedback(self, request, pk=None):
@@ -174,16 +358,20 @@ class EventViewSet(viewsets.ModelViewSet):
         
         if ser.is_valid():
             try:
-                feedback = ser.save()
-                # Update Attendance has_given_feedback field
-                Attendance.objects.filter(event=event, student_id=feedback.student.id).update(has_given_feedback=True)
+                with transaction.atomic():
+                    feedback = ser.save()
+                    # Update Attendance has_given_feedback field
+                    Attendance.objects.filter(event=event, student_id=feedback.student.id).update(has_given_feedback=True)
+                    report_data_changed.send(
+                        sender=Feedback, event_ids=[event.id], college_ids=[event.college_id, feedback.student.college_id]
+                    )
                 return Response(ser.data, status=status.HTTP_201_CREATED)
             except IntegrityError:
                 return Response({'detail': 'Feedback already submitted by this student.'}, status=400)
         return Response(ser.errors, status=400)
 
 
-class FeedbackViewSet(viewsets.ReadOnlyModelViewSet):
+class FeedbackViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
     permission_classes = [IsAuthenticated]
@@ -236,6 +424,10 @@ class LoginUserView(APIView):
         password = request.data.get("password")
         user = authenticate(request, username=username, password=password)
         if user is not None:
+            if str(request.data.get("token", "")).lower() in {'true', '1', 'yes', 'on'}:
+                # Kiosks and scripts: a signed token instead of a session (see event/authentication.py).
+                token, expires_at = issue_token(user)
+                return Response({"token": token, "expires_at": expires_at}, status=status.HTTP_200_OK)
             login(request, user)
             return redirect('/api/')
         else:
@@ -248,7 +440,10 @@ class LogoutUserView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        logout(request)
+        if isinstance(request.successful_authenticator, SignedTokenAuthentication):
+            revoke_token(request.auth)
+        else:
+            logout(request)
         return Response(
             {"detail": "Logout successful."}, status=status.HTTP_200_OK
         )
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eventory.settings')
 
 application = get_asgi_application()
+
+if getattr(settings, 'READ_GATEWAY', {}).get('ENABLED'):
+    # Needs the apps loaded, so import it only after get_asgi_application().
+    from event.gateway import with_gateway
+
+    application = with_gateway(application)
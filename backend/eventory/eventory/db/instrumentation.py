@@ -0,0 +1,83 @@
+"""Opt-in per-request SQL instrumentation.
+
+With SQL_INSTRUMENTATION['ENABLED'], every response gets a ``Server-Timing`` header
+(query count and SQL time next to the total, visible in the browser's network panel)
+and one JSON line on the ``eventory.sql`` logger with the slowest statements.
+Only queries run on the request's own thread are seen.
+"""
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('eventory.sql')
+
+INSTRUMENTATION_DEFAULTS = {
+    'ENABLED': False,
+    'SLOWEST': 3,
+    'SQL_MAX_LENGTH': 500,
+}
+
+
+def instrumentation_settings():
+    return {**INSTRUMENTATION_DEFAULTS, **getattr(settings, 'SQL_INSTRUMENTATION', {})}
+
+
+class QueryRecorder:
+    """A database execute wrapper that times every statement."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.statements.append((time.perf_counter() - started, context['connection'].alias, sql))
+
+    @property
+    def total(self):
+        return sum(duration for duration, _, _ in self.statements)
+
+    def slowest(self, n):
+        return sorted(self.statements, key=lambda statement: statement[0], reverse=True)[:n]
+
+
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not instrumentation_settings()['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        conf = instrumentation_settings()
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        response['Server-Timing'] = (
+            f'sql;dur={recorder.total * 1000:.2f};desc="{len(recorder.statements)} queries", '
+            f'total;dur={elapsed * 1000:.2f}'
+        )
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': len(recorder.statements),
+            'sql_ms': round(recorder.total * 1000, 2),
+            'total_ms': round(elapsed * 1000, 2),
+            'slowest': [
+                {'ms': round(duration * 1000, 2), 'db': alias, 'sql': sql[:conf['SQL_MAX_LENGTH']]}
+                for duration, alias, sql in recorder.slowest(conf['SLOWEST'])
+            ],
+        }))
+        return response
@@ -0,0 +1,149 @@
+"""Read-replica routing.
+
+Reads are sent to the replica only inside ``use_replica()``, which the read-only
+viewset requests and the report views enter (``ReplicaReadMixin``,
+``reads_from_replica``). Everything else, including every write, goes to the primary.
+
+A client that has just written must not read stale data from a replica that is still
+catching up. ``PrimaryPinMiddleware`` therefore sets a short-lived cookie on any
+successful unsafe request, and while that cookie is present the client's reads stay
+on the primary.
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_DEFAULTS = {
+    'ALIAS': 'replica',
+    'APPS': ['event'],
+    'PIN_SECONDS': 5,
+    'PIN_COOKIE': 'eventory_primary_pin',
+}
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+_pinned_to_primary = contextvars.ContextVar('pinned_to_primary', default=False)
+
+
+def replica_settings():
+    return {**REPLICA_DEFAULTS, **getattr(settings, 'READ_REPLICA', {})}
+
+
+@contextlib.contextmanager
+def use_replica():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextlib.contextmanager
+def pin_to_primary(pinned=True):
+    token = _pinned_to_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def reads_from_replica(view):
+    """Run a (sync or async) function view inside ``use_replica()``."""
+    if asyncio.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def wrapper(*args, **kwargs):
+            with use_replica():
+                return await view(*args, **kwargs)
+    else:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with use_replica():
+                return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadMixin:
+    """For viewsets: serve GET/HEAD/OPTIONS requests from the replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with use_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        conf = replica_settings()
+        if (
+            _replica_reads.get()
+            and not _pinned_to_primary.get()
+            and model._meta.app_label in conf['APPS']
+            and conf['ALIAS'] in settings.DATABASES
+            # Inside a transaction on the primary, read what that transaction sees.
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return conf['ALIAS']
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+
+def with_current_routing(iterable):
+    """Iterate ``iterable`` under the read routing in force where this is called.
+
+    A streaming response's content is consumed after the view (and its ``use_replica()``
+    and the middleware's pin) has returned; each step here runs in a copy of the
+    context the response was built in, so its queries are routed as the view's were.
+    """
+    context = contextvars.copy_context()
+    iterator = iter(iterable)
+
+    def stream():
+        while True:
+            try:
+                yield context.run(next, iterator)
+            except StopIteration:
+                return
+    return stream()
+
+
+class PrimaryPinMiddleware:
+    """Give each client read-your-writes: pin its reads to the primary for PIN_SECONDS after a write."""
+    sync_capable = True
+    async_capable = True  # so async views (reports/async_views.py) are not forced through a sync adapter
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with pin_to_primary(replica_settings()['PIN_COOKIE'] in request.COOKIES):
+            response = self.get_response(request)
+        return self.pin_after_write(request, response)
+
+    async def __acall__(self, request):
+        with pin_to_primary(replica_settings()['PIN_COOKIE'] in request.COOKIES):
+            response = await self.get_response(request)
+        return self.pin_after_write(request, response)
+
+    @staticmethod
+    def pin_after_write(request, response):
+        conf = replica_settings()
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(conf['PIN_COOKIE'], '1', max_age=conf['PIN_SECONDS'], httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,23 @@
+"""SQLite backend tuned for concurrent requests.
+
+Each new connection gets settings.SQLITE_PRAGMAS (WAL, busy_timeout, synchronous,
+mmap). Transactions also begin with BEGIN IMMEDIATE rather than Django's deferred
+BEGIN. Under WAL, a deferred transaction that reads and then writes fails with
+"database is locked" right away if another connection committed in between, and
+busy_timeout cannot help with that. Taking the write lock up front makes concurrent
+writers wait their turn instead. Django 5.1 added OPTIONS['transaction_mode'] for
+the same thing.
+"""
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for pragma, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -10,11 +10,18 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from dotenv import load_dotenv
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Deployment settings below read EVENTORY_* environment variables; a .env file next to
+# manage.py (see .env.example) is loaded first without overriding the real environment.
+load_dotenv(BASE_DIR / '.env')
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -44,6 +51,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'eventory.db.instrumentation.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,6 +59,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'eventory.db.replica.PrimaryPinMiddleware',
 ]
 
 ROOT_URLCONF = 'eventory.urls'
@@ -76,12 +85,128 @@ WSGI_APPLICATION = 'eventory.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# EVENTORY_DB_ENGINE picks the profile:
+# - 'sqlite' (default): one file, opened through eventory/db/sqlite3, which applies the
+#   SQLITE_PRAGMAS below on connect (WAL lets readers run alongside the writer;
+#   busy_timeout makes writers wait instead of failing with "database is locked") and
+#   starts transactions with BEGIN IMMEDIATE.
+# - 'postgres': psycopg 3 with persistent connections (CONN_MAX_AGE seconds per worker
+#   thread) that are health-checked before reuse. Set EVENTORY_DB_PGBOUNCER=1 when
+#   connecting through PgBouncer in transaction pooling mode.
+DB_ENGINE = os.environ.get('EVENTORY_DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('EVENTORY_DB_NAME', 'eventory'),
+            'USER': os.environ.get('EVENTORY_DB_USER', 'eventory'),
+            'PASSWORD': os.environ.get('EVENTORY_DB_PASSWORD', ''),
+            'HOST': os.environ.get('EVENTORY_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('EVENTORY_DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('EVENTORY_DB_CONN_MAX_AGE', 300)),
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('EVENTORY_DB_PGBOUNCER') == '1',
+            'OPTIONS': {
+                'connect_timeout': 5,
+                'application_name': 'eventory',
+            },
+        }
+    }
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'eventory.db.sqlite3',
+            'NAME': os.environ.get('EVENTORY_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('EVENTORY_DB_CONN_MAX_AGE', 60)),
+            'OPTIONS': {
+                # Seconds the sqlite3 module waits on a lock (its own busy timeout).
+                'timeout': 10,
+            },
+        }
+    }
+else:
+    raise ValueError(f"EVENTORY_DB_ENGINE must be 'sqlite' or 'postgres', not {DB_ENGINE!r}.")
+
+# Applied to every new SQLite connection by eventory/db/sqlite3.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 10000,
+    'mmap_size': int(os.environ.get('EVENTORY_SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': -20000,  # KiB
+}
+
+# Optional read replica: a Postgres host, or for SQLite another database file (e.g. a
+# copy kept current with litestream, or any file standing in for one locally). Report
+# views and GET requests on the event/student/feedback viewsets read from it; a client
+# that has just written reads from the primary for PIN_SECONDS (see eventory/db/replica.py).
+if os.environ.get('EVENTORY_DB_REPLICA'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        ('HOST' if DB_ENGINE == 'postgres' else 'NAME'): os.environ['EVENTORY_DB_REPLICA'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['eventory.db.replica.ReplicaRouter']
+READ_REPLICA = {
+    'ALIAS': 'replica',
+    'APPS': ['event'],
+    'PIN_SECONDS': 5,
+    'PIN_COOKIE': 'eventory_primary_pin',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+if os.environ.get('EVENTORY_CACHE_DIR'):
+    # A file-based cache is shared by every worker process on the host, which cached
+    # sessions and the cached user lookup need once there is more than one worker.
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['EVENTORY_CACHE_DIR'],
+    }
+
+
+# Sessions
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/
+# EVENTORY_SESSION_PROFILE: "db" (default), "cached_db" (reads served from the cache, the
+# database is only written when the session changes) or "signed_cookies" (no server-side
+# storage at all).
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_PROFILE = os.environ.get('EVENTORY_SESSION_PROFILE', 'db')
+
+if SESSION_PROFILE not in SESSION_ENGINES:
+    raise ValueError(
+        f"EVENTORY_SESSION_PROFILE must be 'db', 'cached_db' or 'signed_cookies', not {SESSION_PROFILE!r}."
+    )
+SESSION_ENGINE = SESSION_ENGINES[SESSION_PROFILE]
+
+# The session's user (and with it the is_staff role the permissions check) is cached
+# for this many seconds instead of being re-read from auth_user on every request.
+AUTHENTICATION_BACKENDS = ['event.backends.CachedModelBackend']
+SESSION_USER_CACHE_TTL = 60
+
+# Report results are cached under versioned keys (see reports/cache.py). TTL is how long a
+# result is served as fresh; for STALE_TTL after that it is still served while one request
+# recomputes it.
+REPORTS_CACHE = {
+    'ALIAS': 'default',
+    'TTL': 30,
+    'STALE_TTL': 300,
+    'LOCK_TIMEOUT': 10,
+}
 
 
 # Password validation
@@ -129,9 +254,54 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
+        'event.authentication.SignedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'event.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+}
+
+# Signed API tokens issued by POST /api/auth/login/ with "token": true. TTL is the token
+# lifetime; USER_CACHE_TTL is how long a verified token's user is cached.
+AUTH_TOKEN = {
+    'TTL': 12 * 60 * 60,
+    'USER_CACHE_TTL': 60,
+}
+
+# Queued admission for flash-crowd registration openings (see event/admission.py).
+# Set WORKER_THREAD to False when running `manage.py process_registration_queue` instead.
+REGISTRATION_QUEUE = {
+    'ENABLED': False,
+    'BATCH_SIZE': 200,
+    'WORKER_THREAD': True,
+    'POLL_INTERVAL': 1.0,
+}
+
+# Optional FastAPI read gateway (see event/gateway.py) for the kiosk/dashboard hot paths,
+# mounted under PREFIX by eventory/asgi.py. Only takes effect under an ASGI server.
+READ_GATEWAY = {
+    'ENABLED': os.environ.get('EVENTORY_READ_GATEWAY') == '1',
+    'PREFIX': '/api/gateway',
+}
+
+# Opt-in per-request SQL instrumentation (see eventory/db/instrumentation.py): a
+# Server-Timing header on every response and a JSON line per request on the
+# 'eventory.sql' logger, listing the SLOWEST statements.
+SQL_INSTRUMENTATION = {
+    'ENABLED': os.environ.get('EVENTORY_SQL_INSTRUMENTATION') == '1',
+    'SLOWEST': 3,
+    'SQL_MAX_LENGTH': 500,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'eventory.sql': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
 }
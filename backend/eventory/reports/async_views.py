@@ -0,0 +1,140 @@
+"""Async versions of the report endpoints, for deployments served through eventory.asgi.
+
+They return the same payloads as reports/views.py (and share its ReportCache entries),
+but the database work runs off the event loop, so a single ASGI worker keeps serving
+other requests while a slow report is being computed.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework import exceptions
+from rest_framework.utils.encoders import JSONEncoder
+
+from eventory.db.replica import reads_from_replica
+from event.authentication import SignedTokenAuthentication
+from event.models import Event, EventTimeBucket, Student
+from .cache import ReportCache
+from .reports import ReportsService
+from .views import TOP_STUDENTS_MAX_LIMIT, _check_time_series_span, _date_range, _limit, _optional_id
+
+EVENT_POPULARITY_MAX_LIMIT = 500
+
+
+def _response(data, status=200):
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+
+
+async def _authenticate(request):
+    """Same credentials as the DRF views: a signed API token or the session."""
+    try:
+        result = await sync_to_async(SignedTokenAuthentication().authenticate)(request)
+    except exceptions.AuthenticationFailed as exc:
+        return _response({'detail': str(exc.detail)}, status=401)
+    user = result[0] if result else await request.auser()
+    if not user.is_authenticated:
+        return _response({'detail': 'Authentication credentials were not provided.'}, status=403)
+    return None
+
+
+def authenticated(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await _authenticate(request) or await view(request, *args, **kwargs)
+    return require_GET(wrapper)
+
+
+async def _cached(report, params, compute, event_id=None, college_id=None):
+    """ReportCache.aget_or_compute for ``compute`` returning an awaitable."""
+    return await ReportCache.aget_or_compute(report, params, compute, event_id=event_id, college_id=college_id)
+
+
+@authenticated
+@reads_from_replica
+async def event_metrics(request, event_id: int):
+    try:
+        if request.GET.get('source') == 'live':
+            return _response(await ReportsService.aevent_report_live(event_id))
+        return _response(await _cached(
+            'event-metrics', {'event': event_id}, lambda: ReportsService.aevent_metrics(event_id), event_id=event_id,
+        ))
+    except Event.DoesNotExist:
+        return _response({'detail': 'Event not found.'}, status=404)
+
+
+@authenticated
+@reads_from_replica
+async def event_popularity(request):
+    try:
+        college_id = _optional_id(request.GET.get('college'))
+    except ValueError:
+        return _response({'college': 'Expected a college id.'}, status=400)
+    event_type = request.GET.get('type')
+    try:
+        limit = _limit(request.GET.get('limit'), 50, EVENT_POPULARITY_MAX_LIMIT)
+    except ValueError:
+        return _response({'limit': 'Expected a positive integer.'}, status=400)
+    return _response(await _cached(
+        'event-popularity-top', {'college': college_id, 'type': event_type, 'limit': limit},
+        lambda: ReportsService.aevent_popularity(college_id, event_type, limit), college_id=college_id,
+    ))
+
+
+@authenticated
+@reads_from_replica
+async def student_participation(request, student_id: int):
+    college_id = await Student.objects.filter(id=student_id).values_list('college_id', flat=True).afirst()
+    return _response(await _cached(
+        'student-participation', {'student': student_id},
+        lambda: ReportsService.astudent_participation(student_id), college_id=college_id,
+    ))
+
+
+@authenticated
+@reads_from_replica
+async def top_students(request):
+    try:
+        limit = _limit(request.GET.get('limit'), 3, TOP_STUDENTS_MAX_LIMIT)
+    except ValueError:
+        return _response({'limit': 'Expected a positive integer.'}, status=400)
+    try:
+        college_id = _optional_id(request.GET.get('college'))
+    except ValueError:
+        return _response({'college': 'Expected a college id.'}, status=400)
+    return _response(await _cached(
+        'top-students', {'limit': limit, 'college': college_id},
+        lambda: ReportsService.atop_students(limit=limit, college_id=college_id), college_id=college_id,
+    ))
+
+
+@authenticated
+@reads_from_replica
+async def time_series(request):
+    params = {key: request.GET.get(key) for key in ('metric', 'interval', 'event', 'college', 'type', 'start', 'end')}
+    params['metric'] = params['metric'] or EventTimeBucket.Metric.REGISTRATIONS
+    params['interval'] = params['interval'] or EventTimeBucket.Interval.HOUR
+    if params['metric'] not in EventTimeBucket.Metric.values:
+        return _response({'metric': "Expected 'registrations' or 'checkins'."}, status=400)
+    if params['interval'] not in EventTimeBucket.Interval.values:
+        return _response({'interval': "Expected 'minute', 'hour' or 'day'."}, status=400)
+    try:
+        params['event'], params['college'] = _optional_id(params['event']), _optional_id(params['college'])
+    except ValueError:
+        return _response({'detail': 'event and college must be ids.'}, status=400)
+    try:
+        start, end = _date_range(params)
+    except ValueError:
+        return _response({'detail': 'start/end must be ISO 8601 dates or datetimes.'}, status=400)
+    try:
+        _check_time_series_span(params['interval'], start, end)
+    except ValueError as e:
+        return _response({'interval': str(e)}, status=400)
+
+    return _response(await _cached(
+        'time-series', params,
+        lambda: ReportsService.atime_series(
+            params['metric'], params['interval'], params['event'], params['college'], params['type'], start, end
+        ),
+        event_id=params['event'], college_id=params['college'],
+    ))
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+CACHE_DEFAULTS = {
+    'ALIAS': 'default',
+    'TTL': 30,
+    'STALE_TTL': 300,
+    'LOCK_TIMEOUT': 10,
+    'WAIT': 2.0,
+}
+
+
+def cache_settings():
+    return {**CACHE_DEFAULTS, **getattr(settings, 'REPORTS_CACHE', {})}
+
+
+class ReportCache:
+    """Versioned cache for ReportsService results.
+
+    Every key embeds the generation numbers of the scopes it depends on (a global
+    epoch, plus an event and/or college). Writes bump those generations, so stale
+    entries are never read again and simply age out. Each report/parameter pair also
+    keeps a pointer to its latest value: while one request recomputes (holding a
+    short cache lock), everyone else is served that previous value instead of piling
+    onto the database.
+    """
+
+    EPOCH = 'epoch'
+
+    @staticmethod
+    def _cache():
+        return caches[cache_settings()['ALIAS']]
+
+    @staticmethod
+    def _gen_key(scope):
+        return f'reports:gen:{scope}'
+
+    @staticmethod
+    def generations(scopes):
+        cache = ReportCache._cache()
+        keys = [ReportCache._gen_key(scope) for scope in scopes]
+        found = cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                # Seed unknown generations with a timestamp, so a generation evicted from
+                # the cache can never fall back to a number that old entries were stored under.
+                cache.add(key, time.time_ns(), timeout=None)
+                found[key] = cache.get(key)
+        return [found[key] for key in keys]
+
+    @staticmethod
+    def bump(event_ids=(), college_ids=None):
+        """Invalidate everything derived from these events and colleges; ``college_ids=None`` means all."""
+        cache = ReportCache._cache()
+        scopes = [f'event:{event_id}' for event_id in event_ids]
+        scopes += [ReportCache.EPOCH] if college_ids is None else [f'college:{college_id}' for college_id in college_ids]
+        scopes.append('college:all')
+        for scope in scopes:
+            key = ReportCache._gen_key(scope)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, time.time_ns(), timeout=None)
+
+    @staticmethod
+    def base_key(report, params):
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        return f'reports:{report}:{digest}'
+
+    @staticmethod
+    def _scopes(event_id, college_id):
+        scopes = [ReportCache.EPOCH, f'college:{college_id or "all"}']
+        if event_id is not None:
+            scopes.append(f'event:{event_id}')
+        return scopes
+
+    @staticmethod
+    def _keys(report, params, generations):
+        """The entry key for these generations, plus the report's latest-value and lock keys."""
+        base = ReportCache.base_key(report, params)
+        return f'{base}:' + '.'.join(str(gen) for gen in generations), f'{base}:latest', f'{base}:lock'
+
+    @staticmethod
+    def get_or_compute(report, params, compute, event_id=None, college_id=None):
+        conf = cache_settings()
+        cache = ReportCache._cache()
+        generations = ReportCache.generations(ReportCache._scopes(event_id, college_id))
+        key, latest_key, lock_key = ReportCache._keys(report, params, generations)
+
+        entry = cache.get(key)
+        if entry is not None and entry['fresh_until'] > time.time():
+            return entry['value']
+        stale = entry or cache.get(latest_key)
+
+        locked = cache.add(lock_key, 1, timeout=conf['LOCK_TIMEOUT'])
+        if not locked:
+            # Someone else is recomputing this report: serve the stale value, or wait
+            # briefly for theirs if there is nothing to serve yet.
+            if stale is not None:
+                return stale['value']
+            deadline = time.time() + conf['WAIT']
+            while time.time() < deadline:
+                time.sleep(0.05)
+                entry = cache.get(key)
+                if entry is not None:
+                    return entry['value']
+
+        try:
+            value = compute()
+            entry = {'value': value, 'fresh_until': time.time() + conf['TTL']}
+            cache.set_many({key: entry, latest_key: entry}, timeout=conf['TTL'] + conf['STALE_TTL'])
+            return value
+        finally:
+            if locked:
+                cache.delete(lock_key)
+
+    # Async counterparts for reports/async_views.py. Each cache call is awaited on its own,
+    # so no thread is held while ``compute`` (a coroutine function) runs on a miss.
+
+    @staticmethod
+    async def agenerations(scopes):
+        cache = ReportCache._cache()
+        keys = [ReportCache._gen_key(scope) for scope in scopes]
+        found = await cache.aget_many(keys)
+        for key in keys:
+            if key not in found:
+                await cache.aadd(key, time.time_ns(), timeout=None)
+                found[key] = await cache.aget(key)
+        return [found[key] for key in keys]
+
+    @staticmethod
+    async def aget_or_compute(report, params, compute, event_id=None, college_id=None):
+        conf = cache_settings()
+        cache = ReportCache._cache()
+        generations = await ReportCache.agenerations(ReportCache._scopes(event_id, college_id))
+        key, latest_key, lock_key = ReportCache._keys(report, params, generations)
+
+        entry = await cache.aget(key)
+        if entry is not None and entry['fresh_until'] > time.time():
+            return entry['value']
+        stale = entry or await cache.aget(latest_key)
+
+        locked = await cache.aadd(lock_key, 1, timeout=conf['LOCK_TIMEOUT'])
+        if not locked:
+            if stale is not None:
+                return stale['value']
+            deadline = time.time() + conf['WAIT']
+            while time.time() < deadline:
+                await asyncio.sleep(0.05)
+                entry = await cache.aget(key)
+                if entry is not None:
+                    return entry['value']
+
+        try:
+            value = await compute()
+            entry = {'value': value, 'fresh_until': time.time() + conf['TTL']}
+            await cache.aset_many({key: entry, latest_key: entry}, timeout=conf['TTL'] + conf['STALE_TTL'])
+            return value
+        finally:
+            if locked:
+                await cache.adelete(lock_key)
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
+from event.models import Event, EventTimeBucket
+from reports.reports import ReportsService
+
+
+class Command(BaseCommand):
+    help = "Precompute registration/check-in time buckets for finished events so their charts never rescan."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=int, default=24, help="Only freeze events that ended this long ago.")
+        parser.add_argument('--refresh', action='store_true', help="Recompute events that are already frozen.")
+
+    def handle(self, *args, **options):
+        finished = Event.objects.filter(end_at__lt=timezone.now() - timedelta(hours=options['grace_hours']))
+        frozen = 0
+        for metric in EventTimeBucket.Metric.values:
+            for interval in EventTimeBucket.Interval.values:
+                events = finished
+                if not options['refresh']:
+                    events = events.filter(
+                        ~Exists(EventTimeBucket.objects.filter(event=OuterRef('pk'), metric=metric, interval=interval))
+                    )
+                starts = dict(events.values_list('id', 'start_at'))
+                event_ids = list(starts)
+                for offset in range(0, len(event_ids), 500):
+                    frozen += self._freeze(metric, interval, {pk: starts[pk] for pk in event_ids[offset:offset + 500]})
+        self.stdout.write(self.style.SUCCESS(f"Wrote {frozen} time buckets."))
+
+    @staticmethod
+    def _freeze(metric, interval, starts):
+        """Write the buckets of the events in ``starts`` (event id -> start_at); returns how many had rows."""
+        rows = (
+            ReportsService.live_buckets(metric, interval).filter(event_id__in=starts)
+            .values('event_id', 'bucket').annotate(total=Count('pk'))
+        )
+        buckets = [
+            EventTimeBucket(event_id=row['event_id'], metric=metric, interval=interval, bucket=row['bucket'], count=row['total'])
+            for row in rows
+        ]
+        # Events without any rows get a count=0 marker, so later runs skip them instead of
+        # rescanning; time series ignore these markers.
+        empty = starts.keys() - {bucket.event_id for bucket in buckets}
+        markers = [
+            EventTimeBucket(event_id=pk, metric=metric, interval=interval, bucket=starts[pk], count=0) for pk in empty
+        ]
+        with transaction.atomic():
+            EventTimeBucket.objects.filter(event_id__in=starts, metric=metric, interval=interval).delete()
+            EventTimeBucket.objects.bulk_create(buckets + markers, batch_size=1000)
+        return len(buckets)
@@ -1,18 +1,80 @@
-from django.db.models import Count, Avg, Q
+from collections import Counter
+from datetime import timedelta
 
-from event.models import Event, Student, Attendance, Feedback, Registration
+from asgiref.sync import sync_to_async
+from django.db.models import Avg, Count, Exists, F, OuterRef, Q, Sum
+from django.db.models.functions import Coalesce, Trunc
+from django.utils import timezone
+
+from event.models import Event, EventStats, EventTimeBucket, Student, Attendance, Feedback, Registration
+
+# metric -> (model, timestamp field) for ReportsService.time_series
+TIME_SERIES_SOURCES = {
+    EventTimeBucket.Metric.REGISTRATIONS: (Registration, 'created_at'),
+    EventTimeBucket.Metric.CHECKINS: (Attendance, 'checked_in_at'),
+}
+
+BUCKET_LENGTHS = {
+    EventTimeBucket.Interval.MINUTE: timedelta(minutes=1),
+    EventTimeBucket.Interval.HOUR: timedelta(hours=1),
+    EventTimeBucket.Interval.DAY: timedelta(days=1),
+}
+
+
+def bucket_floor(moment, interval):
+    """Start of the ``interval`` bucket holding ``moment``, in the current timezone like Trunc."""
+    local = timezone.localtime(moment).replace(tzinfo=None, second=0, microsecond=0)
+    if interval != EventTimeBucket.Interval.MINUTE:
+        local = local.replace(minute=0)
+    if interval == EventTimeBucket.Interval.DAY:
+        local = local.replace(hour=0)
+    return timezone.make_aware(local)
+
+
+def bucket_ceil(moment, interval):
+    """Start of the first ``interval`` bucket at or after ``moment``."""
+    floor = bucket_floor(moment, interval)
+    if floor == moment:
+        return floor
+    return timezone.make_aware(timezone.make_naive(floor) + BUCKET_LENGTHS[interval])
+
+
+async def _in_one_hop(*calls):
+    """Run ORM calls back to back in a single trip to the request's sync thread.
+
+    They reuse that thread's persistent connection. Fanning them out to worker threads
+    meant opening and closing a connection per query, which cost more than running the
+    queries one after another.
+    """
+    return await sync_to_async(lambda: [call() for call in calls])()
 
 
 class ReportsService:
+    @staticmethod
+    def event_stats(event_id):
+        """The event's rollup row; events created before rows came with the event may have none.
+
+        Raises Event.DoesNotExist for an unknown event.
+        """
+        stats = EventStats.objects.filter(event_id=event_id).first()
+        if stats is None:
+            if not Event.objects.filter(id=event_id).exists():
+                raise Event.DoesNotExist(event_id)
+            stats = EventStats(event_id=event_id)
+        return stats
+
     @staticmethod
     def event_metrics(event_id):
-        total_regs = Registration.objects.filter(event_id=event_id).count()
-        return ReportsService.event_report(event_id, total_regs)
+        stats = ReportsService.event_stats(event_id)
+        return ReportsService.event_report(event_id, stats.registrations, stats)
+
+    @staticmethod
+    def event_report(event_id, total_regs, stats=None):
+        stats = stats or ReportsService.event_stats(event_id)
+        return ReportsService.metrics_row(event_id, total_regs, stats.attendance_count, stats.average_rating)
 
     @staticmethod
-    def event_report(event_id, total_regs):
-        total_att = Attendance.objects.filter(event_id=event_id).count()
-        avg_fb = Feedback.objects.filter(event_id=event_id).aggregate(avg=Avg('rating'))['avg']
+    def metrics_row(event_id, total_regs, total_att, avg_fb):
         attendance_pct = (total_att / total_regs * 100.0) if total_regs else 0.0
         return {
             'event_id': event_id,
@@ -23,22 +85,58 @@ class ReportsService:
         }
 
     @staticmethod
-    def event_popularity(college_id=None, event_type=None):
+    def event_metrics_queryset(event_ids=None, college_id=None, event_type=None, start=None, end=None):
+        """Metrics for many events in one query, read from the EventStats rollup."""
         qs = Event.objects.all()
+        if event_ids:
+            qs = qs.filter(id__in=event_ids)
         if college_id:
             qs = qs.filter(college_id=college_id)
         if event_type:
             qs = qs.filter(type=event_type)
-        qs = qs.annotate(reg_count=Count('registrations')).order_by('-reg_count', '-start_at')
-        return [
-            {
-                'event_id': e.id,
-                'title': e.title,
-                'college_id': e.college_id,
-                'type': e.type,
-                'registrations': e.reg_count,
-            } for e in qs
-        ]
+        if start:
+            qs = qs.filter(start_at__gte=start)
+        if end:
+            qs = qs.filter(start_at__lt=end)
+        return qs.values('id').annotate(
+            total_regs=Coalesce(F('stats__registrations'), 0),
+            total_att=Coalesce(F('stats__attendance_count'), 0),
+            feedback_count=Coalesce(F('stats__feedback_count'), 0),
+            rating_sum=Coalesce(F('stats__rating_sum'), 0),
+        )
+
+    @staticmethod
+    def batch_metrics_row(e):
+        avg_fb = e['rating_sum'] / e['feedback_count'] if e['feedback_count'] else 0.0
+        return ReportsService.metrics_row(e['id'], e['total_regs'], e['total_att'], avg_fb)
+
+    @staticmethod
+    def event_popularity_queryset(college_id=None, event_type=None):
+        """Events by registrations, driven from EventStats so ('-reg_count', '-id') is read off its index."""
+        qs = EventStats.objects.all()
+        if college_id:
+            qs = qs.filter(event__college_id=college_id)
+        if event_type:
+            qs = qs.filter(event__type=event_type)
+        return qs.values(
+            id=F('event_id'), title=F('event__title'), college_id=F('event__college_id'), type=F('event__type'),
+            start_at=F('event__start_at'), reg_count=F('registrations'),
+        )
+
+    @staticmethod
+    def popularity_row(e):
+        return {
+            'event_id': e['id'],
+            'title': e['title'],
+            'college_id': e['college_id'],
+            'type': e['type'],
+            'registrations': e['reg_count'],
+        }
+
+    @staticmethod
+    def event_popularity(college_id=None, event_type=None):
+        qs = ReportsService.event_popularity_queryset(college_id, event_type).order_by('-reg_count', '-id')
+        return [ReportsService.popularity_row(e) for e in qs]
 
     @staticmethod
     def student_participation(student_id: int):
@@ -55,12 +153,140 @@ class ReportsService:
         qs = Student.objects.all()
         if college_id:
             qs = qs.filter(college_id=college_id)
-        qs = qs.annotate(attended=Count('attendances')).order_by('-attended', 'full_name')[:limit]
+        qs = qs.order_by('-attendance_count', 'full_name')[:limit]
         return [
             {
                 'student_id': s.id,
                 'full_name': s.full_name,
                 'college_id': s.college_id,
-                'events_attended': s.attended,
+                'events_attended': s.attendance_count,
             } for s in qs
         ]
+
+    @staticmethod
+    def live_buckets(metric, interval, event_id=None, college_id=None, event_type=None, start=None, end=None):
+        """Source rows for ``metric`` grouped into ``interval`` buckets by the database (call .values() first)."""
+        model, field = TIME_SERIES_SOURCES[metric]
+        qs = model.objects.order_by()
+        if event_id:
+            qs = qs.filter(event_id=event_id)
+        if college_id:
+            qs = qs.filter(event__college_id=college_id)
+        if event_type:
+            qs = qs.filter(event__type=event_type)
+        if start:
+            qs = qs.filter(**{f'{field}__gte': start})
+        if end:
+            qs = qs.filter(**{f'{field}__lt': end})
+        return qs.annotate(bucket=Trunc(field, interval))
+
+    @staticmethod
+    def frozen_buckets(metric, interval, event_id=None, college_id=None, event_type=None, start=None, end=None):
+        """Pre-aggregated EventTimeBucket rows for ``metric`` (call .values() first)."""
+        # count=0 rows only mark events that were frozen without any source rows.
+        frozen = EventTimeBucket.objects.filter(metric=metric, interval=interval, count__gt=0).order_by()
+        if event_id:
+            frozen = frozen.filter(event_id=event_id)
+        if college_id:
+            frozen = frozen.filter(event__college_id=college_id)
+        if event_type:
+            frozen = frozen.filter(event__type=event_type)
+        if start:
+            frozen = frozen.filter(bucket__gte=start)
+        if end:
+            frozen = frozen.filter(bucket__lt=end)
+        return frozen
+
+    @staticmethod
+    def time_series_parts(metric, interval, event_id=None, college_id=None, event_type=None, start=None, end=None):
+        """The frozen and live halves of time_series as two independent grouped querysets.
+
+        ``start`` and ``end`` are widened to whole buckets: frozen rows only know their
+        bucket, so both halves must count a partially covered bucket the same way.
+        """
+        start = start and bucket_floor(start, interval)
+        end = end and bucket_ceil(end, interval)
+        filters = (event_id, college_id, event_type, start, end)
+        frozen = ReportsService.frozen_buckets(metric, interval, *filters).values('bucket').annotate(total=Sum('count'))
+        live = ReportsService.live_buckets(metric, interval, *filters).filter(
+            ~Exists(EventTimeBucket.objects.filter(event=OuterRef('event'), metric=metric, interval=interval))
+        ).values('bucket').annotate(total=Count('pk'))
+        return frozen, live
+
+    @staticmethod
+    def merge_buckets(*parts):
+        counts = Counter()
+        for rows in parts:
+            for row in rows:
+                counts[row['bucket']] += row['total']
+        return [{'bucket': bucket, 'count': counts[bucket]} for bucket in sorted(counts)]
+
+    @staticmethod
+    def time_series(metric, interval, event_id=None, college_id=None, event_type=None, start=None, end=None):
+        """Counts per minute/hour/day; finished events are read from their frozen EventTimeBucket rows."""
+        return ReportsService.merge_buckets(
+            *ReportsService.time_series_parts(metric, interval, event_id, college_id, event_type, start, end)
+        )
+
+    # Async variants, served by reports/async_views.py under the ASGI entry point.
+
+    @staticmethod
+    async def aevent_metrics(event_id):
+        stats = await EventStats.objects.filter(event_id=event_id).afirst()
+        if stats is None:
+            if not await Event.objects.filter(id=event_id).aexists():
+                raise Event.DoesNotExist(event_id)
+            stats = EventStats(event_id=event_id)
+        return ReportsService.event_report(event_id, stats.registrations, stats)
+
+    @staticmethod
+    async def aevent_popularity(college_id=None, event_type=None, limit=None):
+        qs = ReportsService.event_popularity_queryset(college_id, event_type).order_by('-reg_count', '-id')
+        if limit:
+            qs = qs[:limit]
+        return [ReportsService.popularity_row(e) async for e in qs]
+
+    @staticmethod
+    async def astudent_participation(student_id: int):
+        reg_count, att_count = await _in_one_hop(
+            Registration.objects.filter(student_id=student_id).count,
+            Attendance.objects.filter(student_id=student_id).count,
+        )
+        return {
+            'student_id': student_id,
+            'registrations': reg_count,
+            'attended': att_count,
+        }
+
+    @staticmethod
+    async def atop_students(limit=3, college_id=None):
+        qs = Student.objects.all()
+        if college_id:
+            qs = qs.filter(college_id=college_id)
+        qs = qs.order_by('-attendance_count', 'full_name')[:limit]
+        return [
+            {
+                'student_id': s.id,
+                'full_name': s.full_name,
+                'college_id': s.college_id,
+                'events_attended': s.attendance_count,
+            } async for s in qs
+        ]
+
+    @staticmethod
+    async def aevent_report_live(event_id):
+        """event_report computed from the raw tables; raises Event.DoesNotExist for an unknown event."""
+        found, total_regs, total_att, avg_fb = await _in_one_hop(
+            Event.objects.filter(id=event_id).exists,
+            Registration.objects.filter(event_id=event_id).count,
+            Attendance.objects.filter(event_id=event_id).count,
+            lambda: Feedback.objects.filter(event_id=event_id).aggregate(avg=Avg('rating'))['avg'],
+        )
+        if not found:
+            raise Event.DoesNotExist(event_id)
+        return ReportsService.metrics_row(event_id, total_regs, total_att, avg_fb)
+
+    @staticmethod
+    async def atime_series(metric, interval, event_id=None, college_id=None, event_type=None, start=None, end=None):
+        frozen, live = ReportsService.time_series_parts(metric, interval, event_id, college_id, event_type, start, end)
+        return ReportsService.merge_buckets(*await _in_one_hop(lambda: list(frozen), lambda: list(live)))
@@ -0,0 +1,10 @@
+from django.db import transaction
+from django.dispatch import receiver
+
+from event.signals import report_data_changed
+from .cache import ReportCache
+
+
+@receiver(report_data_changed)
+def invalidate_reports(sender, event_ids, college_ids, **kwargs):
+    transaction.on_commit(lambda: ReportCache.bump(event_ids=event_ids, college_ids=college_ids))
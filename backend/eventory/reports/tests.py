@@ -1,3 +1,436 @@
-from django.test import TestCase
+import os
+import tempfile
+import warnings
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core import serializers
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from event.authentication import issue_token
+from event.models import Attendance, College, Student, Event, EventStats, EventTimeBucket, Feedback, Registration
+from .cache import ReportCache
+from .reports import ReportsService
+
+
+class EventPopularityTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pass12345', is_staff=True))
+        self.college = College.objects.create(name="Test College", code="tc01")
+        students = [
+            Student.objects.create(college=self.college, full_name=f"Student {i}", email=f"s{i}@example.com", roll_no=str(i))
+            for i in range(3)
+        ]
+        for n in range(3):
+            event = Event.objects.create(
+                college=self.college, title=f"Event {n}", type="WORKSHOP",
+                start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+            )
+            for student in students[:n]:
+                Registration.objects.create(event=event, student=student)
+        call_command('rebuild_event_stats', stdout=StringIO())
+
+    def test_popularity_pages_in_rank_order(self):
+        first = self.client.get(reverse('event-popularity'), {'page_size': 2})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual([e['registrations'] for e in first.data['results']], [2, 1])
+        second = self.client.get(first.data['next'])
+        self.assertEqual([e['title'] for e in second.data['results']], ['Event 0'])
+
+    def test_ties_page_on_the_full_cursor(self):
+        for n in range(3, 8):
+            Event.objects.create(
+                college=self.college, title=f"Event {n}", type="WORKSHOP",
+                start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+            )
+        expected = list(EventStats.objects.order_by('-registrations', '-event').values_list('event_id', flat=True))
+        seen, pages, url, params = [], [], reverse('event-popularity'), {'page_size': 2}
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.client.get(url, params)
+                pages.append(response.data)
+                seen += [e['event_id'] for e in response.data['results']]
+                url, params = response.data['next'], None
+        self.assertEqual(seen, expected)
+        self.assertFalse([q['sql'] for q in queries if 'OFFSET' in q['sql']])
+        back = self.client.get(pages[2]['previous'])
+        self.assertEqual(back.data['results'], pages[1]['results'])
+
+    def test_top_students_limit_is_validated(self):
+        for limit in ('abc', '-1', '0'):
+            response = self.client.get(reverse('top-students'), {'limit': limit})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, limit)
+
+
+class EventStatsTests(APITestCase):
+    def setUp(self):
+        self.student_user = User.objects.create_user(username='student', password='pass12345')
+        self.client.force_authenticate(self.student_user)
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.event = Event.objects.create(
+            college=self.college, title="Seminar", type="SEMINAR",
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+        )
+        for n in range(4):
+            self.client.post(reverse('event-register', args=[self.event.id]), {
+                'name': f"Student {n}", 'collegeid': 'tc01', 'email': f"s{n}@example.com",
+                'studentid': str(n), 'event_id': self.event.id,
+            }, format='json')
+        self.students = list(Student.objects.order_by('id'))
+        self.client.post(reverse('event-attendance', args=[self.event.id]), {'students': [
+            {'student_id': s.id, 'is_present': i < 2} for i, s in enumerate(self.students[:3])
+        ]}, format='json')
+        for student, rating in zip(self.students, (5, 4)):
+            self.client.post(reverse('event-feedback', args=[self.event.id]), {
+                'student': student.id, 'rating': rating, 'comment': 'ok',
+            }, format='json')
+
+    def test_writes_maintain_rollup(self):
+        stats = EventStats.objects.get(event=self.event)
+        self.assertEqual((stats.registrations, stats.attendance_count, stats.present_count), (4, 3, 2))
+        self.assertEqual((stats.feedback_count, stats.rating_sum), (2, 9))
+        self.assertEqual(stats.rating_histogram, {1: 0, 2: 0, 3: 0, 4: 1, 5: 1})
+        with self.assertNumQueries(1):
+            metrics = ReportsService.event_metrics(self.event.id)
+        self.assertEqual(metrics['attendance_percentage'], 75.0)
+        self.assertEqual(metrics['average_feedback'], 4.5)
+
+    def test_deletes_and_rebuild_agree(self):
+        self.students[0].delete()
+        maintained = ReportsService.event_metrics(self.event.id)
+        call_command('rebuild_event_stats', stdout=StringIO())
+        self.assertEqual(ReportsService.event_metrics(self.event.id), maintained)
+        self.assertEqual(maintained['total_registrations'], 3)
+
+    def test_orm_writes_maintain_rollup(self):
+        feedback = Feedback.objects.get(student=self.students[0])
+        feedback.rating = 1  # edited, then deleted: the delete removes the edited rating
+        feedback.save()
+        attendance = Attendance.objects.only('id').get(student=self.students[2])
+        attendance.is_present = True
+        attendance.save()
+        newcomer = Student.objects.create(college=self.college, full_name="Late", email="late@example.com", roll_no="9")
+        Registration.objects.create(event=self.event, student=newcomer)
+        Attendance(event=self.event, student=newcomer, college=self.college, is_present=False).save()
+        feedback.delete()
+        maintained = sorted(EventStats.objects.values_list())
+        call_command('rebuild_event_stats', stdout=StringIO())
+        self.assertEqual(sorted(EventStats.objects.values_list()), maintained)
+        stats = EventStats.objects.get(event=self.event)
+        self.assertEqual((stats.registrations, stats.attendance_count, stats.present_count), (5, 4, 3))
+        self.assertEqual((stats.feedback_count, stats.rating_sum, stats.rating_1), (1, 4, 0))
+
+    def test_student_attendance_counts_follow_every_write(self):
+        other = Event.objects.create(
+            college=self.college, title="Talk", type="TECHTALK",
+            start_at="2024-12-02T10:00:00Z", end_at="2024-12-02T12:00:00Z",
+        )
+        Registration.objects.create(event=other, student=self.students[1])
+        Attendance.objects.create(event=other, student=self.students[1], college=self.college)
+        Attendance.objects.get(event=self.event, student=self.students[0]).delete()
+        counts = dict(Student.objects.values_list('id', 'attendance_count'))
+        self.assertEqual([counts[s.id] for s in self.students], [0, 2, 1, 0])
+        self.assertEqual(
+            [row['student_id'] for row in ReportsService.top_students(limit=2)], [self.students[1].id, self.students[2].id]
+        )
+
+        Student.objects.update(attendance_count=0)
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertEqual(dict(Student.objects.values_list('id', 'attendance_count')), counts)
+
+    def test_loaded_events_get_a_rollup_row(self):
+        event_id = self.event.id
+        fixture = serializers.serialize('json', Event.objects.filter(id=event_id))
+        self.event.delete()
+        for obj in serializers.deserialize('json', fixture):
+            obj.save()  # raw, as loaddata saves
+        self.assertTrue(EventStats.objects.filter(event_id=event_id).exists())
+
+
+class EventMetricsBatchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pass12345', is_staff=True))
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.events = [
+            Event.objects.create(
+                college=self.college, title=f"Event {n}", type="WORKSHOP" if n % 2 else "SEMINAR",
+                start_at=f"2024-12-0{n + 1}T10:00:00Z", end_at=f"2024-12-0{n + 1}T12:00:00Z",
+            )
+            for n in range(4)
+        ]
+        EventStats.objects.filter(event=self.events[1]).update(registrations=4, attendance_count=3, feedback_count=2, rating_sum=7)
+
+    def test_metrics_for_listed_events(self):
+        ids = ','.join(str(e.id) for e in self.events)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('event-metrics-batch'), {'ids': ids})
+        rows = {row['event_id']: row for row in response.data['results']}
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[self.events[1].id]['attendance_percentage'], 75.0)
+        self.assertEqual(rows[self.events[1].id]['average_feedback'], 3.5)
+        self.assertEqual(rows[self.events[0].id]['total_registrations'], 0)
+        self.assertEqual(response.data['missing'], [])
+
+    def test_unknown_events_are_not_reported_as_empty(self):
+        unknown = self.events[-1].id + 100
+        self.assertEqual(self.client.get(reverse('event-metrics', args=[unknown])).status_code, 404)
+        response = self.client.get(reverse('event-metrics-batch'), {
+            'ids': f'{self.events[0].id},{self.events[1].id},{unknown}', 'type': 'SEMINAR',
+        })
+        self.assertEqual([row['event_id'] for row in response.data['results']], [self.events[0].id])
+        self.assertEqual(response.data['missing'], [unknown])
+
+    def test_college_must_be_an_id(self):
+        for name in ('event-metrics-batch', 'event-popularity', 'top-students', 'time-series'):
+            self.assertEqual(self.client.get(reverse(name), {'college': 'abc'}).status_code, 400, name)
+
+    def test_filters(self):
+        response = self.client.get(reverse('event-metrics-batch'), {
+            'college': self.college.id, 'type': 'WORKSHOP', 'start': '2024-12-03',
+        })
+        self.assertEqual([row['event_id'] for row in response.data['results']], [self.events[3].id])
+        self.assertEqual(self.client.get(reverse('event-metrics-batch'), {'start': 'soon'}).status_code, 400)
+
+    @override_settings(TIME_ZONE='Pacific/Pago_Pago')
+    def test_naive_bounds_are_in_the_current_timezone(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            # Midnight in Pago Pago (UTC-11) is 11:00 UTC, just after each day's event starts.
+            by_date = self.client.get(reverse('event-metrics-batch'), {'start': '2024-12-02', 'end': '2024-12-04'})
+            by_time = self.client.get(reverse('event-metrics-batch'), {'start': '2024-12-01T23:00:00'})
+        self.assertEqual([row['event_id'] for row in by_date.data['results']], [self.events[2].id, self.events[3].id])
+        self.assertEqual(
+            [row['event_id'] for row in by_time.data['results']], [self.events[1].id, self.events[2].id, self.events[3].id],
+        )
+
+
+class ReportCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(User.objects.create_user(username='student', password='pass12345'))
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.event = Event.objects.create(
+            college=self.college, title="Talk", type="TECHTALK",
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+        )
+
+    def register(self, n):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('event-register', args=[self.event.id]), {
+                'name': f"Student {n}", 'collegeid': 'tc01', 'email': f"s{n}@example.com",
+                'studentid': str(n), 'event_id': self.event.id,
+            }, format='json')
+
+    def popularity(self):
+        return self.client.get(reverse('event-popularity'), {'college': self.college.id}).data['results'][0]['registrations']
+
+    def test_cached_until_a_write_bumps_the_generation(self):
+        self.register(1)
+        self.assertEqual(self.popularity(), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.popularity(), 1)
+        self.register(2)
+        self.assertEqual(self.popularity(), 2)
+
+    def test_concurrent_recompute_serves_previous_value(self):
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        self.assertEqual(ReportCache.get_or_compute('probe', {}, compute, event_id=self.event.id), 1)
+        ReportCache.bump(event_ids=[self.event.id], college_ids=[self.college.id])
+        # Another worker holds the recompute lock: the previous value is served, nothing recomputes.
+        lock_key = ReportCache.base_key('probe', {}) + ':lock'
+        cache.add(lock_key, 1)
+        self.assertEqual(ReportCache.get_or_compute('probe', {}, compute, event_id=self.event.id), 1)
+        cache.delete(lock_key)
+        self.assertEqual(ReportCache.get_or_compute('probe', {}, compute, event_id=self.event.id), 2)
+
+    async def test_async_lookup_shares_entries_with_the_sync_one(self):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return len(calls)
+
+        stored = await sync_to_async(ReportCache.get_or_compute)('probe', {}, lambda: 'sync', event_id=self.event.id)
+        self.assertEqual(await ReportCache.aget_or_compute('probe', {}, compute, event_id=self.event.id), stored)
+        self.assertEqual(calls, [])  # a hit never reaches compute
+        await sync_to_async(ReportCache.bump)(event_ids=[self.event.id], college_ids=[self.college.id])
+        self.assertEqual(await ReportCache.aget_or_compute('probe', {}, compute, event_id=self.event.id), 1)
+        self.assertEqual(ReportCache.get_or_compute('probe', {}, lambda: 'sync', event_id=self.event.id), 1)
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': os.path.join(tempfile.gettempdir(), 'eventory-test-report-cache'),
+}})
+class FileBasedReportCacheTests(ReportCacheTests):
+    pass
+
+
+class TimeSeriesTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pass12345', is_staff=True))
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.event = Event.objects.create(
+            college=self.college, title="Hackathon", type="HACKATHON",
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+        )
+        for i, stamp in enumerate(["2024-11-01T09:05:00Z", "2024-11-01T09:40:00Z", "2024-11-01T11:10:00Z"]):
+            student = Student.objects.create(college=self.college, full_name=f"S{i}", email=f"s{i}@example.com", roll_no=str(i))
+            registration = Registration.objects.create(event=self.event, student=student)
+            Registration.objects.filter(pk=registration.pk).update(created_at=stamp)
+
+    def series(self, **params):
+        response = self.client.get(reverse('time-series'), {'event': self.event.id, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(row['bucket'].hour, row['count']) for row in response.data]
+
+    def test_hourly_registration_buckets(self):
+        self.assertEqual(self.series(interval='hour'), [(9, 2), (11, 1)])
+        self.assertEqual(self.client.get(reverse('time-series'), {'interval': 'week'}).status_code, 400)
+
+    def test_frozen_buckets_replace_the_scan(self):
+        call_command('freeze_time_buckets', stdout=StringIO())
+        self.assertTrue(EventTimeBucket.objects.filter(event=self.event, metric='registrations', interval='hour').exists())
+        Registration.objects.all().delete()  # frozen history no longer depends on the raw rows
+        cache.clear()
+        self.assertEqual(self.series(interval='hour'), [(9, 2), (11, 1)])
+
+    def test_partial_buckets_count_the_same_before_and_after_freezing(self):
+        params = {'interval': 'hour', 'start': '2024-11-01T09:30:00Z', 'end': '2024-11-01T11:05:00Z'}
+        self.assertEqual(self.series(**params), [(9, 2), (11, 1)])
+        call_command('freeze_time_buckets', stdout=StringIO())
+        cache.clear()
+        self.assertEqual(self.series(**params), [(9, 2), (11, 1)])
+
+    def test_events_without_rows_are_frozen_once(self):
+        quiet = Event.objects.create(
+            college=self.college, title="Quiet", type="SEMINAR",
+            start_at="2024-12-02T10:00:00Z", end_at="2024-12-02T12:00:00Z",
+        )
+        call_command('freeze_time_buckets', stdout=StringIO())
+        self.assertEqual(set(EventTimeBucket.objects.filter(event=quiet).values_list('count', flat=True)), {0})
+        with CaptureQueriesContext(connection) as queries:
+            call_command('freeze_time_buckets', stdout=StringIO())
+        self.assertFalse([q for q in queries if Attendance._meta.db_table in q['sql'] or Registration._meta.db_table in q['sql']])
+        response = self.client.get(reverse('time-series'), {'event': quiet.id, 'interval': 'day'})
+        self.assertEqual(response.data, [])
+
+    def test_minute_buckets_need_a_bounded_range(self):
+        self.assertEqual(self.client.get(reverse('time-series'), {'interval': 'minute'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('time-series'), {
+            'interval': 'minute', 'start': '2024-11-01', 'end': '2024-11-03',
+        }).status_code, 400)
+        self.assertEqual(
+            self.series(interval='minute', start='2024-11-01T09:00:00Z', end='2024-11-01T10:00:00Z'), [(9, 1), (9, 1)]
+        )
+
+
+class AsyncReportTests(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        token, _ = issue_token(User.objects.create_user(username='admin', password='pass12345', is_staff=True))
+        self.auth = {'headers': {'Authorization': f'Token {token}'}}
+        self.college = College.objects.create(name="Test College", code="tc01")
+        self.event = Event.objects.create(
+            college=self.college, title="Hackathon", type="HACKATHON",
+            start_at="2024-12-01T10:00:00Z", end_at="2024-12-01T12:00:00Z",
+        )
+        self.students = [
+            Student.objects.create(college=self.college, full_name=f"S{i}", email=f"s{i}@example.com", roll_no=str(i))
+            for i in range(3)
+        ]
+        for student in self.students:
+            Registration.objects.create(event=self.event, student=student)
+        Feedback.objects.create(event=self.event, student=self.students[0], rating=4)
+        call_command('rebuild_event_stats', stdout=StringIO())
+
+    async def test_async_reports_match_the_sync_service(self):
+        response = await self.async_client.get(reverse('async-event-metrics', args=[self.event.id]), **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = await sync_to_async(ReportsService.event_metrics)(self.event.id)
+        self.assertEqual(response.json(), expected)
+        live = await self.async_client.get(
+            reverse('async-event-metrics', args=[self.event.id]), {'source': 'live'}, **self.auth
+        )
+        self.assertEqual(live.json(), expected)
+
+        response = await self.async_client.get(
+            reverse('async-student-participation', args=[self.students[0].id]), **self.auth
+        )
+        self.assertEqual(response.json(), {'student_id': self.students[0].id, 'registrations': 1, 'attended': 0})
+
+        response = await self.async_client.get(reverse('async-event-popularity'), {'limit': 5}, **self.auth)
+        self.assertEqual([row['registrations'] for row in response.json()], [3])
+
+        response = await self.async_client.get(reverse('async-time-series'), {'interval': 'day'}, **self.auth)
+        self.assertEqual([row['count'] for row in response.json()], [3])
+
+    async def test_async_reports_reject_unknown_events_and_bad_ids(self):
+        url = reverse('async-event-metrics', args=[self.event.id + 100])
+        self.assertEqual((await self.async_client.get(url, **self.auth)).status_code, 404)
+        self.assertEqual((await self.async_client.get(url, {'source': 'live'}, **self.auth)).status_code, 404)
+        for name in ('async-event-popularity', 'async-top-students', 'async-time-series'):
+            response = await self.async_client.get(reverse(name), {'college': 'abc'}, **self.auth)
+            self.assertEqual(response.status_code, 400, name)
+
+    async def test_async_reports_require_authentication(self):
+        response = await self.async_client.get(reverse('async-top-students'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = await self.async_client.get(reverse('async-top-students'), headers={'Authorization': 'Token bogus'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ReportQueryBudgetTests(APITestCase):
+    """Each report runs a fixed number of queries on a cold cache, and (almost) none on a warm one."""
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pass12345', is_staff=True))
+        colleges = [College.objects.create(name=f"College {c}", code=f"c{c}") for c in range(2)]
+        self.students = [
+            Student.objects.create(college=colleges[i % 2], full_name=f"S{i}", email=f"s{i}@example.com", roll_no=str(i))
+            for i in range(8)
+        ]
+        self.events = [
+            Event.objects.create(
+                college=colleges[n % 2], title=f"Event {n}", type="WORKSHOP",
+                start_at=f"2024-12-0{n + 1}T10:00:00Z", end_at=f"2024-12-0{n + 1}T12:00:00Z",
+            )
+            for n in range(4)
+        ]
+        for event in self.events:
+            for i, student in enumerate(self.students[:6]):
+                Registration.objects.create(event=event, student=student)
+                if i < 4:
+                    Attendance.objects.create(event=event, student=student, college=student.college, is_present=True)
+                if i < 2:
+                    Feedback.objects.create(event=event, student=student, rating=5)
+        call_command('rebuild_event_stats', stdout=StringIO())
+        call_command('freeze_time_buckets', stdout=StringIO())
+
+    def assertBudget(self, cold, warm, url, **params):
+        for budget in (cold, warm):
+            with self.assertNumQueries(budget):
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_report_budgets(self):
+        self.assertBudget(1, 0, reverse('event-metrics', args=[self.events[0].id]))
+        self.assertBudget(1, 0, reverse('event-metrics-batch'), ids=','.join(str(e.id) for e in self.events))
+        self.assertBudget(1, 0, reverse('event-popularity'))
+        self.assertBudget(3, 1, reverse('student-participation', args=[self.students[0].id]))
+        self.assertBudget(1, 0, reverse('top-students'), limit=5)
+        self.assertBudget(2, 0, reverse('time-series'), interval='day')
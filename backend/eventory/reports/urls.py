@@ -1,9 +1,21 @@
 from django.urls import path
 
-from .views import event_popularity, student_participation, top_students
+from . import async_views
+from .views import event_metrics, event_metrics_batch, event_popularity, student_participation, time_series, top_students
 
 urlpatterns = [
+    path('event-metrics/', event_metrics_batch, name='event-metrics-batch'),
+    path('event-metrics/<int:event_id>/', event_metrics, name='event-metrics'),
     path('event-popularity/', event_popularity, name='event-popularity'),
     path('student-participation/<int:student_id>/', student_participation, name='student-participation'),
     path('top-students/', top_students, name='top-students'),
+    path('time-series/', time_series, name='time-series'),
+
+    # Async variants; run the project under an ASGI server (eventory.asgi) to benefit.
+    path('async/event-metrics/<int:event_id>/', async_views.event_metrics, name='async-event-metrics'),
+    path('async/event-popularity/', async_views.event_popularity, name='async-event-popularity'),
+    path('async/student-participation/<int:student_id>/', async_views.student_participation,
+         name='async-student-participation'),
+    path('async/top-students/', async_views.top_students, name='async-top-students'),
+    path('async/time-series/', async_views.time_series, name='async-time-series'),
 ]
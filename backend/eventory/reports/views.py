@@ -1,24 +1,183 @@
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from eventory.db.replica import reads_from_replica
+from event.models import Event, EventTimeBucket, Student
+from event.pagination import EventPopularityPagination, KeysetPagination
+from .cache import ReportCache
 from .reports import ReportsService
 
+TOP_STUDENTS_MAX_LIMIT = 100
+EVENT_METRICS_MAX_IDS = 500
+TIME_SERIES_MAX_MINUTE_SPAN = datetime.timedelta(days=1)
+
+
+def _limit(value, default, maximum):
+    """Parse an optional positive ``limit`` query param, capped at ``maximum``; raises ValueError on bad input."""
+    limit = default if value is None else int(value)
+    if limit < 1:
+        raise ValueError(limit)
+    return min(limit, maximum)
+
+
+def _optional_id(value):
+    """Parse an optional id query param such as ``college``; raises ValueError on bad input."""
+    return int(value) if value else None
+
+
+def _date_range(params):
+    """Parse the optional ``start``/``end`` query params; raises ValueError on bad input."""
+    bounds = []
+    for key in ('start', 'end'):
+        value = params[key]
+        if not value:
+            bounds.append(None)
+            continue
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(key)
+            moment = datetime.datetime.combine(day, datetime.time.min)  # midnight, current timezone
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        bounds.append(moment)
+    return bounds
+
+
+def _check_time_series_span(interval, start, end):
+    """Minute buckets need a bounded range; raises ValueError with the message to return."""
+    if interval == EventTimeBucket.Interval.MINUTE and (
+        start is None or end is None or end - start > TIME_SERIES_MAX_MINUTE_SPAN
+    ):
+        hours = int(TIME_SERIES_MAX_MINUTE_SPAN.total_seconds() // 3600)
+        raise ValueError(f"Minute buckets need start and end at most {hours} hours apart.")
+
+
+@api_view(['GET'])
+@reads_from_replica
+def event_metrics(request, event_id: int):
+    try:
+        return Response(ReportCache.get_or_compute(
+            'event-metrics', {'event': event_id}, lambda: ReportsService.event_metrics(event_id), event_id=event_id,
+        ))
+    except Event.DoesNotExist:
+        return Response({'detail': 'Event not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+
+@api_view(['GET'])
+@reads_from_replica
+def event_metrics_batch(request):
+    params = {key: request.query_params.get(key) for key in ('ids', 'college', 'type', 'start', 'end', 'cursor', 'page_size')}
+    try:
+        event_ids = [int(i) for i in params['ids'].split(',') if i] if params['ids'] else None
+    except ValueError:
+        return Response({'ids': 'Expected a comma-separated list of event ids.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        params['college'] = _optional_id(params['college'])
+    except ValueError:
+        return Response({'college': 'Expected a college id.'}, status=status.HTTP_400_BAD_REQUEST)
+    if event_ids and len(event_ids) > EVENT_METRICS_MAX_IDS:
+        return Response({'ids': f'At most {EVENT_METRICS_MAX_IDS} ids per request.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        start, end = _date_range(params)
+    except ValueError:
+        return Response({'detail': 'start/end must be ISO 8601 dates or datetimes.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    def compute():
+        paginator = KeysetPagination()
+        qs = ReportsService.event_metrics_queryset(event_ids, params['college'], params['type'], start, end)
+        page = paginator.paginate_queryset(qs, request)
+        rows = [ReportsService.batch_metrics_row(e) for e in page]
+        data = paginator.get_paginated_response(rows).data
+        if event_ids:
+            # Unknown ids have no row; list them rather than leave the caller guessing. Only
+            # ids this page did not return (filtered out, or on another page) need a lookup.
+            unmatched = set(event_ids) - {row['event_id'] for row in rows}
+            found = Event.objects.filter(id__in=unmatched).values_list('id', flat=True) if unmatched else ()
+            data['missing'] = sorted(unmatched - set(found))
+        return data
+
+    return Response(ReportCache.get_or_compute('event-metrics-batch', params, compute, college_id=params['college']))
+
 
 @api_view(['GET'])
+@reads_from_replica
 def event_popularity(request):
-    college_id = request.query_params.get('college')
+    try:
+        college_id = _optional_id(request.query_params.get('college'))
+    except ValueError:
+        return Response({'college': 'Expected a college id.'}, status=status.HTTP_400_BAD_REQUEST)
     event_type = request.query_params.get('type')
-    data = ReportsService.event_popularity(college_id, event_type)
-    return Response(data)
+
+    def compute():
+        paginator = EventPopularityPagination()
+        page = paginator.paginate_queryset(ReportsService.event_popularity_queryset(college_id, event_type), request)
+        return paginator.get_paginated_response([ReportsService.popularity_row(e) for e in page]).data
+
+    params = {key: request.query_params.get(key) for key in ('college', 'type', 'cursor', 'page_size')}
+    return Response(ReportCache.get_or_compute('event-popularity', params, compute, college_id=college_id))
 
 
 @api_view(['GET'])
+@reads_from_replica
 def student_participation(request, student_id: int):
-    return Response(ReportsService.student_participation(student_id))
+    college_id = Student.objects.filter(id=student_id).values_list('college_id', flat=True).first()
+    return Response(ReportCache.get_or_compute(
+        'student-participation', {'student': student_id},
+        lambda: ReportsService.student_participation(student_id), college_id=college_id,
+    ))
 
 
 @api_view(['GET'])
+@reads_from_replica
 def top_students(request):
-    limit = int(request.query_params.get('limit', 3))
-    college_id = request.query_params.get('college')
-    return Response(ReportsService.top_students(limit=limit, college_id=college_id))
+    try:
+        limit = _limit(request.query_params.get('limit'), 3, TOP_STUDENTS_MAX_LIMIT)
+    except ValueError:
+        return Response({'limit': 'Expected a positive integer.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        college_id = _optional_id(request.query_params.get('college'))
+    except ValueError:
+        return Response({'college': 'Expected a college id.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(ReportCache.get_or_compute(
+        'top-students', {'limit': limit, 'college': college_id},
+        lambda: ReportsService.top_students(limit=limit, college_id=college_id), college_id=college_id,
+    ))
+
+
+@api_view(['GET'])
+@reads_from_replica
+def time_series(request):
+    params = {key: request.query_params.get(key) for key in ('metric', 'interval', 'event', 'college', 'type', 'start', 'end')}
+    params['metric'] = params['metric'] or EventTimeBucket.Metric.REGISTRATIONS
+    params['interval'] = params['interval'] or EventTimeBucket.Interval.HOUR
+    if params['metric'] not in EventTimeBucket.Metric.values:
+        return Response({'metric': "Expected 'registrations' or 'checkins'."}, status=status.HTTP_400_BAD_REQUEST)
+    if params['interval'] not in EventTimeBucket.Interval.values:
+        return Response({'interval': "Expected 'minute', 'hour' or 'day'."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        params['event'], params['college'] = _optional_id(params['event']), _optional_id(params['college'])
+    except ValueError:
+        return Response({'detail': 'event and college must be ids.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        start, end = _date_range(params)
+    except ValueError:
+        return Response({'detail': 'start/end must be ISO 8601 dates or datetimes.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        _check_time_series_span(params['interval'], start, end)
+    except ValueError as e:
+        return Response({'interval': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(ReportCache.get_or_compute(
+        'time-series', params,
+        lambda: ReportsService.time_series(
+            params['metric'], params['interval'], params['event'], params['college'], params['type'], start, end
+        ),
+        event_id=params['event'], college_id=params['college'],
+    ))